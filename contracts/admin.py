@@ -1,3 +1,49 @@
 from django.contrib import admin
 
-# Register your models here.
+from contracts.models import BuyerRate, Contract, PriceTier, Promotion
+from core.paginator import EstimatedCountPaginator
+
+
+@admin.register(Contract)
+class ContractAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "product",
+        "buyer",
+        "farmer",
+        "quantity",
+        "total_price",
+        "start_date",
+        "is_active",
+    )
+    list_select_related = ("product", "buyer", "farmer")
+    # Active contracts are covered by the partial is_active indexes.
+    list_filter = ("is_active",)
+    autocomplete_fields = ("product",)
+    # Newest first, read off the contract_start_id index. Not by id alone:
+    # ids made before the switch to ULIDs sort after every newer one.
+    ordering = ("-start_date", "-id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(PriceTier)
+class PriceTierAdmin(admin.ModelAdmin):
+    list_display = ("product", "min_quantity", "discount")
+    list_select_related = ("product",)
+    autocomplete_fields = ("product",)
+
+
+@admin.register(BuyerRate)
+class BuyerRateAdmin(admin.ModelAdmin):
+    list_display = ("product", "buyer", "price_per_unit")
+    list_select_related = ("product", "buyer")
+    autocomplete_fields = ("product", "buyer")
+
+
+@admin.register(Promotion)
+class PromotionAdmin(admin.ModelAdmin):
+    list_display = ("product", "discount", "starts_at", "ends_at")
+    list_select_related = ("product",)
+    autocomplete_fields = ("product",)
+    ordering = ("-ends_at",)
@@ -0,0 +1,55 @@
+from typing import Literal, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from ninja import Router
+from ninja.errors import HttpError
+
+from contracts import exports
+from contracts.reservations import InsufficientStock
+from contracts.router import MAX_PAGE_SIZE, build_contract, contracts_for, quote_lines
+from contracts.schemas import ContractIn, ContractOut, QuoteIn, QuoteResponse
+from core.exports import export_response
+from products.models import Product
+from users.auth import async_api_auth
+from users.models import User
+
+router = Router(tags=["contracts"], auth=async_api_auth)
+
+
+@router.get("/", response=list[ContractOut])
+async def list_contracts(request, is_active: Optional[bool] = None, limit: int = 20):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return [c async for c in contracts_for(request.auth, is_active)[:limit]]
+
+
+@router.get("/export")
+async def export_contracts(request, format: Literal["csv", "jsonl"] = "csv"):
+    queryset = exports.export_queryset(request.auth)
+    return export_response(request, queryset, exports.FIELDS, format, "contracts")
+
+
+@router.post("/quote", response=QuoteResponse)
+async def quote(request, payload: QuoteIn):
+    # One price query, plus the rule tables when the cached copy is stale.
+    return await sync_to_async(quote_lines)(request.auth, payload)
+
+
+@router.post("/", response={201: ContractOut})
+async def create_contract(request, payload: ContractIn):
+    if request.auth.user_type != User.BUYER:
+        raise HttpError(403, "Only buyers can create contracts")
+
+    try:
+        product = await Product.objects.aget(pk=payload.product_id)
+    except Product.DoesNotExist:
+        raise HttpError(404, "Not Found")
+
+    try:
+        contract = build_contract(request.auth, product, payload)
+        await contract.asave()
+    except InsufficientStock as exc:
+        raise HttpError(409, exc.message)
+    except ValidationError as exc:
+        raise HttpError(400, "; ".join(exc.messages))
+    return 201, contract
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from time import perf_counter, sleep
+from typing import Iterator, Optional
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from contracts.models import Contract
+from contracts.reservations import release_many, total_quantities
+from contracts.stats import FIELDS, record_changes
+from model_utils import aware_utcnow
+
+logger = logging.getLogger("contracts.expiry")
+
+PRODUCT, ACTIVE, QUANTITY = (
+    FIELDS.index(field) for field in ("product_id", "is_active", "quantity")
+)
+
+
+def _deactivated(row: tuple) -> tuple:
+    return row[:ACTIVE] + (False,) + row[ACTIVE + 1 :]
+
+
+class ExpiryBatch:
+    def __init__(
+        self, expired: int, released: int, cursor: tuple, elapsed: float
+    ) -> None:
+        self.expired = expired
+        self.released = released
+        self.cursor = cursor
+        self.elapsed = elapsed
+
+
+def expire_contracts(
+    now: Optional[datetime] = None,
+    batch_size: int = 1000,
+    after: Optional[tuple[datetime, str]] = None,
+    pause: float = 0,
+    using: Optional[str] = None,
+) -> Iterator[ExpiryBatch]:
+    """Deactivate contracts past ``end_date`` one bounded batch at a time.
+
+    Batches walk the ``contract_active_end`` index in ``(end_date, id)`` order
+    and each commits on its own, so locks are held only briefly and an
+    interrupted run can continue from the last yielded ``cursor``. Rerunning
+    from scratch is also safe: finished rows are no longer active and drop
+    out of the index. Backends without ``SKIP LOCKED`` (SQLite) should run a
+    single sweeper at a time.
+    """
+    now = now or aware_utcnow()
+    using = using or router.db_for_write(Contract)
+    skip_locked = connections[using].features.has_select_for_update_skip_locked
+
+    while True:
+        started = perf_counter()
+        with transaction.atomic(using=using):
+            queryset = Contract.objects.using(using).filter(
+                is_active=True, end_date__lt=now
+            )
+            if after:
+                end_date, pk = after
+                queryset = queryset.filter(
+                    Q(end_date__gt=end_date) | Q(end_date=end_date, id__gt=pk)
+                )
+            if skip_locked:
+                # Concurrent sweepers split the work instead of waiting.
+                queryset = queryset.select_for_update(skip_locked=True)
+            rows = list(
+                queryset.order_by("end_date", "id").values_list(
+                    "id", "end_date", *FIELDS
+                )[:batch_size]
+            )
+            if not rows:
+                return
+
+            Contract.objects.using(using).filter(
+                pk__in=[row[0] for row in rows]
+            ).update(is_active=False)
+
+            quantities = total_quantities(
+                (row[2 + PRODUCT], row[2 + QUANTITY]) for row in rows
+            )
+            release_many(quantities, using=using)
+
+            before = [row[2:] for row in rows]
+            record_changes(before, [_deactivated(row) for row in before], using)
+
+        after = (rows[-1][1], rows[-1][0])
+        batch = ExpiryBatch(
+            expired=len(rows),
+            released=sum(quantities.values()),
+            cursor=after,
+            elapsed=perf_counter() - started,
+        )
+        logger.info(
+            "expired %d contracts in %.3fs (%.0f rows/s)",
+            batch.expired,
+            batch.elapsed,
+            batch.expired / batch.elapsed if batch.elapsed else 0,
+            extra={"expired": batch.expired, "released": batch.released},
+        )
+        yield batch
+
+        if len(rows) < batch_size:
+            return
+        if pause:
+            sleep(pause)
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from django.db.models import Q, QuerySet
+
+from contracts.models import Contract
+from users.models import User
+
+FIELDS: tuple[str, ...] = (
+    "id",
+    "buyer_id",
+    "farmer_id",
+    "product_id",
+    "product__name",
+    "start_date",
+    "end_date",
+    "payment_method",
+    "quantity",
+    "price_per_unit",
+    "total_price",
+    "discount",
+    "is_active",
+)
+
+
+def export_queryset(user: Optional[User] = None) -> QuerySet:
+    """Everything for staff (or ``user=None``), otherwise the user's contracts."""
+    queryset = Contract.objects.all()
+    if user is not None and not user.is_staff:
+        queryset = queryset.filter(Q(buyer=user) | Q(farmer=user))
+    return queryset
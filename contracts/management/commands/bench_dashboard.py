@@ -0,0 +1,108 @@
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.test.utils import CaptureQueriesContext
+
+from contracts.models import Contract
+from contracts.stats import dashboard_stats, reconcile
+from core.bench import benchmark_database, make_bench_user
+from model_utils import aware_utcnow
+from products.models import Product
+from users.models import User
+
+
+def aggregate_on_request(user: User, using: str) -> dict:
+    """What the dashboard would cost without the summary tables."""
+    contracts = Contract.objects.using(using).filter(farmer=user)
+    return {
+        "summary": contracts.aggregate(
+            contracts=Count("id"),
+            active=Count("id", filter=Q(is_active=True)),
+            amount=Sum("total_price"),
+        ),
+        "by_product": list(
+            contracts.values("product_id")
+            .annotate(amount=Sum("total_price"))
+            .order_by("-amount")[:10]
+        ),
+        "by_month": list(
+            contracts.annotate(month=TruncMonth("start_date"))
+            .values("month")
+            .annotate(amount=Sum("total_price"))
+            .order_by("-month")[:12]
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare dashboard stats read from the summary tables against "
+        "aggregating a farmer's whole contract history on every request."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--contracts", type=int, default=100_000)
+        parser.add_argument("--products", type=int, default=50)
+        parser.add_argument("--months", type=int, default=36)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            self.run(using, options)
+
+    def run(self, using: str, options: dict) -> None:
+        farmer = make_bench_user(using, User.FARMER)
+        buyer = make_bench_user(using, User.BUYER)
+        products = Product.objects.using(using).bulk_create(
+            Product(user=farmer, name=f"P{i}", price=10 + i)
+            for i in range(options["products"])
+        )
+
+        # Contracts are seeded directly; reconcile then builds the summaries
+        # the way the periodic job would.
+        now = aware_utcnow()
+        total = options["contracts"]
+        started = perf_counter()
+        Contract.objects.using(using).bulk_create(
+            (
+                Contract(
+                    buyer=buyer,
+                    farmer=farmer,
+                    product=products[i % len(products)],
+                    start_date=now - timedelta(days=i % (30 * options["months"])),
+                    quantity=1 + i % 7,
+                    price_per_unit=products[i % len(products)].price,
+                    total_price=products[i % len(products)].price * (1 + i % 7),
+                    terms_and_conditions="-",
+                    is_active=i % 3 != 0,
+                )
+                for i in range(total)
+            ),
+            batch_size=2000,
+        )
+        elapsed = perf_counter() - started
+        self.stdout.write(f"Seeded {total} contracts in {elapsed:.1f}s")
+
+        started = perf_counter()
+        reconcile(using=using)
+        self.stdout.write(f"Reconciled in {perf_counter() - started:.2f}s")
+
+        for label, load in (
+            ("summary tables", lambda: dashboard_stats(farmer, using)),
+            ("per-request aggregation", lambda: aggregate_on_request(farmer, using)),
+        ):
+            with CaptureQueriesContext(connections[using]) as queries:
+                load()
+            started = perf_counter()
+            for _ in range(options["repeat"]):
+                load()
+            elapsed = (perf_counter() - started) / options["repeat"]
+            self.stdout.write(
+                f"{label}: {elapsed * 1000:.2f} ms per dashboard, "
+                f"{len(queries)} queries"
+            )
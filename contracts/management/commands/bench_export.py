@@ -0,0 +1,82 @@
+import os
+import random
+import resource
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from contracts import exports
+from contracts.models import Contract
+from core.bench import benchmark_database, make_bench_user
+from core.exports import iter_export
+from products.models import Product
+from users.models import User
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with contracts, stream them through the "
+        "CSV/JSONL exporter and report throughput and peak RSS."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--contracts", type=int, default=1_000_000)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--format", default="csv")
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            self.seed(using, options["contracts"], options["products"])
+            rss_before = peak_rss_mib()
+
+            queryset = exports.export_queryset().using(using)
+            started = perf_counter()
+            size = 0
+            with open(os.devnull, "w") as sink:
+                for chunk in iter_export(queryset, exports.FIELDS, options["format"]):
+                    sink.write(chunk)
+                    size += len(chunk)
+            elapsed = perf_counter() - started
+            rss_after = peak_rss_mib()
+
+        rows = options["contracts"]
+        self.stdout.write(
+            f"exported {rows:,} contracts ({size / 2**20:,.1f} MiB "
+            f"{options['format']}) in {elapsed:.1f}s, {rows / elapsed:,.0f} rows/s"
+        )
+        self.stdout.write(
+            f"peak RSS {rss_before:,.1f} MiB before export, "
+            f"{rss_after:,.1f} MiB after (+{rss_after - rss_before:,.1f} MiB)"
+        )
+
+    def seed(self, using: str, count: int, product_count: int) -> None:
+        farmer = make_bench_user(using, User.FARMER)
+        products = Product.objects.using(using).bulk_create(
+            Product(user=farmer, name=f"Product {i}", price=10, stock=0)
+            for i in range(product_count)
+        )
+
+        # Seed in bounded batches so seeding does not set the RSS peak itself.
+        rng = random.Random(0)
+        batch_size = 5000
+        for start in range(0, count, batch_size):
+            Contract.objects.using(using).bulk_create(
+                [
+                    Contract(
+                        farmer=farmer,
+                        product=rng.choice(products),
+                        quantity=rng.randint(1, 100),
+                        price_per_unit=10,
+                        total_price=10,
+                        terms_and_conditions="-",
+                    )
+                    for _ in range(min(batch_size, count - start))
+                ]
+            )
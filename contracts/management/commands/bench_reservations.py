@@ -0,0 +1,81 @@
+import random
+from threading import Lock
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Min, Sum
+
+from contracts.reservations import InsufficientStock, reserve_many
+from core.bench import benchmark_database, make_bench_user, run_concurrently
+from products.models import Product
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure stock reservation throughput with concurrent workers on a "
+        "throwaway copy of --database, and check that nothing was oversold."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--attempts", type=int, default=500)
+        parser.add_argument("--products", type=int, default=20)
+        parser.add_argument("--stock", type=int, default=1000)
+        parser.add_argument("--batch", type=int, default=1)
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            self.run(using, options)
+
+    def run(self, using: str, options: dict) -> None:
+        farmer = make_bench_user(using, User.FARMER)
+        products = Product.objects.using(using).bulk_create(
+            Product(user=farmer, name=f"P{i}", price=1, stock=options["stock"])
+            for i in range(options["products"])
+        )
+        product_ids = [p.id for p in products]
+        initial = options["stock"] * len(product_ids)
+
+        lock = Lock()
+        counts = {"reserved": 0, "insufficient": 0, "locked": 0}
+
+        def worker(index: int) -> None:
+            rng = random.Random(index)
+            local = dict.fromkeys(counts, 0)
+            for _ in range(options["attempts"]):
+                batch = rng.sample(
+                    product_ids, min(options["batch"], len(product_ids))
+                )
+                try:
+                    reserve_many(dict.fromkeys(batch, 1), using=using)
+                    local["reserved"] += len(batch)
+                except InsufficientStock:
+                    local["insufficient"] += 1
+                except OperationalError:
+                    local["locked"] += 1
+            with lock:
+                for key, value in local.items():
+                    counts[key] += value
+
+        elapsed = run_concurrently(options["workers"], worker)
+
+        totals = Product.objects.using(using).aggregate(
+            remaining=Sum("stock"), lowest=Min("stock")
+        )
+        attempts = options["workers"] * options["attempts"]
+        vendor = connections[using].vendor
+        self.stdout.write(
+            f"{vendor}: {attempts} reservations by {options['workers']} workers "
+            f"in {elapsed:.2f}s ({attempts / elapsed:.0f}/s); "
+            f"{counts['reserved']} units reserved, "
+            f"{counts['insufficient']} rejected for stock, "
+            f"{counts['locked']} failed on lock timeouts"
+        )
+
+        oversold = initial - totals["remaining"] != counts["reserved"]
+        if totals["lowest"] < 0 or oversold:
+            self.stderr.write(self.style.ERROR(f"Stock is inconsistent: {totals}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No oversell detected."))
@@ -0,0 +1,76 @@
+from datetime import datetime
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from contracts.expiry import expire_contracts
+from model_utils import make_utc
+
+
+class Command(BaseCommand):
+    help = (
+        "Deactivate contracts whose end_date has passed and release their "
+        "stock, in bounded batches. Safe to run on a schedule."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches to yield to other writers.",
+        )
+        parser.add_argument(
+            "--max-batches", type=int, help="Stop after this many batches."
+        )
+        parser.add_argument(
+            "--after",
+            help="Resume after a cursor printed by a previous run "
+            "(<end_date ISO>,<contract id>).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        after = None
+        if options["after"]:
+            try:
+                end_date, pk = options["after"].rsplit(",", 1)
+                after = (make_utc(datetime.fromisoformat(end_date)), pk)
+            except ValueError:
+                raise CommandError("--after must look like <end_date ISO>,<id>")
+
+        started = perf_counter()
+        expired = released = batches = 0
+        for batch in expire_contracts(
+            batch_size=options["batch_size"],
+            after=after,
+            pause=options["pause"],
+            using=options["database"],
+        ):
+            batches += 1
+            expired += batch.expired
+            released += batch.released
+            end_date, pk = batch.cursor
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"batch {batches}: {batch.expired} contracts, "
+                    f"{batch.expired / batch.elapsed:,.0f} rows/s, "
+                    f"cursor {end_date.isoformat()},{pk}"
+                )
+            if options["max_batches"] and batches >= options["max_batches"]:
+                self.stdout.write(
+                    f"Stopped after {batches} batches; resume with "
+                    f"--after {end_date.isoformat()},{pk}"
+                )
+                break
+
+        elapsed = perf_counter() - started
+        rate = expired / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Expired {expired} contracts and released {released} units "
+                f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,30 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from contracts.stats import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the dashboard summary tables from Contract and report how many "
+        "rows had drifted. Meant to run periodically, e.g. nightly from cron."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--user", action="append", dest="users", help="Only these user ids."
+        )
+
+    def handle(self, *args, **options) -> None:
+        started = perf_counter()
+        drift = reconcile(options["users"], using=options["database"])
+        style = self.style.WARNING if drift else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"Reconciled dashboard stats in {perf_counter() - started:.2f}s; "
+                f"{drift} rows had drifted"
+            )
+        )
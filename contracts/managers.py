@@ -0,0 +1,77 @@
+from collections import defaultdict
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from django.db import models, router, transaction
+
+from contracts.reservations import reserve_stock
+from products.models import Product
+
+if TYPE_CHECKING:
+    from .models import Contract
+
+
+class ContractManager(models.Manager):
+    def bulk_create_priced(
+        self,
+        contracts: Iterable["Contract"],
+        batch_size: Optional[int] = None,
+    ) -> tuple[list["Contract"], dict[int, list[str]]]:
+        """Price, validate and insert many unsaved contracts at once.
+
+        All referenced products are loaded with one query, prices come from
+        the cached pricing rules (contracts.rules), stock is reserved
+        once per product rather than once per contract, and the valid rows go
+        through ``bulk_create``. Invalid rows are skipped and reported as
+        ``{input index: [messages]}`` instead of aborting the whole batch.
+        """
+        contracts = list(contracts)
+        using = self._db or router.db_for_write(self.model)
+        errors: dict[int, list[str]] = defaultdict(list)
+
+        products = Product.objects.using(using).in_bulk(
+            {c.product_id for c in contracts}
+        )
+
+        # Loaded once and cached across calls; pricing a row is a lookup.
+        from contracts.rules import get_pricing_rules
+
+        rules = get_pricing_rules(using)
+        by_product: dict[str, list[int]] = defaultdict(list)
+        for index, contract in enumerate(contracts):
+            product = products.get(contract.product_id)
+            if product is None:
+                errors[index].append(
+                    f"Product {contract.product_id} does not exist."
+                )
+                continue
+            low, high = product.min_quantity, product.max_quantity
+            if not low <= contract.quantity <= high:
+                errors[index].append(f"Minimum of {low} and at max {high}")
+            if not 0 <= contract.discount < 100:
+                errors[index].append("Discount must be between 0 and 100 percent.")
+            if index in errors:
+                continue
+
+            contract.product = product
+            rules.price(contract, product.price)
+            by_product[product.pk].append(index)
+
+        with transaction.atomic(using=using):
+            for product_id in sorted(by_product):
+                indexes = by_product[product_id]
+                quantity = sum(contracts[i].quantity for i in indexes)
+                if not reserve_stock(product_id, quantity, using=using):
+                    for i in indexes:
+                        errors[i].append(
+                            f"Not enough stock for product {product_id}."
+                        )
+
+            valid = [c for i, c in enumerate(contracts) if i not in errors]
+            created = self.using(using).bulk_create(valid, batch_size=batch_size)
+
+            # bulk_create skips the signals that keep dashboard stats current.
+            from contracts.stats import contract_row, record_changes
+
+            record_changes([], map(contract_row, created), using)
+
+        return created, dict(errors)
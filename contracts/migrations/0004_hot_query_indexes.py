@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0003_alter_contract_id'),
+        ('products', '0005_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['buyer', 'end_date'], name='contract_buyer_active_end'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['farmer', 'end_date'], name='contract_farmer_active_end'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['buyer', '-start_date'], name='contract_buyer_start'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['farmer', '-start_date'], name='contract_farmer_start'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date'], name='contract_active_end'),
+        ),
+    ]
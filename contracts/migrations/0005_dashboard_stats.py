@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:22
+
+import django.db.models.deletion
+import model_utils
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0004_hot_query_indexes'),
+        ('products', '0006_image_renditions'),
+        ('users', '0002_alter_address_id_alter_user_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('contracts', models.IntegerField(default=0)),
+                ('active_contracts', models.IntegerField(default=0)),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DashboardBreakdown',
+            fields=[
+                ('id', models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('contracts', models.IntegerField(default=0)),
+                ('active_contracts', models.IntegerField(default=0)),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('product', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='products.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_breakdown', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'product', 'month'), name='dashboard_breakdown_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:37
+
+import django.core.validators
+import django.db.models.deletion
+import model_utils
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0005_dashboard_stats'),
+        ('products', '0006_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contract',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.CreateModel(
+            name='BuyerRate',
+            fields=[
+                ('id', models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False)),
+                ('price_per_unit', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buyer_rates', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buyer_rates', to='products.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('buyer', 'product'), name='buyer_rate_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceTier',
+            fields=[
+                ('id', models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False)),
+                ('min_quantity', models.PositiveIntegerField()),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_tiers', to='products.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('product', 'min_quantity'), name='price_tier_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Promotion',
+            fields=[
+                ('id', models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False)),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promotions', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ends_at'], name='promotion_ends_at')],
+            },
+        ),
+    ]
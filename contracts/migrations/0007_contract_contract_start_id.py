@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0006_pricing_rules'),
+        ('products', '0007_price_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['-start_date', '-id'], name='contract_start_id'),
+        ),
+    ]
@@ -1,12 +1,21 @@
 from datetime import datetime, timedelta
-from django.db import models
+from django.db import models, router, transaction
 
 
+from contracts.managers import ContractManager
+from contracts.reservations import InsufficientStock, release_stock, reserve_stock
 from model_utils import aware_utcnow, generate_id
 from products.models import Product
 from users.models import User
 
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+
+
+# Saving any of these may change the stock a contract holds.
+STOCK_FIELDS: frozenset[str] = frozenset(
+    {"product", "product_id", "quantity", "is_active"}
+)
 
 
 def _default_contract_end_date() -> datetime:
@@ -16,7 +25,7 @@ def _default_contract_end_date() -> datetime:
 # Create your models here.
 class Contract(models.Model):
 
-    id: str = models.CharField(max_length=20, default=generate_id, primary_key=True)
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
 
     buyer: User = models.ForeignKey(
         User,
@@ -67,22 +76,214 @@ class Contract(models.Model):
     price_per_unit: float = models.DecimalField(max_digits=10, decimal_places=2)
     total_price: float = models.DecimalField(max_digits=12, decimal_places=2)
 
-    discount: float = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    # Percentage off, set by the pricing rules (contracts.rules).
+    discount: float = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+    )
 
     terms_and_conditions: str = models.TextField()
 
     is_active: bool = models.BooleanField(default=True)
 
+    objects = ContractManager()
+
+    class Meta:
+        indexes = [
+            # A buyer's / farmer's active contracts, by expiry.
+            models.Index(
+                fields=["buyer", "end_date"],
+                condition=models.Q(is_active=True),
+                name="contract_buyer_active_end",
+            ),
+            models.Index(
+                fields=["farmer", "end_date"],
+                condition=models.Q(is_active=True),
+                name="contract_farmer_active_end",
+            ),
+            # Contract history per party, newest first.
+            models.Index(fields=["buyer", "-start_date"], name="contract_buyer_start"),
+            models.Index(
+                fields=["farmer", "-start_date"], name="contract_farmer_start"
+            ),
+            # The admin changelist, newest first.
+            models.Index(fields=["-start_date", "-id"], name="contract_start_id"),
+            # Active contracts that have run past their end date.
+            models.Index(
+                fields=["end_date"],
+                condition=models.Q(is_active=True),
+                name="contract_active_end",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        contract = super().from_db(db, field_names, values)
+        contract._priced_for = contract.priced_for()
+        return contract
+
+    def priced_for(self) -> tuple:
+        return self.__dict__.get("product_id"), self.__dict__.get("quantity")
+
     def clean(self) -> None:
-        if self.product.max_quantity < self.quantity < self.product.min_quantity:
+        if not (
+            self.product.min_quantity <= self.quantity <= self.product.max_quantity
+        ):
             raise ValidationError(
                 f"Minimum of {self.product.min_quantity} and at max {self.product.max_quantity}"
             )
         return super().clean()
 
     def save(self, *a, **kw) -> None:
-        self.price_per_unit = self.product.price
-        self.total_price = self.price_per_unit * self.quantity
-        if self.discount > 0:
-            self.total_price(self.total_price / 100) * self.discount
-        super().save(*a, **kw)
+        using = kw.get("using") or router.db_for_write(type(self), instance=self)
+        adding = self._state.adding
+        # The price is agreed when the contract is made. Later saves leave it
+        # alone unless the product or quantity changed, and then re-price from
+        # the rules alone: the old discount may come from a promotion or tier
+        # that no longer applies.
+        if adding or getattr(self, "_priced_for", None) != self.priced_for():
+            from contracts.rules import get_pricing_rules
+
+            if not adding:
+                self.discount = 0
+            get_pricing_rules(using).price(self, self.product.price)
+        self._priced_for = self.priced_for()
+
+        update_fields = kw.get("update_fields")
+        if update_fields is not None and not STOCK_FIELDS.intersection(update_fields):
+            return super().save(*a, **kw)
+
+        # An active contract holds its quantity out of the product's stock
+        # (expire_contracts gives it back). The stored row says what is held
+        # now; it is swapped for what the saved row needs in the same
+        # transaction, so a failed save leaves the stock as it was.
+        with transaction.atomic(using=using):
+            held = None
+            if not adding:
+                held = (
+                    type(self)
+                    ._base_manager.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk, is_active=True)
+                    .values_list("product_id", "quantity")
+                    .first()
+                )
+            needed = (self.product_id, self.quantity) if self.is_active else None
+            if held != needed:
+                if held is not None:
+                    release_stock(*held, using=using)
+                if needed is not None and not reserve_stock(*needed, using=using):
+                    raise InsufficientStock([self.product_id])
+            super().save(*a, **kw)
+
+
+class DashboardSummary(models.Model):
+    """Running contract totals for one user (as buyer or farmer).
+
+    Maintained incrementally by ``contracts.stats`` and rebuilt from
+    ``Contract`` by the ``reconcile_dashboard_stats`` command.
+    """
+
+    user: User = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="dashboard_summary",
+    )
+    contracts: int = models.IntegerField(default=0)
+    active_contracts: int = models.IntegerField(default=0)
+    quantity: int = models.BigIntegerField(default=0)
+    amount: float = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+
+class DashboardBreakdown(models.Model):
+    """The same totals per product and calendar month (UTC) of ``start_date``."""
+
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
+    user: User = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="dashboard_breakdown"
+    )
+    # Deleting a product deletes its contracts, whose signals zero these rows;
+    # reconciliation then drops them. No constraint, so the two never race.
+    product: Product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    month = models.DateField()
+    contracts: int = models.IntegerField(default=0)
+    active_contracts: int = models.IntegerField(default=0)
+    quantity: int = models.BigIntegerField(default=0)
+    amount: float = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "product", "month"], name="dashboard_breakdown_key"
+            ),
+        ]
+
+
+class PriceTier(models.Model):
+    """Percentage off a product for contracts of at least ``min_quantity``."""
+
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
+    product: Product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="price_tiers"
+    )
+    min_quantity: int = models.PositiveIntegerField()
+    discount: float = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "min_quantity"], name="price_tier_key"
+            ),
+        ]
+
+
+class BuyerRate(models.Model):
+    """A unit price negotiated between one buyer and a product's farmer."""
+
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
+    buyer: User = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="buyer_rates"
+    )
+    product: Product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="buyer_rates"
+    )
+    price_per_unit: float = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["buyer", "product"], name="buyer_rate_key"),
+        ]
+
+
+class Promotion(models.Model):
+    """Percentage off a product for contracts started within a time window."""
+
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
+    product: Product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="promotions"
+    )
+    discount: float = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+    )
+    starts_at: datetime = models.DateTimeField()
+    ends_at: datetime = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Rules are loaded by ends_at, skipping promotions already over.
+            models.Index(fields=["ends_at"], name="promotion_ends_at"),
+        ]
@@ -0,0 +1,15 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+CENT = Decimal("0.01")
+
+
+def quantize_money(amount: Decimal) -> Decimal:
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def compute_total(price_per_unit: Decimal, quantity: int, discount: Decimal) -> Decimal:
+    """Line total with ``discount`` taken as a percentage off."""
+    total = Decimal(price_per_unit) * quantity
+    if discount:
+        total -= total * Decimal(discount) / 100
+    return quantize_money(total)
@@ -0,0 +1,33 @@
+from django.db.models import Q
+
+from contracts.models import Contract
+from core.query_audit import register
+from model_utils import aware_utcnow
+
+
+@register("contracts.buyer_active")
+def buyer_active():
+    return Contract.objects.filter(
+        buyer_id="0", is_active=True, end_date__gte=aware_utcnow()
+    )
+
+
+@register("contracts.farmer_active")
+def farmer_active():
+    return Contract.objects.filter(
+        farmer_id="0", is_active=True, end_date__gte=aware_utcnow()
+    )
+
+
+@register("contracts.history")
+def history():
+    return Contract.objects.filter(Q(buyer_id="0") | Q(farmer_id="0")).order_by(
+        "-start_date", "-id"
+    )[:20]
+
+
+@register("contracts.expired")
+def expired():
+    return Contract.objects.filter(
+        is_active=True, end_date__lt=aware_utcnow()
+    ).order_by("end_date")[:1000]
@@ -0,0 +1,103 @@
+from collections import Counter
+from typing import Iterable, Mapping, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models import BooleanField, Case, F, Value, When
+
+from products import live
+from products.cache import get_catalog_cache
+from products.models import Product
+
+
+class InsufficientStock(ValidationError):
+    def __init__(self, product_ids: Iterable[str]) -> None:
+        self.product_ids = list(product_ids)
+        super().__init__(
+            f"Not enough stock for product(s): {', '.join(self.product_ids)}"
+        )
+
+
+def _db(using: Optional[str]) -> str:
+    return using or router.db_for_write(Product)
+
+
+def _stock_changed(product_id: str, using: str) -> None:
+    # Queryset updates skip the post_save handlers that normally drop cached
+    # catalog entries and tell live subscribers.
+    def changed() -> None:
+        get_catalog_cache().invalidate_product(product_id)
+        live.publish_changed([product_id], using)
+
+    transaction.on_commit(changed, using=using)
+
+
+def reserve_stock(product_id: str, quantity: int, using: Optional[str] = None) -> bool:
+    """Take ``quantity`` units off a product's stock if that many are available.
+
+    This is a single ``UPDATE ... WHERE stock >= quantity`` so concurrent
+    callers can never oversell; ``in_stock`` is flipped in the same statement.
+    Both SET clauses see the pre-update ``stock``.
+    """
+    if quantity <= 0:
+        raise ValueError("Quantity must be positive.")
+
+    using = _db(using)
+    updated = (
+        Product.objects.using(using)
+        .filter(pk=product_id, stock__gte=quantity)
+        .update(
+            stock=F("stock") - quantity,
+            in_stock=Case(
+                When(stock__gt=quantity, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+    )
+    if updated:
+        _stock_changed(product_id, using)
+    return updated == 1
+
+
+def release_stock(product_id: str, quantity: int, using: Optional[str] = None) -> None:
+    if quantity <= 0:
+        raise ValueError("Quantity must be positive.")
+
+    using = _db(using)
+    Product.objects.using(using).filter(pk=product_id).update(
+        stock=F("stock") + quantity, in_stock=True
+    )
+    _stock_changed(product_id, using)
+
+
+def reserve_many(quantities: Mapping[str, int], using: Optional[str] = None) -> None:
+    """Reserve stock for several products atomically, all or nothing.
+
+    Raises ``InsufficientStock`` naming every product that could not be
+    reserved, after rolling back the ones that could.
+    """
+    using = _db(using)
+    failed = []
+    with transaction.atomic(using=using):
+        # A fixed lock order keeps two overlapping batches from deadlocking.
+        for product_id in sorted(quantities):
+            if not reserve_stock(product_id, quantities[product_id], using=using):
+                failed.append(product_id)
+        if failed:
+            raise InsufficientStock(failed)
+
+
+def release_many(quantities: Mapping[str, int], using: Optional[str] = None) -> None:
+    using = _db(using)
+    with transaction.atomic(using=using):
+        for product_id in sorted(quantities):
+            release_stock(product_id, quantities[product_id], using=using)
+
+
+def total_quantities(lines: Iterable[tuple[str, int]]) -> dict[str, int]:
+    """Fold ``(product_id, quantity)`` lines into one quantity per product."""
+    totals = Counter()
+    for product_id, quantity in lines:
+        totals[product_id] += quantity
+    return dict(totals)
@@ -0,0 +1,93 @@
+from typing import Literal, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from ninja import Router
+from ninja.errors import HttpError
+
+from contracts import exports
+from contracts.models import Contract
+from contracts.reservations import InsufficientStock
+from contracts.rules import quote_many
+from contracts.schemas import ContractIn, ContractOut, QuoteIn, QuoteResponse
+from core.exports import export_response
+from products.models import Product
+from users.auth import api_auth
+from users.models import User
+
+router = Router(tags=["contracts"], auth=api_auth)
+
+MAX_PAGE_SIZE: int = 100
+MAX_QUOTE_LINES: int = 1000
+
+
+UNCHECKED_FIELDS: frozenset[str] = frozenset(
+    {"buyer", "farmer", "product", "price_per_unit", "total_price"}
+)
+
+
+def build_contract(buyer: User, product: Product, payload: ContractIn) -> Contract:
+    contract = Contract(
+        buyer=buyer,
+        farmer_id=product.user_id,
+        product=product,
+        **payload.model_dump(exclude={"product_id"}),
+    )
+    # Field checks (payment method choices, lengths) and clean(), without
+    # queries: the related rows are already loaded and the price is set on
+    # save.
+    contract.full_clean(exclude=UNCHECKED_FIELDS, validate_unique=False)
+    return contract
+
+
+def quote_lines(user: User, payload: QuoteIn) -> dict:
+    if len(payload.lines) > MAX_QUOTE_LINES:
+        raise HttpError(400, f"At most {MAX_QUOTE_LINES} lines per quote")
+    quotes = quote_many(
+        [(line.product_id, line.quantity) for line in payload.lines], user.pk
+    )
+    return {
+        "items": [quote._asdict() if quote else None for quote in quotes],
+        "total_price": sum(quote.total_price for quote in quotes if quote),
+    }
+
+
+def contracts_for(user: User, is_active: Optional[bool]):
+    queryset = Contract.objects.filter(Q(buyer=user) | Q(farmer=user))
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+    return queryset.order_by("-start_date", "-id")
+
+
+@router.get("/", response=list[ContractOut])
+def list_contracts(request, is_active: Optional[bool] = None, limit: int = 20):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return list(contracts_for(request.auth, is_active)[:limit])
+
+
+@router.get("/export")
+def export_contracts(request, format: Literal["csv", "jsonl"] = "csv"):
+    queryset = exports.export_queryset(request.auth)
+    return export_response(request, queryset, exports.FIELDS, format, "contracts")
+
+
+@router.post("/quote", response=QuoteResponse)
+def quote(request, payload: QuoteIn):
+    return quote_lines(request.auth, payload)
+
+
+@router.post("/", response={201: ContractOut})
+def create_contract(request, payload: ContractIn):
+    if request.auth.user_type != User.BUYER:
+        raise HttpError(403, "Only buyers can create contracts")
+
+    product = get_object_or_404(Product, pk=payload.product_id)
+    try:
+        contract = build_contract(request.auth, product, payload)
+        contract.save()
+    except InsufficientStock as exc:
+        raise HttpError(409, exc.message)
+    except ValidationError as exc:
+        raise HttpError(400, "; ".join(exc.messages))
+    return 201, contract
@@ -0,0 +1,190 @@
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+from functools import lru_cache
+from threading import Lock
+from time import monotonic
+from typing import Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import router
+
+from contracts.models import BuyerRate, Contract, PriceTier, Promotion
+from contracts.pricing import compute_total
+from model_utils import aware_utcnow
+from products.models import Product
+
+
+class Quote(NamedTuple):
+    product_id: str
+    buyer_id: Optional[str]
+    quantity: int
+    price_per_unit: Decimal
+    discount: Decimal
+    total_price: Decimal
+
+
+class PricingRules:
+    """Volume tiers, buyer rates and promotions compiled into lookup tables.
+
+    A negotiated buyer rate replaces the product's list price. On top of it
+    the best single discount applies: the highest volume tier reached, a
+    promotion running at the contract's start, or a discount already on the
+    contract. Discounts do not stack. Quoting makes no queries.
+    """
+
+    def __init__(
+        self,
+        tiers: Iterable[tuple[str, int, Decimal]] = (),
+        rates: Iterable[tuple[str, str, Decimal]] = (),
+        promotions: Iterable[tuple] = (),
+    ) -> None:
+        # product -> ascending thresholds, and the discount from each one on.
+        self.tiers: dict[str, tuple[list[int], list[Decimal]]] = {}
+        for product_id, min_quantity, discount in sorted(tiers):
+            thresholds, discounts = self.tiers.setdefault(product_id, ([], []))
+            thresholds.append(min_quantity)
+            discounts.append(max(discount, discounts[-1] if discounts else 0))
+
+        self.rates: dict[tuple[str, str], Decimal] = {
+            (buyer_id, product_id): price for buyer_id, product_id, price in rates
+        }
+
+        self.promotions: dict[str, list[tuple]] = defaultdict(list)
+        for product_id, discount, starts_at, ends_at in promotions:
+            self.promotions[product_id].append((starts_at, ends_at, discount))
+
+    @classmethod
+    def load(cls, using: Optional[str] = None) -> "PricingRules":
+        using = using or router.db_for_read(PriceTier)
+        return cls(
+            PriceTier.objects.using(using).values_list(
+                "product_id", "min_quantity", "discount"
+            ),
+            BuyerRate.objects.using(using).values_list(
+                "buyer_id", "product_id", "price_per_unit"
+            ),
+            Promotion.objects.using(using)
+            .filter(ends_at__gt=aware_utcnow())
+            .values_list("product_id", "discount", "starts_at", "ends_at"),
+        )
+
+    def tier_discount(self, product_id: str, quantity: int) -> Decimal:
+        thresholds, discounts = self.tiers.get(product_id, ((), ()))
+        index = bisect_right(thresholds, quantity)
+        return discounts[index - 1] if index else Decimal(0)
+
+    def promotion_discount(self, product_id: str, at) -> Decimal:
+        return max(
+            (
+                discount
+                for starts_at, ends_at, discount in self.promotions.get(product_id, ())
+                if starts_at <= at < ends_at
+            ),
+            default=Decimal(0),
+        )
+
+    def quote(
+        self,
+        product_id: str,
+        list_price: Decimal,
+        quantity: int,
+        buyer_id: Optional[str] = None,
+        at=None,
+        discount: Decimal = Decimal(0),
+    ) -> Quote:
+        price = self.rates.get((buyer_id, product_id), list_price)
+        discount = max(
+            Decimal(discount),
+            self.tier_discount(product_id, quantity),
+            self.promotion_discount(product_id, at or aware_utcnow()),
+        )
+        return Quote(
+            product_id,
+            buyer_id,
+            quantity,
+            price,
+            discount,
+            compute_total(price, quantity, discount),
+        )
+
+    def price(self, contract: Contract, list_price: Decimal) -> Quote:
+        """Set the price fields of an unsaved ``contract``."""
+        quote = self.quote(
+            contract.product_id,
+            list_price,
+            contract.quantity,
+            contract.buyer_id,
+            contract.start_date,
+            contract.discount,
+        )
+        contract.price_per_unit = quote.price_per_unit
+        contract.discount = quote.discount
+        contract.total_price = quote.total_price
+        return quote
+
+
+class RuleCache:
+    """The compiled rules per database, reloaded after ``timeout`` seconds.
+
+    Rule changes in this process take effect immediately (see
+    contracts.signals); other processes pick them up when their copy expires.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._rules: dict[str, tuple[float, PricingRules]] = {}
+        self._lock = Lock()
+
+    def get(self, using: Optional[str] = None) -> PricingRules:
+        using = using or router.db_for_read(PriceTier)
+        entry = self._rules.get(using)
+        if entry is not None and entry[0] > monotonic():
+            return entry[1]
+        with self._lock:
+            entry = self._rules.get(using)
+            if entry is None or entry[0] <= monotonic():
+                entry = (monotonic() + self.timeout, PricingRules.load(using))
+                self._rules[using] = entry
+            return entry[1]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._rules.clear()
+
+
+@lru_cache
+def get_rule_cache() -> RuleCache:
+    options = getattr(settings, "PRICING_RULES", {})
+    return RuleCache(timeout=options.get("TIMEOUT", 60))
+
+
+def get_pricing_rules(using: Optional[str] = None) -> PricingRules:
+    return get_rule_cache().get(using)
+
+
+def quote_many(
+    lines: Iterable[tuple[str, int]],
+    buyer_id: Optional[str] = None,
+    at=None,
+    using: Optional[str] = None,
+) -> list[Optional[Quote]]:
+    """Quote (product id, quantity) lines for one buyer with a single query.
+
+    Lines for products that do not exist quote as ``None``.
+    """
+    lines = list(lines)
+    using = using or router.db_for_read(Product)
+    prices = dict(
+        Product.objects.using(using)
+        .filter(pk__in={product_id for product_id, _ in lines})
+        .values_list("id", "price")
+    )
+    rules = get_pricing_rules(using)
+    at = at or aware_utcnow()
+    return [
+        rules.quote(product_id, prices[product_id], quantity, buyer_id, at)
+        if product_id in prices
+        else None
+        for product_id, quantity in lines
+    ]
@@ -0,0 +1,45 @@
+from decimal import Decimal
+from typing import Optional
+
+from ninja import Field, ModelSchema, Schema
+
+from contracts.models import Contract
+
+
+class ContractIn(Schema):
+    product_id: str
+    quantity: int
+    # No discount: only the pricing rules (contracts.rules) set it.
+    payment_method: str = Contract.UPI_PAYMENT
+    payment_terms: Optional[str] = None
+    delivery_terms: Optional[str] = None
+    terms_and_conditions: str
+
+
+class ContractOut(ModelSchema):
+    class Meta:
+        model = Contract
+        fields = "__all__"
+
+
+class QuoteLineIn(Schema):
+    product_id: str
+    quantity: int = Field(..., ge=1)
+
+
+class QuoteIn(Schema):
+    lines: list[QuoteLineIn]
+
+
+class QuoteOut(Schema):
+    product_id: str
+    quantity: int
+    price_per_unit: Decimal
+    discount: Decimal
+    total_price: Decimal
+
+
+class QuoteResponse(Schema):
+    # One entry per line; None for products that do not exist.
+    items: list[Optional[QuoteOut]]
+    total_price: Decimal
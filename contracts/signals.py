@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from contracts.models import BuyerRate, Contract, PriceTier, Promotion
+from contracts.reservations import release_stock
+from contracts.rules import get_rule_cache
+from contracts.stats import FIELDS, contract_row, record_changes
+
+PRODUCT, ACTIVE, QUANTITY = (
+    FIELDS.index(field) for field in ("product_id", "is_active", "quantity")
+)
+
+
+@receiver(pre_save, sender=Contract)
+@receiver(pre_delete, sender=Contract)
+def remember_stats_row(sender, instance: Contract, using: str, **kwargs) -> None:
+    # The stored row rather than the instance, which may be stale (e.g. after
+    # expire_contracts), so exactly what the row contributed is taken back.
+    instance._stats_before = None
+    if not instance._state.adding:
+        instance._stats_before = (
+            Contract.objects.using(using)
+            .filter(pk=instance.pk)
+            .values_list(*FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Contract)
+def update_dashboard_stats(sender, instance: Contract, using: str, **kwargs) -> None:
+    before = getattr(instance, "_stats_before", None)
+    record_changes([before] if before else [], [contract_row(instance)], using)
+
+
+@receiver(post_delete, sender=Contract)
+def remove_dashboard_stats(sender, instance: Contract, using: str, **kwargs) -> None:
+    before = getattr(instance, "_stats_before", None)
+    record_changes([before] if before else [], [], using)
+
+
+@receiver(post_delete, sender=Contract)
+def release_deleted_stock(sender, instance: Contract, using: str, **kwargs) -> None:
+    # Only active contracts still hold stock; expired ones gave it back.
+    before = getattr(instance, "_stats_before", None)
+    if before and before[ACTIVE]:
+        release_stock(before[PRODUCT], before[QUANTITY], using=using)
+
+
+@receiver(post_save, sender=PriceTier)
+@receiver(post_delete, sender=PriceTier)
+@receiver(post_save, sender=BuyerRate)
+@receiver(post_delete, sender=BuyerRate)
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def invalidate_pricing_rules(sender, using: str, **kwargs) -> None:
+    # After commit, or a reload in between would cache the uncommitted rules
+    # (or keep them after a rollback).
+    transaction.on_commit(get_rule_cache().invalidate, using=using)
@@ -0,0 +1,224 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from contracts.models import Contract, DashboardBreakdown, DashboardSummary
+from users import panels
+from users.models import User
+
+# The Contract columns a summary depends on, in the order ``tally`` expects.
+FIELDS: tuple[str, ...] = (
+    "buyer_id",
+    "farmer_id",
+    "product_id",
+    "start_date",
+    "is_active",
+    "quantity",
+    "total_price",
+)
+
+COUNTERS: tuple[str, ...] = ("contracts", "active_contracts", "quantity", "amount")
+
+TOP_PRODUCTS: int = 10
+RECENT_MONTHS: int = 12
+
+Key = tuple[str, str, date]
+
+
+def month_of(moment: datetime) -> date:
+    moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def contract_row(contract: Contract) -> tuple:
+    return tuple(getattr(contract, field) for field in FIELDS)
+
+
+def tally(
+    rows: Iterable[tuple], sign: int, into: Optional[dict[Key, list]] = None
+) -> dict[Key, list]:
+    """Add ``sign`` times each contract row to per-(user, product, month) deltas."""
+    deltas = into if into is not None else defaultdict(lambda: [0, 0, 0, Decimal(0)])
+    for buyer, farmer, product, start, active, quantity, total in rows:
+        month = month_of(start)
+        for user in {buyer, farmer} - {None}:
+            delta = deltas[user, product, month]
+            delta[0] += sign
+            delta[1] += sign * active
+            delta[2] += sign * quantity
+            delta[3] += sign * total
+    return deltas
+
+
+def _upsert(model, key: dict, delta: list, using: str) -> None:
+    manager = model.objects.using(using)
+    increments = {field: F(field) + value for field, value in zip(COUNTERS, delta)}
+    if manager.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic(using=using):
+            manager.create(**key, **dict(zip(COUNTERS, delta)))
+    except IntegrityError:
+        # Another transaction created the row first.
+        manager.filter(**key).update(**increments)
+
+
+def apply(deltas: dict[Key, list], using: Optional[str] = None) -> None:
+    """Add ``deltas`` to the breakdown rows and the per-user summaries.
+
+    Each row is one ``UPDATE ... SET x = x + delta``, so concurrent writers
+    never overwrite each other's counts.
+    """
+    using = using or router.db_for_write(DashboardSummary)
+    totals: dict[str, list] = defaultdict(lambda: [0, 0, 0, Decimal(0)])
+    for (user, product, month), delta in deltas.items():
+        if not any(delta):
+            continue
+        key = {"user_id": user, "product_id": product, "month": month}
+        _upsert(DashboardBreakdown, key, delta, using)
+        total = totals[user]
+        for i, value in enumerate(delta):
+            total[i] += value
+    for user, delta in totals.items():
+        if any(delta):
+            _upsert(DashboardSummary, {"user_id": user}, delta, using)
+    if totals:
+        _invalidate_panels(totals, using)
+
+
+def _invalidate_panels(users: Iterable[str], using: str) -> None:
+    users = list(users)
+    # After commit, or a dashboard rendered in between could cache the old
+    # numbers under the new version.
+    transaction.on_commit(lambda: panels.invalidate(users), using=using)
+
+
+def record_changes(
+    before: Iterable[tuple], after: Iterable[tuple], using: Optional[str] = None
+) -> None:
+    """Replace the contribution of contract rows ``before`` with ``after``.
+
+    Used for writes that skip model signals (``bulk_create``, ``update``).
+    """
+    deltas = tally(before, -1)
+    apply(tally(after, 1, into=deltas), using)
+
+
+def _aggregate(user_field: str, users: Optional[list[str]], using: str):
+    queryset = Contract.objects.using(using).exclude(**{user_field: None})
+    if users is not None:
+        queryset = queryset.filter(**{f"{user_field}__in": users})
+    return (
+        queryset.annotate(month=TruncMonth("start_date", tzinfo=timezone.utc))
+        .values_list(user_field, "product_id", "month")
+        .annotate(
+            contracts=Count("id"),
+            active_contracts=Count("id", filter=Q(is_active=True)),
+            total_quantity=Sum("quantity"),
+            amount=Sum("total_price"),
+        )
+        .order_by()
+    )
+
+
+def reconcile(
+    users: Optional[Iterable[str]] = None, using: Optional[str] = None
+) -> int:
+    """Rebuild the stored stats from ``Contract``; return how many rows drifted.
+
+    Increments made by other transactions while this runs may be lost, but the
+    next reconcile recomputes them from the contracts themselves.
+    """
+    using = using or router.db_for_write(DashboardSummary)
+    users = list(users) if users is not None else None
+    breakdown = DashboardBreakdown.objects.using(using)
+    summaries = DashboardSummary.objects.using(using)
+    if users is not None:
+        breakdown = breakdown.filter(user_id__in=users)
+        summaries = summaries.filter(user_id__in=users)
+
+    with transaction.atomic(using=using):
+        expected: dict[Key, list] = defaultdict(lambda: [0, 0, 0, Decimal(0)])
+        for user_field in ("buyer_id", "farmer_id"):
+            for user, product, month, *counters in _aggregate(
+                user_field, users, using
+            ):
+                row = expected[user, product, month.date()]
+                for i, value in enumerate(counters):
+                    row[i] += value or 0
+
+        stored = {
+            (row[0], row[1], row[2]): list(row[3:])
+            for row in breakdown.values_list(
+                "user_id", "product_id", "month", *COUNTERS
+            )
+        }
+        drift = sum(stored.get(key) != value for key, value in expected.items())
+        drift += sum(any(stored[key]) for key in stored.keys() - expected.keys())
+
+        totals: dict[str, list] = defaultdict(lambda: [0, 0, 0, Decimal(0)])
+        for (user, _, _), value in expected.items():
+            for i, counter in enumerate(value):
+                totals[user][i] += counter
+
+        breakdown.delete()
+        summaries.delete()
+        breakdown.bulk_create(
+            DashboardBreakdown(
+                user_id=user,
+                product_id=product,
+                month=month,
+                **dict(zip(COUNTERS, value)),
+            )
+            for (user, product, month), value in expected.items()
+        )
+        summaries.bulk_create(
+            DashboardSummary(user_id=user, **dict(zip(COUNTERS, value)))
+            for user, value in totals.items()
+        )
+        if drift:
+            _invalidate_panels(
+                {key[0] for key in expected.keys() | stored.keys()}, using
+            )
+    return drift
+
+
+def dashboard_stats(user: User, using: Optional[str] = None) -> dict:
+    """Totals plus the top products and recent months, in three small queries.
+
+    The cost depends on how many products and months a user has, never on
+    how many contracts.
+    """
+    using = using or router.db_for_read(DashboardSummary)
+    summary = DashboardSummary.objects.using(using).filter(user=user).first()
+    breakdown = DashboardBreakdown.objects.using(using).filter(user=user)
+    by_product = list(
+        breakdown.values("product_id", "product__name")
+        .annotate(
+            total_contracts=Sum("contracts"),
+            total_quantity=Sum("quantity"),
+            total_amount=Sum("amount"),
+        )
+        .filter(total_contracts__gt=0)
+        .order_by("-total_amount")[:TOP_PRODUCTS]
+    )
+    by_month = list(
+        breakdown.values("month")
+        .annotate(
+            total_contracts=Sum("contracts"),
+            total_quantity=Sum("quantity"),
+            total_amount=Sum("amount"),
+        )
+        .filter(total_contracts__gt=0)
+        .order_by("-month")[:RECENT_MONTHS]
+    )
+    return {
+        "summary": summary or DashboardSummary(user=user),
+        "by_product": by_product,
+        "by_month": by_month,
+    }
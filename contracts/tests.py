@@ -1,3 +1,626 @@
-from django.test import TestCase
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import path
+from ninja import NinjaAPI
+
+from contracts.async_router import router as async_router
+from contracts.expiry import expire_contracts
+from contracts.models import (
+    BuyerRate,
+    Contract,
+    DashboardBreakdown,
+    DashboardSummary,
+    PriceTier,
+    Promotion,
+)
+from contracts.reservations import (
+    InsufficientStock,
+    release_stock,
+    reserve_many,
+    reserve_stock,
+)
+from contracts.rules import get_pricing_rules, get_rule_cache, quote_many
+from contracts.stats import dashboard_stats, reconcile
+from model_utils import aware_utcnow
+from products.models import Product
+from users.models import User
+
+
+def make_user(user_type: str, suffix: str) -> User:
+    return User.objects.create_user(
+        email=f"{user_type}{suffix}@example.com",
+        phone=f"{user_type}{suffix}",
+        password="password",
+        date_of_birth=date(1990, 1, 1),
+        user_type=user_type,
+    )
+
+
+class StockReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.buyer = make_user(User.BUYER, "1")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=5
+        )
+        cls.rice = Product.objects.create(
+            user=cls.farmer, name="Rice", price=20, stock=2
+        )
+
+    def test_reserve_decrements_and_flips_in_stock(self) -> None:
+        self.assertTrue(reserve_stock(self.wheat.id, 3))
+        self.wheat.refresh_from_db()
+        self.assertEqual((self.wheat.stock, self.wheat.in_stock), (2, True))
+
+        self.assertTrue(reserve_stock(self.wheat.id, 2))
+        self.wheat.refresh_from_db()
+        self.assertEqual((self.wheat.stock, self.wheat.in_stock), (0, False))
+
+    def test_reserve_never_oversells(self) -> None:
+        self.assertFalse(reserve_stock(self.rice.id, 3))
+        self.rice.refresh_from_db()
+        self.assertEqual(self.rice.stock, 2)
+
+    def test_reserve_many_is_all_or_nothing(self) -> None:
+        with self.assertRaises(InsufficientStock) as ctx:
+            reserve_many({self.wheat.id: 1, self.rice.id: 3})
+        self.assertEqual(ctx.exception.product_ids, [self.rice.id])
+        self.wheat.refresh_from_db()
+        self.assertEqual(self.wheat.stock, 5)
+
+    def test_new_contract_reserves_stock(self) -> None:
+        contract = Contract.objects.create(
+            buyer=self.buyer,
+            farmer=self.farmer,
+            product=self.wheat,
+            quantity=4,
+            terms_and_conditions="-",
+        )
+        self.wheat.refresh_from_db()
+        self.assertEqual(self.wheat.stock, 1)
+
+        contract.payment_terms = "Net 30"
+        contract.save()
+        self.wheat.refresh_from_db()
+        self.assertEqual(self.wheat.stock, 1)
+
+        with self.assertRaises(InsufficientStock):
+            Contract.objects.create(
+                product=self.wheat, quantity=2, terms_and_conditions="-"
+            )
+        self.assertEqual(Contract.objects.count(), 1)
+
+    def stock(self) -> tuple[int, int]:
+        self.wheat.refresh_from_db()
+        self.rice.refresh_from_db()
+        return self.wheat.stock, self.rice.stock
+
+    def test_edits_move_the_reservation(self) -> None:
+        contract = Contract.objects.create(
+            product=self.wheat, quantity=2, terms_and_conditions="-"
+        )
+        self.assertEqual(self.stock(), (3, 2))
+        contract.quantity = 4
+        contract.save()
+        self.assertEqual(self.stock(), (1, 2))
+
+        contract.product, contract.quantity = self.rice, 2
+        contract.save()
+        self.assertEqual(self.stock(), (5, 0))
+
+        contract.quantity = 3
+        with self.assertRaises(InsufficientStock):
+            contract.save()
+        self.assertEqual(self.stock(), (5, 0))
+        contract.refresh_from_db()
+        self.assertEqual(contract.quantity, 2)
+
+    def test_deactivating_reactivating_and_deleting(self) -> None:
+        contract = Contract.objects.create(
+            product=self.wheat, quantity=4, terms_and_conditions="-"
+        )
+        contract.is_active = False
+        contract.save()
+        self.assertEqual(self.stock(), (5, 2))
+        contract.is_active = True
+        contract.save()
+        self.assertEqual(self.stock(), (1, 2))
+
+        contract.delete()
+        self.assertEqual(self.stock(), (5, 2))
+        # An expired contract gave its stock back already.
+        expired = Contract.objects.create(
+            product=self.rice, quantity=2, terms_and_conditions="-"
+        )
+        Contract.objects.filter(pk=expired.pk).update(is_active=False)
+        release_stock(self.rice.id, 2)
+        expired.delete()
+        self.assertEqual(self.stock(), (5, 2))
+
+
+class BulkContractTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.buyer = make_user(User.BUYER, "1")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=Decimal("12.35"), stock=100
+        )
+        cls.rice = Product.objects.create(
+            user=cls.farmer, name="Rice", price=20, stock=3, max_quantity=5
+        )
+
+    def contract(self, product_id: str, quantity: int, **kw) -> Contract:
+        return Contract(
+            buyer=self.buyer,
+            product_id=product_id,
+            quantity=quantity,
+            terms_and_conditions="-",
+            **kw,
+        )
+
+    def test_discount_is_applied_as_a_percentage(self) -> None:
+        contract = Contract.objects.create(
+            buyer=self.buyer,
+            product=self.wheat,
+            quantity=3,
+            discount=Decimal("2.5"),
+            terms_and_conditions="-",
+        )
+        self.assertEqual(contract.total_price, Decimal("36.12"))
+
+    def test_prices_valid_rows_and_reports_the_rest(self) -> None:
+        rows = [
+            self.contract(self.wheat.id, 10, discount=Decimal("5")),
+            self.contract(self.rice.id, 2),
+            self.contract(self.rice.id, 2),
+            self.contract(self.wheat.id, 0),
+            self.contract("missing", 1),
+        ]
+        get_rule_cache().invalidate()
+        get_pricing_rules()
+        # Product lookup, one UPDATE per product, one INSERT, plus savepoints;
+        # then the buyer's new stats rows: UPDATE, then a savepointed INSERT,
+        # once for the month breakdown and once for the summary.
+        with self.assertNumQueries(14):
+            created, errors = Contract.objects.bulk_create_priced(rows)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].price_per_unit, Decimal("12.35"))
+        self.assertEqual(created[0].total_price, Decimal("117.33"))
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertIn("Not enough stock", errors[1][0])
+
+        self.wheat.refresh_from_db()
+        self.rice.refresh_from_db()
+        self.assertEqual((self.wheat.stock, self.rice.stock), (90, 3))
+
+
+class PricingRulesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.buyer = make_user(User.BUYER, "1")
+        cls.other = make_user(User.BUYER, "2")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=1000, max_quantity=1000
+        )
+        cls.rice = Product.objects.create(
+            user=cls.farmer, name="Rice", price=20, stock=1000
+        )
+        for min_quantity, discount in [(100, 10), (10, 5), (500, 8)]:
+            PriceTier.objects.create(
+                product=cls.wheat, min_quantity=min_quantity, discount=discount
+            )
+        BuyerRate.objects.create(buyer=cls.buyer, product=cls.rice, price_per_unit=18)
+        now = aware_utcnow()
+        Promotion.objects.create(
+            product=cls.rice,
+            discount=15,
+            starts_at=now - timedelta(days=1),
+            ends_at=now + timedelta(days=1),
+        )
+        Promotion.objects.create(
+            product=cls.wheat,
+            discount=50,
+            starts_at=now + timedelta(days=1),
+            ends_at=now + timedelta(days=2),
+        )
+
+    def setUp(self) -> None:
+        get_rule_cache().invalidate()
+
+    def test_best_single_rule_applies(self) -> None:
+        rules = get_pricing_rules()
+        self.assertEqual(rules.tier_discount(self.wheat.id, 9), 0)
+        self.assertEqual(rules.tier_discount(self.wheat.id, 10), 5)
+        self.assertEqual(rules.tier_discount(self.wheat.id, 499), 10)
+        # A higher threshold never lowers the discount.
+        self.assertEqual(rules.tier_discount(self.wheat.id, 500), 10)
+
+        rice = rules.quote(self.rice.id, Decimal(20), 10, self.buyer.id)
+        self.assertEqual(
+            (rice.price_per_unit, rice.discount, rice.total_price),
+            (18, 15, Decimal("153.00")),
+        )
+        rice = rules.quote(self.rice.id, Decimal(20), 10, self.other.id)
+        self.assertEqual(rice.total_price, Decimal("170.00"))
+
+        later = aware_utcnow() + timedelta(days=1, hours=1)
+        wheat = rules.quote(self.wheat.id, Decimal(10), 1, at=later)
+        self.assertEqual(wheat.discount, 50)
+
+    def test_quote_many_is_one_query_with_warm_rules(self) -> None:
+        get_pricing_rules()
+        lines = [(self.wheat.id, q) for q in range(1, 200)] + [("missing", 1)]
+        with self.assertNumQueries(1):
+            quotes = quote_many(lines, self.buyer.id)
+        self.assertEqual(quotes[99].total_price, Decimal("900.00"))
+        self.assertIsNone(quotes[-1])
+
+    def test_contracts_are_priced_by_the_rules(self) -> None:
+        contract = Contract.objects.create(
+            buyer=self.buyer,
+            product=self.wheat,
+            quantity=100,
+            terms_and_conditions="-",
+        )
+        self.assertEqual(
+            (contract.discount, contract.total_price), (10, Decimal("900.00"))
+        )
+
+        created, errors = Contract.objects.bulk_create_priced(
+            Contract(
+                buyer=self.buyer,
+                product_id=self.rice.id,
+                quantity=2,
+                terms_and_conditions="-",
+            )
+            for _ in range(3)
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual([c.total_price for c in created], [Decimal("30.60")] * 3)
+
+    def test_rule_changes_invalidate_the_cache(self) -> None:
+        get_pricing_rules()
+        with self.captureOnCommitCallbacks(execute=True):
+            PriceTier.objects.create(product=self.rice, min_quantity=1, discount=20)
+        self.assertEqual(get_pricing_rules().tier_discount(self.rice.id, 1), 20)
+
+    def test_saving_a_contract_keeps_its_agreed_price(self) -> None:
+        contract = Contract.objects.create(
+            buyer=self.buyer,
+            product=self.rice,
+            quantity=10,
+            terms_and_conditions="-",
+        )
+        self.assertEqual(contract.discount, 15)
+        # The promotion ends; a later save must not re-price the contract.
+        with self.captureOnCommitCallbacks(execute=True):
+            Promotion.objects.filter(product=self.rice).delete()
+        contract.terms_and_conditions = "Revised"
+        contract.save()
+        contract.refresh_from_db()
+        self.assertEqual(
+            (contract.discount, contract.total_price), (15, Decimal("153.00"))
+        )
+
+        contract.quantity = 20
+        contract.save()
+        self.assertEqual(
+            (contract.discount, contract.total_price), (0, Decimal("360.00"))
+        )
+
+    def test_quote_quantities_must_be_positive(self) -> None:
+        self.client.force_login(self.buyer)
+        for quantity in (0, -5):
+            response = self.client.post(
+                "/api/contracts/quote",
+                {"lines": [{"product_id": self.wheat.id, "quantity": quantity}]},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 422)
+
+    def test_quote_endpoint(self) -> None:
+        self.client.force_login(self.buyer)
+        response = self.client.post(
+            "/api/contracts/quote",
+            {
+                "lines": [
+                    {"product_id": self.wheat.id, "quantity": 10},
+                    {"product_id": self.rice.id, "quantity": 1},
+                    {"product_id": "missing", "quantity": 1},
+                ]
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(Decimal(body["items"][0]["total_price"]), Decimal("95"))
+        self.assertEqual(Decimal(body["items"][1]["price_per_unit"]), 18)
+        self.assertIsNone(body["items"][2])
+        self.assertEqual(Decimal(body["total_price"]), Decimal("110.30"))
+
+
+class ContractAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.buyer = make_user(User.BUYER, "1")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=5
+        )
+
+    def payload(self, quantity: int) -> dict:
+        return {
+            "product_id": self.wheat.id,
+            "quantity": quantity,
+            "terms_and_conditions": "Standard",
+        }
+
+    def test_buyer_creates_and_lists_contracts(self) -> None:
+        self.client.force_login(self.buyer)
+        response = self.client.post(
+            "/api/contracts/", self.payload(2), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["farmer"], self.farmer.id)
+        self.assertEqual(Decimal(response.json()["total_price"]), 20)
+
+        response = self.client.post(
+            "/api/contracts/", self.payload(4), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 409)
+
+        self.client.force_login(self.farmer)
+        self.assertEqual(len(self.client.get("/api/contracts/").json()), 1)
+
+    def test_buyers_cannot_set_their_own_discount(self) -> None:
+        self.client.force_login(self.buyer)
+        response = self.client.post(
+            "/api/contracts/",
+            {**self.payload(2), "discount": "99"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.json()["discount"]), 0)
+        self.assertEqual(Decimal(response.json()["total_price"]), 20)
+
+    def test_rejects_unknown_payment_methods(self) -> None:
+        self.client.force_login(self.buyer)
+        response = self.client.post(
+            "/api/contracts/",
+            {**self.payload(2), "payment_method": "barter-and-promises"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("not a valid choice", response.json()["detail"])
+        self.assertFalse(Contract.objects.exists())
+        self.wheat.refresh_from_db()
+        self.assertEqual(self.wheat.stock, 5)
+
+    def test_requires_login(self) -> None:
+        self.assertEqual(self.client.get("/api/contracts/").status_code, 401)
+
+
+# A router can only be mounted once; under ASYNC_VIEWS core.urls serves it.
+if settings.ASYNC_VIEWS:
+    ASYNC_URLCONF = "core.urls"
+else:
+    async_api = NinjaAPI(urls_namespace="contracts-async-test")
+    async_api.add_router("/contracts/", async_router)
+    urlpatterns = [path("api/", async_api.urls)]
+    ASYNC_URLCONF = __name__
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+class AsyncContractAPITests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.farmer = make_user(User.FARMER, "1")
+        self.buyer = make_user(User.BUYER, "1")
+        self.wheat = Product.objects.create(
+            user=self.farmer, name="Wheat", price=10, stock=5
+        )
+
+    async def test_create_and_list(self) -> None:
+        payload = {
+            "product_id": self.wheat.id,
+            "quantity": 3,
+            "terms_and_conditions": "Standard",
+        }
+        await self.async_client.aforce_login(self.buyer)
+        response = await self.async_client.post(
+            "/api/contracts/", payload, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+
+        await self.async_client.aforce_login(self.farmer)
+        response = await self.async_client.get("/api/contracts/")
+        self.assertEqual([c["quantity"] for c in response.json()], [3])
+
+        await self.wheat.arefresh_from_db()
+        self.assertEqual(self.wheat.stock, 2)
+
+    async def test_export_streams_asynchronously(self) -> None:
+        await Contract.objects.acreate(
+            buyer=self.buyer, product=self.wheat, quantity=1, terms_and_conditions="-"
+        )
+        await self.async_client.aforce_login(self.buyer)
+        response = await self.async_client.get("/api/contracts/export")
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), 2)
+
+
+class ContractExpiryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=100
+        )
+        now = aware_utcnow()
+        cls.expired = [
+            Contract.objects.create(
+                product=cls.wheat,
+                quantity=2,
+                end_date=now - timedelta(days=i + 1),
+                terms_and_conditions="-",
+            )
+            for i in range(5)
+        ]
+        cls.current = Contract.objects.create(
+            product=cls.wheat, quantity=3, terms_and_conditions="-"
+        )
+
+    def test_expires_in_batches_and_releases_stock(self) -> None:
+        batches = list(expire_contracts(batch_size=2))
+        self.assertEqual([b.expired for b in batches], [2, 2, 1])
+        self.assertEqual(
+            set(Contract.objects.filter(is_active=True)), {self.current}
+        )
+        self.wheat.refresh_from_db()
+        self.assertEqual(self.wheat.stock, 100 - 3)
+
+    def test_resumes_from_cursor(self) -> None:
+        first = next(expire_contracts(batch_size=2))
+        out = StringIO()
+        end_date, pk = first.cursor
+        call_command(
+            "expire_contracts", after=f"{end_date.isoformat()},{pk}", stdout=out
+        )
+        self.assertIn("Expired 3 contracts and released 6 units", out.getvalue())
+        self.assertEqual(Contract.objects.filter(is_active=True).count(), 1)
+
+    def test_reservation_invalidates_cached_product(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            reserve_stock(self.wheat.id, 1)
+        self.assertEqual(len(callbacks), 1)
+
+
+class ContractExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.buyer = make_user(User.BUYER, "1")
+        cls.other = make_user(User.BUYER, "2")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=50
+        )
+        for buyer in (cls.buyer, cls.buyer, cls.other):
+            Contract.objects.create(
+                buyer=buyer,
+                farmer=cls.farmer,
+                product=cls.wheat,
+                quantity=2,
+                terms_and_conditions="-",
+            )
+
+    def test_csv_export_is_streamed_and_scoped_to_the_user(self) -> None:
+        self.client.force_login(self.buyer)
+        response = self.client.get("/api/contracts/export")
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "buyer_id", "farmer_id"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn("Wheat", lines[1])
+
+    def test_jsonl_export_for_farmer(self) -> None:
+        self.client.force_login(self.farmer)
+        response = self.client.get("/api/contracts/export", {"format": "jsonl"})
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["total_price"], "20.00")
+
+    def test_management_command(self) -> None:
+        out = StringIO()
+        call_command("export", "contracts", "--format", "jsonl", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+
+class DashboardStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_user(User.FARMER, "1")
+        cls.buyer = make_user(User.BUYER, "1")
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=100
+        )
+        cls.rice = Product.objects.create(
+            user=cls.farmer, name="Rice", price=20, stock=100
+        )
+
+    def contract(self, product: Product, quantity: int, **kw) -> Contract:
+        return Contract.objects.create(
+            buyer=self.buyer,
+            farmer=self.farmer,
+            product=product,
+            quantity=quantity,
+            terms_and_conditions="-",
+            **kw,
+        )
+
+    def summary(self, user: User) -> tuple:
+        row = DashboardSummary.objects.get(user=user)
+        return row.contracts, row.active_contracts, row.quantity, row.amount
+
+    def test_signals_keep_stats_in_step_with_contracts(self) -> None:
+        now = aware_utcnow()
+        first = self.contract(self.wheat, 2)
+        self.contract(self.rice, 1, start_date=now - timedelta(days=62))
+        self.assertEqual(self.summary(self.farmer), (2, 2, 3, Decimal("40")))
+        self.assertEqual(self.summary(self.buyer), self.summary(self.farmer))
+
+        first.quantity = 5
+        first.save()
+        self.assertEqual(self.summary(self.farmer), (2, 2, 6, Decimal("70")))
+
+        expired = self.contract(self.wheat, 1, end_date=now - timedelta(days=1))
+        list(expire_contracts(now=now))
+        self.assertEqual(self.summary(self.farmer), (3, 2, 7, Decimal("80")))
+
+        expired.delete()
+        self.assertEqual(self.summary(self.farmer), (2, 2, 6, Decimal("70")))
+        self.assertEqual(reconcile(), 0)
+
+    def test_reconcile_repairs_drift(self) -> None:
+        self.contract(self.wheat, 3)
+        Contract.objects.update(quantity=4)
+        DashboardBreakdown.objects.create(
+            user=self.farmer, product=self.rice, month=date(2020, 1, 1), contracts=1
+        )
+
+        self.assertEqual(reconcile([self.farmer.id]), 2)
+        self.assertEqual(self.summary(self.farmer), (1, 1, 4, Decimal("30")))
+        # Other users are left alone when reconciling a subset.
+        self.assertEqual(self.summary(self.buyer), (1, 1, 3, Decimal("30")))
+
+        out = StringIO()
+        call_command("reconcile_dashboard_stats", stdout=out)
+        self.assertIn("1 rows had drifted", out.getvalue())
+
+    def test_dashboard_reads_a_fixed_number_of_queries(self) -> None:
+        for quantity in range(1, 6):
+            self.contract(self.wheat if quantity % 2 else self.rice, quantity)
+
+        with self.assertNumQueries(3):
+            stats = dashboard_stats(self.farmer)
+        self.assertEqual(stats["summary"].contracts, 5)
+        self.assertEqual(
+            [row["product__name"] for row in stats["by_product"]], ["Rice", "Wheat"]
+        )
+        self.assertEqual(stats["by_month"][0]["total_quantity"], 15)
+
+        self.client.force_login(self.farmer)
+        response = self.client.get("/dashboard/")
+        self.assertContains(response, "Total sales: Rs.210")
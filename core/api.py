@@ -0,0 +1,17 @@
+from django.conf import settings
+from ninja import NinjaAPI
+
+if settings.ASYNC_VIEWS:
+    from contracts.async_router import router as contracts_router
+    from products.async_router import router as products_router
+    from users.async_router import router as auth_router
+else:
+    from contracts.router import router as contracts_router
+    from products.router import router as products_router
+    from users.router import router as auth_router
+
+api = NinjaAPI(title="SIH Marketplace API")
+
+api.add_router("/products/", products_router)
+api.add_router("/contracts/", contracts_router)
+api.add_router("/auth/", auth_router)
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from threading import Barrier, Thread
+from time import perf_counter
+from typing import Callable, Iterator
+
+from datetime import date
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+from users.models import User
+
+
+@contextmanager
+def benchmark_database(alias: str = DEFAULT_DB_ALIAS) -> Iterator[str]:
+    """Swap ``alias`` for a freshly migrated, empty database.
+
+    Benchmarks seed and hammer this copy instead of the real data. SQLite gets
+    a temporary file rather than the shared in-memory test database, because
+    concurrent workers need their own connections. DEBUG is switched off so
+    that the query log does not skew timings or memory.
+    """
+    connection = connections[alias]
+    directory = None
+    if connection.vendor == "sqlite":
+        directory = tempfile.mkdtemp(prefix="bench-")
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(
+            directory, "bench.sqlite3"
+        )
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(DEBUG=False):
+            yield alias
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def make_bench_user(using: str, user_type: str, suffix: str = "") -> User:
+    """Save a ``user_type`` user without a usable password, for seeding.
+
+    Email and phone are made from ``user_type`` and ``suffix``; a new suffix
+    gives a new user.
+    """
+    name = f"{user_type}{suffix}"
+    user = User(
+        email=f"{name}@example.com",
+        phone=name,
+        full_name=user_type.title(),
+        date_of_birth=date(1990, 1, 1),
+        user_type=user_type,
+    )
+    user.set_unusable_password()
+    user.save(using=using)
+    return user
+
+
+def run_concurrently(workers: int, target: Callable[[int], None]) -> float:
+    """Run ``target(worker_index)`` on ``workers`` threads; return wall time.
+
+    All threads start together, and each closes its own DB connections on exit.
+    """
+    barrier = Barrier(workers + 1)
+
+    def run(index: int) -> None:
+        barrier.wait()
+        try:
+            target(index)
+        finally:
+            connections.close_all()
+
+    threads = [Thread(target=run, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = perf_counter()
+    for thread in threads:
+        thread.join()
+    return perf_counter() - started
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,191 @@
+"""Synthetic marketplace data for benchmarks and load tests.
+
+Rows go in through ``bulk_create`` in fixed-size batches, so only one batch
+of model instances exists at a time. What does grow with the volumes is what
+contracts are drawn from: every user id, and an (id, farmer id, price) tuple
+per product, about 250 bytes each, or some 250 MB at the "full" scale.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from contracts.models import Contract
+from contracts.pricing import compute_total
+from contracts.stats import reconcile
+from model_utils import aware_utcnow
+from products.models import Category, Product
+from products.search import get_search_backend
+from users.models import User
+
+# users, products, contracts
+SCALES: dict[str, tuple[int, int, int]] = {
+    "tiny": (200, 1_000, 5_000),
+    "small": (2_000, 20_000, 100_000),
+    "full": (100_000, 1_000_000, 5_000_000),
+}
+
+PASSWORD: str = "password"
+# Users per dashboard stats rebuild, bounding its memory at any volume.
+STATS_BATCH_SIZE: int = 1000
+FARMER_SHARE: float = 0.1
+CATEGORIES: tuple[str, ...] = (
+    "Rice",
+    "Wheat",
+    "Pulses",
+    "Millets",
+    "Maize",
+    "Vegetables",
+    "Fruits",
+    "Spices",
+    "Oilseeds",
+    "Cotton",
+    "Sugarcane",
+    "Dairy",
+)
+WORDS: tuple[str, ...] = (
+    "organic",
+    "basmati",
+    "premium",
+    "fresh",
+    "sona",
+    "masoori",
+    "durum",
+    "red",
+    "green",
+    "whole",
+    "polished",
+    "local",
+    "export",
+    "grade",
+)
+
+
+def _batches(count: int, batch_size: int) -> Iterator[range]:
+    for start in range(0, count, batch_size):
+        yield range(start, min(count, start + batch_size))
+
+
+def _skewed(rng: random.Random, size: int) -> int:
+    # A few popular products get most of the contracts.
+    return int(size * rng.random() ** 3)
+
+
+class Seeder:
+    def __init__(
+        self,
+        using: str,
+        batch_size: int = 5000,
+        seed: int = 0,
+        progress: Optional[Callable[[str, int, float], None]] = None,
+    ) -> None:
+        self.using = using
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.progress = progress or (lambda table, count, elapsed: None)
+        self.now = aware_utcnow()
+
+    def run(self, users: int, products: int, contracts: int) -> dict[str, int]:
+        farmers, buyers = self.users(users)
+        catalog = self.products(products, farmers)
+        self.contracts(contracts, buyers, catalog)
+        # bulk_create skips the signals behind these; build them in one go.
+        get_search_backend(self.using).rebuild()
+        user_ids = farmers + buyers
+        for batch in _batches(len(user_ids), STATS_BATCH_SIZE):
+            reconcile(user_ids[batch.start : batch.stop], using=self.using)
+        return {"users": users, "products": products, "contracts": contracts}
+
+    def _insert(
+        self,
+        model,
+        count: int,
+        build: Callable[[int], object],
+        keep: Optional[Callable[[object], object]] = None,
+    ) -> list:
+        """Insert ``count`` rows made by ``build``; return ``keep`` of each."""
+        manager = model.objects.using(self.using)
+        started = perf_counter()
+        kept = []
+        for batch in _batches(count, self.batch_size):
+            with transaction.atomic(using=self.using):
+                rows = manager.bulk_create([build(i) for i in batch])
+            if keep is not None:
+                kept.extend(map(keep, rows))
+            self.progress(model._meta.db_table, batch.stop, perf_counter() - started)
+        return kept
+
+    def users(self, count: int) -> tuple[list[str], list[str]]:
+        # One hash shared by everyone: hashing millions of passwords would
+        # dominate seeding, and load tests can still log in as anyone.
+        password = make_password(PASSWORD)
+        farmers = max(1, int(count * FARMER_SHARE))
+        rng = self.rng
+
+        def build(i: int) -> User:
+            is_farmer = i < farmers
+            return User(
+                email=f"user{i}@example.com",
+                phone=f"9{i:09d}",
+                full_name=f"User {i}",
+                password=password,
+                user_type=User.FARMER if is_farmer else User.BUYER,
+                farm_name=f"Farm {i}" if is_farmer else None,
+                date_of_birth=date(1960, 1, 1) + timedelta(days=rng.randrange(15000)),
+            )
+
+        ids = self._insert(User, count, build, keep=lambda user: user.pk)
+        return ids[:farmers], ids[farmers:] or ids[:farmers]
+
+    def products(self, count: int, farmers: list[str]) -> list[tuple]:
+        categories = Category.objects.using(self.using).bulk_create(
+            Category(name=name) for name in CATEGORIES
+        )
+        rng = self.rng
+
+        def build(i: int) -> Product:
+            category = rng.choice(categories)
+            stock = rng.randrange(0, 100_000)
+            return Product(
+                user_id=rng.choice(farmers),
+                category=category,
+                name=f"{' '.join(rng.sample(WORDS, 2)).title()} {category.name}",
+                description=f"Lot {i} of {category.name.lower()}",
+                price=Decimal(rng.randrange(100, 500_000)).scaleb(-2),
+                stock=stock,
+                in_stock=stock > 0,
+                min_quantity=1,
+                max_quantity=max(stock, 10_000),
+                created_on=self.now - timedelta(seconds=rng.randrange(365 * 86400)),
+            )
+
+        return self._insert(
+            Product, count, build, keep=lambda p: (p.pk, p.user_id, p.price)
+        )
+
+    def contracts(self, count: int, buyers: list[str], catalog: list[tuple]) -> None:
+        rng = self.rng
+
+        def build(i: int) -> Contract:
+            product_id, farmer_id, price = catalog[_skewed(rng, len(catalog))]
+            quantity = rng.randrange(1, 100)
+            start = self.now - timedelta(seconds=rng.randrange(2 * 365 * 86400))
+            end = start + timedelta(days=365)
+            return Contract(
+                buyer_id=rng.choice(buyers),
+                farmer_id=farmer_id,
+                product_id=product_id,
+                quantity=quantity,
+                price_per_unit=price,
+                total_price=compute_total(price, quantity, 0),
+                start_date=start,
+                end_date=end,
+                is_active=end > self.now,
+                terms_and_conditions="Standard",
+            )
+
+        self._insert(Contract, count, build)
@@ -0,0 +1,169 @@
+"""Micro-benchmarks and baseline comparison for ``manage.py benchmark``.
+
+Results are ``{"meta": {...}, "metrics": {name: metric}}`` where each metric
+is ``{"value": float, "unit": str, "better": "lower" | "higher"}``, so runs
+can be diffed against a stored baseline regardless of which suites ran.
+"""
+import platform
+import timeit
+from typing import Callable, Optional
+
+import django
+from django.db import connections
+
+from contracts.models import Contract
+from contracts.schemas import ContractOut
+from core.bench import make_bench_user
+from model_utils import generate_id
+from products.models import Category, Product, ProductImage
+from products.router import serialize_product
+from users.models import User
+
+# name -> setup(using) returning the zero-argument callable to time.
+registry: dict[str, Callable[[str], Callable[[], object]]] = {}
+
+
+def micro(name: str) -> Callable:
+    def decorator(setup: Callable[[str], Callable[[], object]]) -> Callable:
+        registry[name] = setup
+        return setup
+
+    return decorator
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    """Best-of-``repeat`` seconds per call, each run lasting at least 0.2s."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_micro(
+    using: str, names: Optional[list[str]] = None, repeat: int = 5
+) -> dict[str, dict]:
+    results = {}
+    for name in names or sorted(registry):
+        func = registry[name](using)
+        seconds = measure(func, repeat)
+        results[f"micro.{name}"] = metric(seconds * 1e6, "us/op", "lower")
+    return results
+
+
+def meta(using: str, **extra) -> dict:
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connections[using].vendor,
+        "machine": platform.machine(),
+        **extra,
+    }
+
+
+def compare(
+    results: dict, baseline: dict, threshold: float
+) -> list[tuple[str, float, float, float]]:
+    """Metrics more than ``threshold`` (a fraction) worse than the baseline.
+
+    Returns ``(name, baseline value, new value, relative change)`` tuples.
+    Metrics missing from the baseline are skipped.
+    """
+    regressions = []
+    previous = baseline.get("metrics", {})
+    for name, current in sorted(results.get("metrics", {}).items()):
+        base = previous.get(name)
+        if base is None:
+            continue
+        if base["value"]:
+            change = current["value"] / base["value"] - 1
+        else:
+            # E.g. errors: any at all, where there were none, is a regression.
+            change = float("inf") if current["value"] else 0.0
+        worse = -change if current["better"] == "higher" else change
+        if worse > threshold:
+            regressions.append((name, base["value"], current["value"], change))
+    return regressions
+
+
+def _farmer_and_buyer(using: str) -> tuple[User, User]:
+    # The random end of an id: each run's users are new, and phones fit.
+    suffix = generate_id()[-12:]
+    farmer = make_bench_user(using, User.FARMER, suffix)
+    return farmer, make_bench_user(using, User.BUYER, suffix)
+
+
+@micro("generate_id")
+def _generate_id(using: str) -> Callable[[], object]:
+    return generate_id
+
+
+@micro("product_clean")
+def _product_clean(using: str) -> Callable[[], object]:
+    product = Product(
+        name="Rice", price=10, stock=50, min_quantity=5, max_quantity=100
+    )
+    return product.clean
+
+
+@micro("product_serialize")
+def _product_serialize(using: str) -> Callable[[], object]:
+    farmer, _ = _farmer_and_buyer(using)
+    category = Category.objects.using(using).create(name="Micro")
+    product = Product.objects.using(using).create(
+        user=farmer, name="Micro rice", price=10, stock=10, category=category
+    )
+    ProductImage.objects.using(using).bulk_create(
+        ProductImage(product=product, url=f"product_images/{i}.jpg") for i in range(3)
+    )
+    product = (
+        Product.objects.using(using)
+        .select_related("category")
+        .prefetch_related("images")
+        .get(pk=product.pk)
+    )
+    return lambda: serialize_product(product)
+
+
+@micro("contract_serialize")
+def _contract_serialize(using: str) -> Callable[[], object]:
+    contract = Contract.objects.using(using).first() or _new_contract(using)
+    return lambda: ContractOut.from_orm(contract).model_dump()
+
+
+def _new_contract(using: str) -> Contract:
+    farmer, buyer = _farmer_and_buyer(using)
+    product = Product.objects.using(using).create(
+        user=farmer, name="Micro wheat", price=10, stock=1
+    )
+    contract = Contract(
+        buyer=buyer,
+        farmer=farmer,
+        product=product,
+        quantity=1,
+        terms_and_conditions="-",
+    )
+    contract.save(using=using)
+    return contract
+
+
+@micro("contract_save")
+def _contract_save(using: str) -> Callable[[], object]:
+    farmer, buyer = _farmer_and_buyer(using)
+    product = Product.objects.using(using).create(
+        user=farmer, name="Micro maize", price=10, stock=10**9, max_quantity=10**9
+    )
+
+    def save() -> None:
+        # Prices, reserves stock and updates dashboard stats: the full path.
+        Contract(
+            buyer=buyer,
+            farmer=farmer,
+            product=product,
+            quantity=1,
+            terms_and_conditions="-",
+        ).save(using=using)
+
+    return save
@@ -0,0 +1,197 @@
+"""Cold-start measurements: import profiles and time to the first response.
+
+Every measurement runs in a fresh interpreter, the way a serverless function
+starts. ``python -m core.coldstart PATH HOST`` is the child side of
+``first_response``; this module imports nothing but the standard library at
+the top so that it adds nothing to what it measures.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from statistics import median
+from typing import NamedTuple, Optional
+
+# What a cold ASGI worker imports before it can route its first request.
+BOOTSTRAP: str = (
+    "import core.asgi; from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+# Bytecode is cached here, outside the tree, as a deployed bundle ships it;
+# without it every cold start would also compile every module.
+PYCACHE_PREFIX: str = os.path.join(tempfile.gettempdir(), "coldstart-pycache")
+PROFILES: dict[str, dict[str, str]] = {
+    "full": {"SERVERLESS": "0"},
+    "serverless": {"SERVERLESS": "1"},
+}
+# A page that needs no database, and the API a cold function mostly serves.
+PATHS: dict[str, str] = {"home": "/", "api": "/api/products/?limit=20"}
+TIMINGS: tuple[str, ...] = ("interpreter_ms", "import_ms", "first_response_ms")
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Records of ``-X importtime`` output, in the order they were printed."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line.
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(
+            ImportRecord(name.strip(), int(fields[0]), int(fields[1]), depth)
+        )
+    return records
+
+
+def by_package(records: list[ImportRecord]) -> dict[str, int]:
+    """Self time per top-level package, in microseconds."""
+    totals: dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.name.split(".", 1)[0]] += record.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def _child_env(env: Optional[dict[str, str]]) -> dict[str, str]:
+    child = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "core.settings",
+        "PYTHONPYCACHEPREFIX": PYCACHE_PREFIX,
+        **(env or {}),
+    }
+    child.pop("PYTHONDONTWRITEBYTECODE", None)
+    return child
+
+
+def _base_dir() -> str:
+    from django.conf import settings
+
+    return str(settings.BASE_DIR)
+
+
+def profile_imports(env: Optional[dict[str, str]] = None) -> list[ImportRecord]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOTSTRAP],
+        cwd=_base_dir(),
+        env=_child_env(env),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def first_response(
+    path: str, host: str, env: Optional[dict[str, str]] = None
+) -> dict[str, float]:
+    """Milliseconds from spawning a fresh process to its first response.
+
+    ``interpreter_ms`` is Python's own startup, ``import_ms`` loading
+    ``core.asgi`` (and with it ``django.setup()``), and ``first_response_ms``
+    the whole span through the first request, which also imports the URLconf
+    and the view modules.
+    """
+    spawned = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", "core.coldstart", path, host],
+        cwd=_base_dir(),
+        env=_child_env(env),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    child = json.loads(result.stdout.splitlines()[-1])
+    return {
+        "interpreter_ms": (child["started"] - spawned) * 1000,
+        "import_ms": (child["imported"] - child["started"]) * 1000,
+        "first_response_ms": (child["responded"] - spawned) * 1000,
+        "status": child["status"],
+    }
+
+
+def measure(
+    path: str, host: str, env: Optional[dict[str, str]] = None, runs: int = 5
+) -> dict:
+    """Median timings over ``runs`` cold starts, and the fastest and slowest.
+
+    On a busy machine the fastest run is the steadiest figure to compare.
+    """
+    # Fills the bytecode cache; not counted.
+    first_response(path, host, env)
+    samples = [first_response(path, host, env) for _ in range(runs)]
+    summary = {name: median(sample[name] for sample in samples) for name in TIMINGS}
+    responses = [sample["first_response_ms"] for sample in samples]
+    summary["min_first_response_ms"] = min(responses)
+    summary["max_first_response_ms"] = max(responses)
+    summary["statuses"] = sorted({sample["status"] for sample in samples})
+    return summary
+
+
+async def _request(application, path: str, host: str) -> int:
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", host.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    requested = False
+    statuses = []
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never hangs up before the response is complete.
+        await asyncio.Event().wait()
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def main(path: str, host: str) -> None:
+    started = time.time()
+    import core.asgi
+
+    imported = time.time()
+    status = asyncio.run(_request(core.asgi.application, path, host))
+    print(
+        json.dumps(
+            {
+                "started": started,
+                "imported": imported,
+                "responded": time.time(),
+                "status": status,
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2])
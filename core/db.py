@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def sqlite_pragmas() -> dict[str, object]:
+    return getattr(settings, "SQLITE_PRAGMAS", {})
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs) -> None:
+    """Set ``SQLITE_PRAGMAS`` on each new SQLite connection.
+
+    Runs on the raw connection, so the statements neither show up in query
+    logs and counts nor go through the execute wrappers.
+    """
+    if connection.vendor != "sqlite":
+        return
+    for name, value in sqlite_pragmas().items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
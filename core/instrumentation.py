@@ -0,0 +1,191 @@
+import logging
+import random
+import re
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger("core.instrumentation")
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def sql_shape(sql: str) -> str:
+    """Collapse values that vary between otherwise identical queries."""
+    return _LITERAL_RE.sub("?", _IN_LIST_RE.sub("IN (...)", sql))
+
+
+class QueryRecorder:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+
+# The recorder for the request being profiled. Context variables follow the
+# request into sync_to_async threads, where async views run their queries.
+_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar(
+    "query_recorder", default=None
+)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class ViewStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.n_plus_one = 0
+
+
+class Metrics:
+    """Per-view aggregates for sampled requests, kept per process."""
+
+    def __init__(self) -> None:
+        self.views: dict[str, ViewStats] = defaultdict(ViewStats)
+        self._lock = Lock()
+
+    def record(
+        self, view: str, seconds: float, recorder: QueryRecorder, n_plus_one: bool
+    ) -> None:
+        with self._lock:
+            stats = self.views[view]
+            stats.requests += 1
+            stats.seconds += seconds
+            stats.queries += recorder.count
+            stats.query_seconds += recorder.duration
+            stats.n_plus_one += n_plus_one
+
+    def reset(self) -> None:
+        with self._lock:
+            self.views.clear()
+
+    def to_prometheus(self, sample_rate: float) -> str:
+        series = (
+            ("requests_total", "Sampled requests", "requests"),
+            ("seconds_total", "Wall time of sampled requests", "seconds"),
+            ("db_queries_total", "DB queries in sampled requests", "queries"),
+            ("db_seconds_total", "DB time in sampled requests", "query_seconds"),
+            (
+                "n_plus_one_total",
+                "Sampled requests that repeated one query shape too often",
+                "n_plus_one",
+            ),
+        )
+        lines = [
+            "# HELP marketplace_sample_rate Fraction of requests that are profiled",
+            "# TYPE marketplace_sample_rate gauge",
+            f"marketplace_sample_rate {sample_rate}",
+        ]
+        with self._lock:
+            views = sorted(self.views.items())
+            for suffix, help_text, attr in series:
+                name = f"marketplace_view_{suffix}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for view, stats in views:
+                    label = view.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'{name}{{view="{label}"}} {getattr(stats, attr)}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def instrumentation_options() -> tuple[float, int]:
+    options = getattr(settings, "INSTRUMENTATION", {})
+    return options.get("SAMPLE_RATE", 0.05), options.get("N_PLUS_ONE_THRESHOLD", 10)
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or match.route
+
+
+def _finish(request, started: float, recorder: QueryRecorder, threshold: int) -> None:
+    view = _view_name(request)
+    repeated = [
+        (shape, count)
+        for shape, count in recorder.shapes.items()
+        if count > threshold
+    ]
+    for shape, count in repeated:
+        logger.warning("Possible N+1 in %s: %d x %s", view, count, shape)
+    metrics.record(view, perf_counter() - started, recorder, bool(repeated))
+
+
+class InstrumentationMiddleware:
+    """Profile a sample of requests: wall time, query count and query time.
+
+    Requests outside the sample only pay for one ``random()`` call and a
+    context variable lookup per query.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.sample_rate, self.threshold = instrumentation_options()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            _recorder.reset(token)
+            _finish(request, started, recorder, self.threshold)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+            _finish(request, started, recorder, self.threshold)
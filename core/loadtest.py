@@ -0,0 +1,220 @@
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from itertools import cycle
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+
+from contracts.models import Contract
+from core.bench import make_bench_user, percentile
+from products.models import Product
+from users.models import User
+
+
+class LoadResult:
+    def __init__(
+        self, latencies: list[float], statuses: dict[int, int], elapsed: float
+    ) -> None:
+        self.latencies = latencies
+        self.statuses = statuses
+        self.elapsed = elapsed
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rps": round(self.requests / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+def host_header() -> str:
+    # ALLOWED_HOSTS may only list production domains; borrow one of them.
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return "loadtest" + host if host.startswith(".") else host
+    return "localhost"
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).strip() or b"0", 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status
+
+
+async def _client(
+    host: str,
+    port: int,
+    paths: Iterable[str],
+    deadline: float,
+    headers: bytes,
+    latencies: list[float],
+    statuses: dict[int, int],
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            if time.perf_counter() >= deadline:
+                break
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\n".encode() + headers)
+            await writer.drain()
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(
+    host: str,
+    port: int,
+    paths: list[str],
+    concurrency: int,
+    duration: float,
+    cookie: Optional[str] = None,
+    authorization: Optional[str] = None,
+) -> LoadResult:
+    """Hit ``paths`` round-robin from ``concurrency`` keep-alive connections."""
+    header_lines = [f"Host: {host_header()}", "Connection: keep-alive"]
+    if cookie:
+        header_lines.append(f"Cookie: {cookie}")
+    if authorization:
+        header_lines.append(f"Authorization: {authorization}")
+    headers = ("\r\n".join(header_lines) + "\r\n\r\n").encode()
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            _client(
+                host,
+                port,
+                cycle(paths[i % len(paths) :] + paths[: i % len(paths)]),
+                deadline,
+                headers,
+                latencies,
+                statuses,
+            )
+            for i in range(concurrency)
+        )
+    )
+    return LoadResult(latencies, statuses, time.perf_counter() - started)
+
+
+def seed(using: str, products: int, contracts: int) -> User:
+    """Save a farmer with ``products`` products and ``contracts`` contracts
+    between them and a buyer, and return the buyer."""
+    farmer = make_bench_user(using, User.FARMER)
+    buyer = make_bench_user(using, User.BUYER)
+
+    catalog = Product.objects.using(using).bulk_create(
+        Product(user=farmer, name=f"Product {i}", price=i + 1, stock=10**6)
+        for i in range(products)
+    )
+    rng = random.Random(0)
+    Contract.objects.using(using).bulk_create(
+        Contract(
+            buyer=buyer,
+            farmer=farmer,
+            product=rng.choice(catalog),
+            quantity=1,
+            price_per_unit=1,
+            total_price=1,
+            terms_and_conditions="-",
+        )
+        for _ in range(contracts)
+    )
+    return buyer
+
+
+def session_cookie(user) -> str:
+    """A Cookie header value logging requests in as ``user``."""
+    session = SessionStore()
+    session[SESSION_KEY] = user.pk
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ASGIServer:
+    """Run ``core.asgi:application`` under uvicorn in a child process."""
+
+    def __init__(self, env: dict[str, str], workers: int = 1) -> None:
+        self.port = free_port()
+        self.env = {**os.environ, **env}
+        self.workers = workers
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "ASGIServer":
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "core.asgi:application",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.workers),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            cwd=settings.BASE_DIR,
+            env=self.env,
+        )
+        self.wait_until_ready()
+        return self
+
+    def wait_until_ready(self, timeout: float = 30) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("uvicorn exited before accepting connections")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 0.2).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("uvicorn did not start in time")
+
+    def __exit__(self, *exc) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=10)
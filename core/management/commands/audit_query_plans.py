@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.module_loading import autodiscover_modules
+
+from core.query_audit import full_scans, registry
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every canonical queryset registered in an app's queries.py "
+        "and fail if any of them falls back to a full table scan."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("names", nargs="*", help="Only audit these queries.")
+
+    def handle(self, *args, **options) -> None:
+        autodiscover_modules("queries")
+        names = options["names"] or sorted(registry)
+        unknown = set(names) - set(registry)
+        if unknown:
+            raise CommandError(f"Unknown queries: {', '.join(sorted(unknown))}")
+
+        failures = []
+        for name in names:
+            plan = registry[name]().using(options["database"]).explain()
+            scanned = full_scans(plan)
+            if scanned:
+                failures.append(name)
+                self.stdout.write(
+                    self.style.ERROR(f"FAIL {name}: full scan of {', '.join(scanned)}")
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok   {name}"))
+            if options["verbosity"] > 1 or scanned:
+                self.stdout.write(f"{plan}\n")
+
+        if failures:
+            raise CommandError(f"{len(failures)} queries fall back to a full scan")
@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core import coldstart
+from core.bench import benchmark_database
+from core.loadtest import host_header
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the time from spawning a fresh ASGI process to its first "
+        "response, for the full and serverless settings. With --budget, fail "
+        "when a median first response is slower than that."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--profiles", default="full,serverless")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Request path to measure; may be repeated. Defaults to the "
+            "home page and the product listing.",
+        )
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--budget", type=float, help="Milliseconds.")
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        paths = (
+            {path: path for path in options["paths"]}
+            if options["paths"]
+            else coldstart.PATHS
+        )
+        with benchmark_database(options["database"]) as using:
+            db_path = str(connections[using].settings_dict["NAME"])
+            connections[using].close()
+
+            results = {}
+            for profile in options["profiles"].split(","):
+                env = {**coldstart.PROFILES[profile], "SQLITE_PATH": db_path}
+                for name, path in paths.items():
+                    results[f"{profile}.{name}"] = coldstart.measure(
+                        path, host_header(), env, options["runs"]
+                    )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for name, summary in results.items():
+                self.stdout.write(
+                    f"{name:>16}: first response {summary['first_response_ms']:.0f} "
+                    f"ms (min {summary['min_first_response_ms']:.0f}, max "
+                    f"{summary['max_first_response_ms']:.0f})  imports "
+                    f"{summary['import_ms']:.0f} ms  interpreter "
+                    f"{summary['interpreter_ms']:.0f} ms  "
+                    f"statuses {summary['statuses']}"
+                )
+
+        budget = options["budget"]
+        over = [
+            name
+            for name, summary in results.items()
+            if budget is not None and summary["first_response_ms"] > budget
+        ]
+        if over:
+            raise CommandError(f"Over the {budget:.0f} ms budget: {', '.join(over)}")
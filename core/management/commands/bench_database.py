@@ -0,0 +1,140 @@
+import json
+import random
+from threading import Lock
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import F
+from django.test.utils import override_settings
+
+from core.bench import benchmark_database, make_bench_user, percentile, run_concurrently
+from products.models import Product
+from users.models import User
+
+# Mirrors DB_PROFILE=production in core.settings.
+PROFILES: dict[str, dict] = {
+    "default": {"options": {}, "pragmas": {}, "reuse": False},
+    "production": {
+        "options": {"transaction_mode": "IMMEDIATE"},
+        "pragmas": {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "busy_timeout": 5000,
+            "cache_size": -65536,
+            "mmap_size": 256 * 2**20,
+            "temp_store": "memory",
+        },
+        "reuse": True,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent readers and writers against a throwaway copy of "
+        "--database, once with default settings and once with the production "
+        "profile (WAL, pragmas, immediate transactions, persistent connections)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument(
+            "--profile", choices=sorted(PROFILES), action="append", dest="profiles"
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        results = {}
+        for name in options["profiles"] or list(PROFILES):
+            with benchmark_database(options["database"]) as using:
+                results[name] = self.run(using, PROFILES[name], options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>10}: {result['reads_per_s']:>8.0f} reads/s "
+                f"(p99 {result['read_p99_ms']:.1f} ms), "
+                f"{result['writes_per_s']:>7.0f} writes/s "
+                f"(p99 {result['write_p99_ms']:.1f} ms), "
+                f"{result['locked']} 'database is locked' errors"
+            )
+
+    def seed(self, using: str, count: int) -> list[str]:
+        farmer = make_bench_user(using, User.FARMER)
+        products = Product.objects.using(using).bulk_create(
+            Product(user=farmer, name=f"P{i}", price=1, stock=10) for i in range(count)
+        )
+        return [product.pk for product in products]
+
+    def run(self, using: str, profile: dict, options: dict) -> dict:
+        product_ids = self.seed(using, options["products"])
+        connections[using].close()
+
+        vendor = connections[using].vendor
+        settings_dict = connections.settings[using]
+        saved_options = settings_dict.get("OPTIONS", {})
+        if vendor == "sqlite":
+            settings_dict["OPTIONS"] = {**saved_options, **profile["options"]}
+        pragmas = profile["pragmas"] if vendor == "sqlite" else {}
+
+        lock = Lock()
+        latencies = {"read": [], "write": []}
+        counts = {"read": 0, "write": 0, "locked": 0}
+        readers, duration = options["readers"], options["seconds"]
+
+        def read(rng: random.Random) -> None:
+            Product.objects.using(using).filter(pk=rng.choice(product_ids)).first()
+            list(Product.objects.using(using).order_by("-created_on", "-id")[:20])
+
+        def write(rng: random.Random) -> None:
+            # Read, then write in one transaction: the pattern that fails
+            # outright under SQLite's default deferred transactions.
+            pk = rng.choice(product_ids)
+            with transaction.atomic(using=using):
+                Product.objects.using(using).get(pk=pk)
+                Product.objects.using(using).filter(pk=pk).update(
+                    stock=F("stock") + 1
+                )
+
+        def worker(index: int) -> None:
+            rng = random.Random(index)
+            kind, op = ("read", read) if index < readers else ("write", write)
+            local, locked, done = [], 0, 0
+            deadline = perf_counter() + duration
+            while perf_counter() < deadline:
+                started = perf_counter()
+                try:
+                    op(rng)
+                    done += 1
+                    local.append(perf_counter() - started)
+                except OperationalError:
+                    locked += 1
+                if not profile["reuse"]:
+                    # CONN_MAX_AGE=0: Django closes the connection after every
+                    # request.
+                    connections[using].close()
+            with lock:
+                latencies[kind].extend(local)
+                counts[kind] += done
+                counts["locked"] += locked
+
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                elapsed = run_concurrently(readers + options["writers"], worker)
+        finally:
+            settings_dict["OPTIONS"] = saved_options
+
+        return {
+            "reads_per_s": counts["read"] / elapsed,
+            "writes_per_s": counts["write"] / elapsed,
+            "read_p99_ms": percentile(latencies["read"], 99) * 1000,
+            "write_p99_ms": percentile(latencies["write"], 99) * 1000,
+            "locked": counts["locked"],
+        }
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import tempfile
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from model_utils import generate_legacy_id, generate_sortable_id
+
+GENERATORS = {
+    "legacy": generate_legacy_id,
+    "sortable": generate_sortable_id,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare id generators: generation cost, insert throughput into a "
+        "varchar primary key and the resulting index size (SQLite)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--rows", type=int, default=2_000_000)
+        parser.add_argument("--batch", type=int, default=10_000)
+        parser.add_argument(
+            "--generator", action="append", choices=sorted(GENERATORS)
+        )
+
+    def handle(self, *args, **options) -> None:
+        for name in options["generator"] or sorted(GENERATORS):
+            self.stdout.write(self.run(name, options["rows"], options["batch"]))
+
+    def run(self, name: str, rows: int, batch: int) -> str:
+        generate = GENERATORS[name]
+        with tempfile.TemporaryDirectory(prefix="bench-ids-") as directory:
+            path = os.path.join(directory, "ids.sqlite3")
+            db = sqlite3.connect(path)
+            # Same shape as the app tables: a varchar primary key backed by an
+            # automatic unique index next to the rowid table.
+            db.execute(
+                "CREATE TABLE item (id varchar(26) NOT NULL PRIMARY KEY, v integer)"
+            )
+
+            generating = inserting = 0.0
+            for start in range(0, rows, batch):
+                count = min(batch, rows - start)
+                started = perf_counter()
+                ids = [(generate(), i) for i in range(count)]
+                generating += perf_counter() - started
+
+                started = perf_counter()
+                with db:
+                    db.executemany("INSERT INTO item (id, v) VALUES (?, ?)", ids)
+                inserting += perf_counter() - started
+
+            sizes = dict(
+                db.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+            )
+            index_size = sizes.get("sqlite_autoindex_item_1", 0)
+            db.close()
+            file_size = os.path.getsize(path)
+
+        return (
+            f"{name:>8}: {rows / inserting:>10,.0f} inserts/s, "
+            f"{generating / rows * 1e9:>6,.0f} ns/id, "
+            f"pk index {index_size / 2**20:,.1f} MiB, "
+            f"file {file_size / 2**20:,.1f} MiB"
+        )
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from contracts.models import Contract
+from core import benchmarks, coldstart
+from core.bench import benchmark_database
+from core.benchdata import SCALES, Seeder
+from core.loadtest import ASGIServer, host_header, run_load, session_cookie
+from products.models import Product
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database, run the micro-benchmarks and the ASGI load "
+        "tests, write the results as JSON and optionally fail on regressions "
+        "against a stored baseline."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--suite",
+            action="append",
+            choices=["micro", "macro", "coldstart"],
+            dest="suites",
+        )
+        parser.add_argument(
+            "--micro", action="append", choices=sorted(benchmarks.registry)
+        )
+        parser.add_argument("--scale", choices=sorted(SCALES), default="tiny")
+        parser.add_argument("--users", type=int)
+        parser.add_argument("--products", type=int)
+        parser.add_argument("--contracts", type=int)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--modes", default="sync,async")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--output", type=Path, help="Write the results here.")
+        parser.add_argument("--baseline", type=Path, help="Compare with this run.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.15,
+            help="Fail if a metric is this fraction worse than the baseline.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        self.verbosity = options["verbosity"]
+        suites = options["suites"] or ["micro", "macro", "coldstart"]
+        users, products, contracts = SCALES[options["scale"]]
+        defaults = {"users": users, "products": products, "contracts": contracts}
+        # An explicit 0 is a volume too.
+        volumes = {
+            table: default if options[table] is None else options[table]
+            for table, default in defaults.items()
+        }
+
+        with benchmark_database(options["database"]) as using:
+            if "macro" in suites:
+                self.stderr.write(f"Seeding {volumes}")
+                Seeder(using, progress=self.report_progress).run(**volumes)
+            metrics = {}
+            if "micro" in suites:
+                metrics.update(
+                    benchmarks.run_micro(using, options["micro"], options["repeat"])
+                )
+            if "macro" in suites:
+                metrics.update(self.run_macro(using, options))
+            if "coldstart" in suites:
+                metrics.update(self.run_coldstart(using, options))
+            results = {
+                "meta": benchmarks.meta(using, volumes=volumes, suites=suites),
+                "metrics": metrics,
+            }
+
+        text = json.dumps(results, indent=2)
+        if options["output"]:
+            options["output"].write_text(text + "\n")
+        else:
+            self.stdout.write(text)
+
+        if options["baseline"]:
+            baseline = json.loads(options["baseline"].read_text())
+            regressions = benchmarks.compare(results, baseline, options["threshold"])
+            for name, before, after, change in regressions:
+                self.stderr.write(
+                    self.style.ERROR(f"{name}: {before} -> {after} ({change:+.1%})")
+                )
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} metrics regressed by more than "
+                    f"{options['threshold']:.0%}"
+                )
+            self.stderr.write(self.style.SUCCESS("No regressions against baseline"))
+
+    def report_progress(self, table: str, count: int, elapsed: float) -> None:
+        if self.verbosity > 1:
+            self.stderr.write(f"  {table}: {count:,} rows in {elapsed:.1f}s")
+
+    def run_macro(self, using: str, options: dict) -> dict[str, dict]:
+        contract = Contract.objects.using(using).select_related("buyer").first()
+        # Without contracts (--contracts 0) anyone can browse the catalog.
+        user = contract.buyer if contract else User.objects.using(using).first()
+        cookie = session_cookie(user)
+        ids = list(Product.objects.using(using).values_list("id", flat=True)[:200])
+        paths = [
+            "/api/products/?limit=20",
+            "/api/products/?in_stock=true&limit=20",
+            "/api/products/search?q=basmati+rice",
+            *(f"/api/products/{pk}" for pk in ids),
+            "/api/contracts/?limit=20",
+        ]
+        db_path = str(connections[using].settings_dict["NAME"])
+        connections[using].close()
+
+        metrics = {}
+        for mode in options["modes"].split(","):
+            env = {
+                "ASYNC_VIEWS": "1" if mode == "async" else "0",
+                "SQLITE_PATH": db_path,
+            }
+            with ASGIServer(env, workers=options["workers"]) as server:
+                load = ("127.0.0.1", server.port, paths, options["concurrency"])
+                asyncio.run(run_load(*load, min(2.0, options["duration"]), cookie))
+                summary = asyncio.run(
+                    run_load(*load, options["duration"], cookie)
+                ).summary()
+            errors = sum(
+                count for status, count in summary["statuses"].items() if status >= 400
+            )
+            metric = benchmarks.metric
+            metrics[f"macro.{mode}.rps"] = metric(summary["rps"], "req/s", "higher")
+            metrics[f"macro.{mode}.p50_ms"] = metric(summary["p50_ms"], "ms", "lower")
+            metrics[f"macro.{mode}.p99_ms"] = metric(summary["p99_ms"], "ms", "lower")
+            metrics[f"macro.{mode}.errors"] = metric(errors, "requests", "lower")
+        return metrics
+
+    def run_coldstart(self, using: str, options: dict) -> dict[str, dict]:
+        db_path = str(connections[using].settings_dict["NAME"])
+        connections[using].close()
+        metrics = {}
+        for profile, env in coldstart.PROFILES.items():
+            env = {**env, "SQLITE_PATH": db_path}
+            for name, path in coldstart.PATHS.items():
+                summary = coldstart.measure(path, host_header(), env, options["repeat"])
+                metrics[f"coldstart.{profile}.{name}.first_response_ms"] = (
+                    benchmarks.metric(summary["first_response_ms"], "ms", "lower")
+                )
+        return metrics
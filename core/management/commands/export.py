@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from contracts import exports as contract_exports
+from core.exports import DEFAULT_CHUNK_SIZE, FORMATS, iter_export
+from products import exports as product_exports
+from users.models import User
+
+EXPORTS = {
+    "contracts": contract_exports,
+    "products": product_exports,
+}
+
+
+class Command(BaseCommand):
+    help = "Stream every product or contract row to CSV/JSONL in constant memory."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--output", help="File to write; defaults to stdout.")
+        parser.add_argument("--user", help="Only rows visible to this user id.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options) -> None:
+        export = EXPORTS[options["kind"]]
+        user = None
+        if options["user"]:
+            try:
+                user = User.objects.using(options["database"]).get(pk=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with id {options['user']}")
+
+        queryset = export.export_queryset(user).using(options["database"])
+        chunks = iter_export(
+            queryset, export.FIELDS, options["format"], options["chunk_size"]
+        )
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as out:
+                out.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
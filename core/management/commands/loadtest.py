@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.bench import benchmark_database
+from core.loadtest import ASGIServer, run_load, seed, session_cookie
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a seeded copy of the database with uvicorn and measure requests "
+        "per second and latency percentiles for the sync and async views."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--modes", default="sync,async")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--products", type=int, default=2000)
+        parser.add_argument("--contracts", type=int, default=2000)
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Request path to include; may be repeated. Defaults to the "
+            "catalog listing, product detail and contract listing endpoints.",
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            buyer = seed(using, options["products"], options["contracts"])
+            cookie = session_cookie(buyer)
+            paths = options["paths"] or self.default_paths(using)
+            db_path = str(connections[using].settings_dict["NAME"])
+            connections[using].close()
+
+            results = {}
+            for mode in options["modes"].split(","):
+                env = {
+                    "ASYNC_VIEWS": "1" if mode == "async" else "0",
+                    "SQLITE_PATH": db_path,
+                }
+                with ASGIServer(env, workers=options["workers"]) as server:
+                    load = (
+                        "127.0.0.1",
+                        server.port,
+                        paths,
+                        options["concurrency"],
+                    )
+                    # Warm up imports, connections and caches before measuring.
+                    asyncio.run(run_load(*load, min(2.0, options["duration"]), cookie))
+                    result = asyncio.run(
+                        run_load(*load, options["duration"], cookie)
+                    )
+                    results[mode] = result.summary()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for mode, summary in results.items():
+            self.stdout.write(
+                f"{mode:>5}: {summary['rps']:>8} req/s  "
+                f"p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms  "
+                f"statuses {summary['statuses']}"
+            )
+
+    def default_paths(self, using: str) -> list[str]:
+        ids = list(
+            Product.objects.using(using).values_list("id", flat=True)[:200]
+        )
+        return [
+            "/api/products/?limit=20",
+            *(f"/api/products/{pk}" for pk in ids),
+            "/api/contracts/?limit=20",
+        ]
@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import coldstart
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile what a cold ASGI worker imports (python -X importtime) and "
+        "report the heaviest modules and packages."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--profile", choices=sorted(coldstart.PROFILES), default="serverless"
+        )
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--sort",
+            choices=["self", "cumulative"],
+            default="self",
+            help="Rank modules by their own import time or including what "
+            "they import.",
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        env = coldstart.PROFILES[options["profile"]]
+        # The first run only fills the bytecode cache.
+        coldstart.profile_imports(env)
+        records = coldstart.profile_imports(env)
+        key = "self_us" if options["sort"] == "self" else "cumulative_us"
+        heaviest = sorted(records, key=lambda r: getattr(r, key), reverse=True)
+        heaviest = heaviest[: options["top"]]
+        packages = list(coldstart.by_package(records).items())[: options["top"]]
+        total = sum(record.self_us for record in records)
+
+        if options["json"]:
+            report = {
+                "profile": options["profile"],
+                "total_ms": total / 1000,
+                "modules": [record._asdict() for record in heaviest],
+                "packages": dict(packages),
+            }
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{len(records)} modules imported in {total / 1000:.1f} ms "
+            f"({options['profile']} profile)\n"
+        )
+        self.stdout.write(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for record in heaviest:
+            self.stdout.write(
+                f"{record.self_us / 1000:>9.1f} {record.cumulative_us / 1000:>9.1f}"
+                f"  {record.name}"
+            )
+        self.stdout.write(f"\n{'self ms':>9}  package")
+        for package, self_us in packages:
+            self.stdout.write(f"{self_us / 1000:>9.1f}  {package}")
@@ -0,0 +1,53 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.benchdata import SCALES, Seeder
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill --database with synthetic users, products and contracts, e.g. "
+        "--scale full for 100k users, 1M products and 5M contracts. Every "
+        "user's password is 'password'."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+        parser.add_argument("--users", type=int)
+        parser.add_argument("--products", type=int)
+        parser.add_argument("--contracts", type=int)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options) -> None:
+        using = options["database"]
+        self.verbosity = options["verbosity"]
+        if User.objects.using(using).exists():
+            raise CommandError(f"Database {using!r} already has users")
+
+        users, products, contracts = SCALES[options["scale"]]
+        seeder = Seeder(
+            using,
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            progress=self.report_progress,
+        )
+        started = perf_counter()
+        # An explicit 0 is a volume too.
+        counts = seeder.run(
+            users if options["users"] is None else options["users"],
+            products if options["products"] is None else options["products"],
+            contracts if options["contracts"] is None else options["contracts"],
+        )
+        seeded = ", ".join(f"{n:,} {table}" for table, n in counts.items())
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded {seeded} in {perf_counter() - started:.1f}s")
+        )
+
+    def report_progress(self, table: str, count: int, elapsed: float) -> None:
+        if self.verbosity > 1:
+            self.stderr.write(f"{table}: {count:,} rows in {elapsed:.1f}s")
@@ -0,0 +1,84 @@
+"""Whole-page caching for views that render the same for every anonymous visitor.
+
+Anyone with a session cookie bypasses the cache, judged from the cookie alone
+so that a hit never loads the session. A response is stored only when
+rendering it touched nothing per-visitor: no cookies set, no CSRF token
+generated (``{% csrf_token %}``), no session read (``request.user``,
+messages). Every response also gets ``Vary: Cookie`` so that downstream
+caches keep logged-in and anonymous copies apart.
+"""
+from functools import wraps
+from hashlib import blake2b
+from inspect import iscoroutinefunction
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+
+def page_cache() -> tuple[BaseCache, int]:
+    options = getattr(settings, "RENDER_CACHE", {})
+    return caches[options.get("ALIAS", "default")], options.get("PAGE_TIMEOUT", 600)
+
+
+def is_anonymous(request: HttpRequest) -> bool:
+    return (
+        request.method == "GET"
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def page_key(request: HttpRequest) -> str:
+    url = request.build_absolute_uri()
+    return f"page:{blake2b(url.encode(), digest_size=16).hexdigest()}"
+
+
+def is_cacheable(request: HttpRequest, response: HttpResponse) -> bool:
+    session = getattr(request, "session", None)
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and not (session is not None and session.accessed)
+    )
+
+
+def cache_anonymous_page(view: Callable) -> Callable:
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request: HttpRequest, *args, **kwargs):
+            if not is_anonymous(request):
+                response = await view(request, *args, **kwargs)
+            else:
+                cache, timeout = page_cache()
+                key = page_key(request)
+                response = await cache.aget(key)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if is_cacheable(request, response):
+                        await cache.aset(key, response, timeout)
+            patch_vary_headers(response, ("Cookie",))
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs):
+        if not is_anonymous(request):
+            response = view(request, *args, **kwargs)
+        else:
+            cache, timeout = page_cache()
+            key = page_key(request)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if is_cacheable(request, response):
+                    cache.set(key, response, timeout)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+    return wrapper
@@ -0,0 +1,49 @@
+from functools import cached_property
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+
+
+def estimated_count(model: type[Model], using: str) -> Optional[int]:
+    """A cheap row count for ``model``'s whole table, or None if unknown.
+
+    Postgres keeps an estimate in its statistics. On SQLite ``MAX(rowid)`` is
+    one index seek and overcounts only by the rows deleted since.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            cursor.execute(f"SELECT MAX(rowid) FROM {table}")
+        else:
+            return None
+        row = cursor.fetchone()
+    # reltuples is -1 for a table that was never analyzed.
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids ``COUNT(*)`` over a whole large table.
+
+    Unfiltered querysets use ``estimated_count`` once it reaches
+    ``threshold`` rows; smaller tables and filtered querysets are counted
+    exactly.
+    """
+
+    threshold: int = 10000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,158 @@
+"""An in-process publish/subscribe hub for long-lived streaming responses.
+
+Publishers on any thread hand messages to a broker, which passes them to the
+hub of every process it reaches; the hub fans each one out to the
+subscriptions on its topics, on the event loops they were made on. A
+subscription keeps only the latest message per key, so a burst of updates to
+one product is one entry, and holds at most ``queue_size`` keys: a consumer
+that falls further behind is marked overflowed and told to resync. Publishing
+never blocks on, or buffers without bound for, a slow consumer.
+"""
+import asyncio
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+# {"topics": [str, ...], "key": str, "data": {...}}, JSON-serialisable so that
+# a broker can carry it between processes.
+Message = dict
+
+
+class LocalBroker:
+    """Delivers to the hubs of this process only.
+
+    A stand-in for a cross-process broker such as Redis pub/sub or Postgres
+    LISTEN/NOTIFY, which would implement the same ``listen`` and ``publish``
+    and set ``local`` to False.
+    """
+
+    local: bool = True
+
+    def __init__(self) -> None:
+        self._listeners: list[Callable[[Message], None]] = []
+
+    def listen(self, callback: Callable[[Message], None]) -> None:
+        self._listeners.append(callback)
+
+    def publish(self, message: Message) -> None:
+        for callback in self._listeners:
+            callback(message)
+
+
+class Subscription:
+    __slots__ = ("topics", "loop", "queue_size", "overflowed", "_pending", "_ready")
+
+    def __init__(
+        self, topics: frozenset, loop: asyncio.AbstractEventLoop, queue_size: int
+    ) -> None:
+        self.topics = topics
+        self.loop = loop
+        self.queue_size = queue_size
+        self.overflowed = False
+        self._pending: dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, key: str, data: dict) -> None:
+        # Always called on ``loop``.
+        if self.overflowed:
+            return
+        if key not in self._pending and len(self._pending) >= self.queue_size:
+            # The client has to refetch anyway; the backlog is of no use.
+            self._pending = {}
+            self.overflowed = True
+        else:
+            self._pending[key] = data
+        self._ready.set()
+
+    async def get(
+        self, timeout: Optional[float] = None, coalesce: float = 0
+    ) -> tuple[list[dict], bool]:
+        """Pending messages, oldest key first, and whether any were dropped.
+
+        Waits up to ``timeout`` seconds for one to arrive, returning
+        ``([], False)`` if none did, then ``coalesce`` more seconds so that
+        quick successive updates to a key go out once.
+        """
+        if not self._pending and not self.overflowed:
+            try:
+                # Unlike wait_for, no extra task per waiting subscriber.
+                async with asyncio.timeout(timeout):
+                    await self._ready.wait()
+            except TimeoutError:
+                return [], False
+        if coalesce:
+            await asyncio.sleep(coalesce)
+        self._ready.clear()
+        messages, overflowed = list(self._pending.values()), self.overflowed
+        self._pending = {}
+        self.overflowed = False
+        return messages, overflowed
+
+
+def _push(subscriptions: list[Subscription], key: str, data: dict) -> None:
+    for subscription in subscriptions:
+        subscription.push(key, data)
+
+
+class Hub:
+    def __init__(self, broker, queue_size: int) -> None:
+        self.broker = broker
+        self.queue_size = queue_size
+        self._topics: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = Lock()
+        broker.listen(self.deliver)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """Subscribe the running event loop; messages are delivered on it."""
+        subscription = Subscription(
+            frozenset(topics), asyncio.get_running_loop(), self.queue_size
+        )
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(set().union(*self._topics.values()))
+
+    def is_listening(self) -> bool:
+        """Whether a message could reach anyone, in this process or another."""
+        return not getattr(self.broker, "local", False) or bool(self._topics)
+
+    def publish(self, topics: Iterable[str], key: str, data: dict) -> None:
+        self.broker.publish({"topics": list(topics), "key": key, "data": data})
+
+    def deliver(self, message: Message) -> None:
+        """Fan ``message`` out to its subscribers; safe from any thread."""
+        with self._lock:
+            matched: set[Subscription] = set()
+            for topic in message["topics"]:
+                matched.update(self._topics.get(topic, ()))
+        by_loop: dict[asyncio.AbstractEventLoop, list] = defaultdict(list)
+        for subscription in matched:
+            by_loop[subscription.loop].append(subscription)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        key, data = message["key"], message["data"]
+        for loop, subscriptions in by_loop.items():
+            if loop is running:
+                _push(subscriptions, key, data)
+                continue
+            try:
+                # One callback per loop, however many subscribers it has.
+                loop.call_soon_threadsafe(_push, subscriptions, key, data)
+            except RuntimeError:
+                pass  # The loop has closed, and its subscribers with it.
@@ -0,0 +1,36 @@
+import re
+from typing import Callable
+
+from django.db.models import QuerySet
+
+# name -> factory returning the queryset whose plan should be checked.
+registry: dict[str, Callable[[], QuerySet]] = {}
+
+# SQLite reports "SCAN <table>" for a full table scan and "SCAN <table> USING
+# [COVERING] INDEX" / "SEARCH ..." when an index is used; Postgres says
+# "Seq Scan on <table>".
+_FULL_SCAN_PATTERNS = (
+    re.compile(r"\bSCAN (?P<table>\w+)(?! USING| VIRTUAL TABLE)\s*$"),
+    re.compile(r"Seq Scan on (?P<table>\w+)"),
+)
+
+
+def register(name: str) -> Callable:
+    """Register a canonical queryset factory under ``name`` for plan audits."""
+
+    def decorator(factory: Callable[[], QuerySet]) -> Callable[[], QuerySet]:
+        registry[name] = factory
+        return factory
+
+    return decorator
+
+
+def full_scans(plan: str) -> list[str]:
+    """Tables that ``plan`` (``QuerySet.explain()`` output) reads in full."""
+    tables = []
+    for line in plan.splitlines():
+        for pattern in _FULL_SCAN_PATTERNS:
+            match = pattern.search(line.strip())
+            if match:
+                tables.append(match.group("table"))
+    return tables
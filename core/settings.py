@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,9 +43,11 @@ INSTALLED_APPS = [
     "users.apps.UsersConfig",
     "products.apps.ProductsConfig",
     "contracts.apps.ContractsConfig",
+    "core.apps.CoreConfig",
 ]
 
 MIDDLEWARE = [
+    "core.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -54,13 +57,35 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# SERVERLESS=1 (vercel.json) trims what each cold start imports: the admin and
+# the per-process instrumentation only pay off in long-running workers, so
+# they are left out. Serve the admin from a regular deployment.
+SERVERLESS = os.environ.get("SERVERLESS", "0") == "1"
+if SERVERLESS:
+    INSTALLED_APPS.remove("django.contrib.admin")
+    MIDDLEWARE.remove("core.instrumentation.InstrumentationMiddleware")
+
+# Per-view timing and query profiling (core.instrumentation). SAMPLE_RATE is the
+# fraction of requests profiled; a query shape repeated more than
+# N_PLUS_ONE_THRESHOLD times in one request is reported as a likely N+1.
+INSTRUMENTATION = {
+    "SAMPLE_RATE": float(os.environ.get("INSTRUMENTATION_SAMPLE_RATE", "0.05")),
+    "N_PLUS_ONE_THRESHOLD": 10,
+}
+
 ROOT_URLCONF = "core.urls"
 
+# RENDER_PROFILE=production compiles each template once and for all (cached
+# loader, no template debug info) and turns on the "render" cache below for
+# anonymous pages and dashboard panels. "development" picks up template edits.
+RENDER_PROFILE = os.environ.get("RENDER_PROFILE", "development")
+PRODUCTION_RENDER = RENDER_PROFILE == "production"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
+        "APP_DIRS": not PRODUCTION_RENDER,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -71,20 +96,171 @@ TEMPLATES = [
         },
     },
 ]
+if PRODUCTION_RENDER:
+    TEMPLATES[0]["OPTIONS"]["debug"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        )
+    ]
 
 ASGI_APPLICATION = "core.asgi.application"
 
+# Serve the user views and the API from their async implementations
+# (users.async_views, */async_router.py). Only useful under ASGI.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "0") == "1"
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_PROFILE=production reuses connections (with health checks) and tunes
+# SQLite for several concurrent workers; "development" keeps the defaults.
+# DB_ENGINE=postgres switches to PostgreSQL, optionally with psycopg's
+# connection pool (POSTGRES_POOL=1, needs psycopg[pool]).
+DB_PROFILE = os.environ.get("DB_PROFILE", "development")
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+PRODUCTION_DB = DB_PROFILE == "production"
+POSTGRES_POOL = DB_ENGINE == "postgres" and os.environ.get("POSTGRES_POOL") == "1"
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "marketplace"),
+            "USER": os.environ.get("POSTGRES_USER", "marketplace"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "OPTIONS": {},
+        }
+    }
+    if POSTGRES_POOL:
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN", "2")),
+            "max_size": int(os.environ.get("POSTGRES_POOL_MAX", "10")),
+            "timeout": 10,
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {},
+        }
+    }
+    if PRODUCTION_DB:
+        # Take the write lock when a transaction starts, so two transactions
+        # that read before writing wait on busy_timeout instead of one of them
+        # failing at once with "database is locked".
+        DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+
+# Persistent connections are per thread, which ASGI does not keep stable;
+# async deployments and pooled Postgres close connections after each request.
+DATABASES["default"]["CONN_MAX_AGE"] = int(
+    os.environ.get(
+        "DB_CONN_MAX_AGE",
+        "60" if PRODUCTION_DB and not (ASYNC_VIEWS or POSTGRES_POOL) else "0",
+    )
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = PRODUCTION_DB
+
+# Applied to every new SQLite connection by core.db.
+SQLITE_PRAGMAS = (
+    {
+        "journal_mode": "wal",
+        # Durable at checkpoints only; WAL keeps the database consistent.
+        "synchronous": "normal",
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "cache_size": -int(os.environ.get("SQLITE_CACHE_KB", "65536")),
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_BYTES", str(256 * 2**20))),
+        "temp_store": "memory",
     }
+    if PRODUCTION_DB
+    else {}
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Rendered pages and dashboard panels; a no-op unless PRODUCTION_RENDER.
+    "render": {
+        "BACKEND": (
+            "django.core.cache.backends.locmem.LocMemCache"
+            if PRODUCTION_RENDER
+            else "django.core.cache.backends.dummy.DummyCache"
+        ),
+        "LOCATION": "render",
+    },
+}
+
+# Full pages for anonymous visitors (core.pagecache) and per-user dashboard
+# panels (users.panels), kept in the ALIAS cache. The "render" cache above is
+# per process: a contract saved through one worker leaves the dashboards the
+# others cached stale for up to PANEL_TIMEOUT. With several workers, point
+# ALIAS at a shared (memcached/redis) cache.
+RENDER_CACHE = {
+    "ALIAS": "render",
+    "PAGE_TIMEOUT": 600,
+    "PANEL_TIMEOUT": 300,
 }
 
+# Catalog read-through cache (products.cache). Set SHARED_ALIAS to a CACHES
+# alias (e.g. memcached/redis) to share entries between worker processes.
+CATALOG_CACHE = {
+    "MAX_ENTRIES": 2048,
+    "TIMEOUT": 300,
+    "SHARED_ALIAS": None,
+}
+
+# Compiled contract pricing rules (contracts.rules) are reloaded by each
+# process after TIMEOUT seconds; local rule changes apply immediately.
+PRICING_RULES = {
+    "TIMEOUT": 60,
+}
+
+# Live stock and price updates over server-sent events (products.live). BROKER
+# carries them between processes; the local one reaches this process only, so
+# point it at a cross-process broker when running several workers. A client
+# more than QUEUE_SIZE products behind is told to resync rather than buffered
+# for; updates to a product within COALESCE seconds go out as one.
+LIVE_UPDATES = {
+    "BROKER": "core.pubsub.LocalBroker",
+    "QUEUE_SIZE": 256,
+    "COALESCE": 0.1,
+    "HEARTBEAT": 15,
+    "MAX_TOPICS": 100,
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+# New passwords use the first hasher. The others still verify existing hashes,
+# which are upgraded to the first one on the next successful login. Argon2
+# (users.hashers) is preferred when argon2-cffi is installed; Django's scrypt
+# settings already match one of OWASP's recommended cost profiles.
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+if importlib.util.find_spec("argon2"):
+    PASSWORD_HASHERS.insert(0, "users.hashers.Argon2PasswordHasher")
+
+# Threads for hashing from async views, and processes for
+# User.objects.bulk_create_users; defaults to the CPU count.
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", "0"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -105,6 +281,30 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# API tokens (users.tokens)
+# JWT_KEYS is "kid:secret,kid:secret"; the first key signs, all of them verify.
+# To rotate, prepend a new key and drop the old one after REFRESH_TTL. Without
+# it a key is derived from SECRET_KEY. Used refresh tokens are recorded in the
+# database; prune them with `manage.py prune_revoked_tokens`. Revoked access
+# tokens are kept in process memory (at most REVOCATION_CACHE_SIZE, after which
+# all older access tokens are refused until they expire); set SHARED_ALIAS to a
+# CACHES alias to share them between processes, or a logout holds elsewhere
+# only once the access token expires (ACCESS_TTL).
+
+JWT_AUTH = {
+    "KEYS": dict(
+        key.split(":", 1)
+        for key in os.environ.get("JWT_KEYS", "").split(",")
+        if ":" in key
+    ),
+    "ALGORITHM": "HS256",
+    "ACCESS_TTL": 300,
+    "REFRESH_TTL": 14 * 24 * 3600,
+    "REVOCATION_CACHE_SIZE": 10000,
+    "SHARED_ALIAS": None,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -122,9 +322,24 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+
+# Product image renditions (products.images). WORKERS is the size of the
+# Pillow process pool; 0 renders inline when the saving transaction commits.
+IMAGE_PROCESSING = {
+    "WIDTHS": (320, 800, 1600),
+    "QUALITY": 80,
+    "WORKERS": int(os.environ.get("IMAGE_WORKERS", "2")),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Primary key format for model_utils.generate_id: "sortable" (26-char ULID) or
+# "legacy" (the old decimal uuid4().time strings). Existing rows keep their ids.
+ID_GENERATOR = os.environ.get("ID_GENERATOR", "sortable")
+
 LOGIN_REDIRECT_URL = "dashboard"
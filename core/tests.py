@@ -0,0 +1,308 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from contracts.models import Contract, DashboardSummary
+from core import coldstart
+from core.benchdata import Seeder
+from core.benchmarks import compare, metric
+from core.instrumentation import QueryRecorder, _finish, metrics, sql_shape
+from core.loadtest import host_header
+from core.paginator import EstimatedCountPaginator
+from core.query_audit import full_scans
+from products.models import Category, Product, ProductImage
+from users.models import Address, User
+
+
+class QueryPlanAuditTests(TestCase):
+    def test_canonical_queries_use_indexes(self) -> None:
+        out = StringIO()
+        call_command("audit_query_plans", stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+
+    def test_detects_full_scans(self) -> None:
+        plan = Product.objects.filter(name="Rice").explain()
+        self.assertEqual(full_scans(plan), ["products_product"])
+        self.assertEqual(
+            full_scans("Seq Scan on users_user  (cost=0.00..1.01 rows=1)"),
+            ["users_user"],
+        )
+        self.assertEqual(
+            full_scans("SCAN products_product USING INDEX product_created_id"), []
+        )
+
+
+@override_settings(INSTRUMENTATION={"SAMPLE_RATE": 1.0, "N_PLUS_ONE_THRESHOLD": 3})
+class InstrumentationTests(TestCase):
+    def setUp(self) -> None:
+        metrics.reset()
+
+    def test_records_views_and_serves_prometheus_text(self) -> None:
+        self.client.get("/api/products/")
+        stats = metrics.views["api-1.0.0:list_products"]
+        self.assertEqual(stats.requests, 1)
+        self.assertGreaterEqual(stats.queries, 1)
+
+        admin = User.objects.create_superuser(
+            email="admin@example.com",
+            phone="1",
+            password="password",
+            date_of_birth=date(1990, 1, 1),
+        )
+        self.assertEqual(self.client.get("/admin/metrics/").status_code, 302)
+        self.client.force_login(admin)
+        body = self.client.get("/admin/metrics/").content.decode()
+        self.assertIn(
+            'marketplace_view_requests_total{view="api-1.0.0:list_products"} 1',
+            body,
+        )
+        self.assertIn("marketplace_sample_rate 1.0", body)
+
+    def test_flags_repeated_query_shapes(self) -> None:
+        recorder = QueryRecorder()
+        for pk in range(5):
+            recorder(
+                lambda *args: None,
+                f"SELECT * FROM users_user WHERE id = '{pk}'",
+                None,
+                False,
+                {},
+            )
+        request = RequestFactory().get("/")
+        with self.assertLogs("core.instrumentation", "WARNING"):
+            _finish(request, 0.0, recorder, threshold=3)
+        self.assertEqual(metrics.views["<unresolved>"].n_plus_one, 1)
+
+    def test_sql_shape(self) -> None:
+        self.assertEqual(
+            sql_shape("SELECT 1 FROM t WHERE id IN (%s, %s, %s) AND name = 'x'"),
+            "SELECT ? FROM t WHERE id IN (...) AND name = ?",
+        )
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": "wal", "busy_timeout": 1234})
+    def test_pragmas_are_set_on_new_connections(self) -> None:
+        with TemporaryDirectory() as tmp:
+            wrapper = DatabaseWrapper(
+                {**connection.settings_dict, "NAME": str(Path(tmp) / "db.sqlite3")},
+                alias="pragmas",
+            )
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEqual(cursor.fetchone()[0], "wal")
+                    cursor.execute("PRAGMA busy_timeout")
+                    self.assertEqual(cursor.fetchone()[0], 1234)
+            finally:
+                wrapper.close()
+
+    def profile_settings(self, profile: str) -> dict:
+        code = (
+            "import django, json; django.setup(); from django.conf import settings;"
+            "db = settings.DATABASES['default'];"
+            "print(json.dumps([db['CONN_MAX_AGE'], db['OPTIONS'],"
+            " settings.SQLITE_PRAGMAS]))"
+        )
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "core.settings",
+            "DB_PROFILE": profile,
+            "ASYNC_VIEWS": "0",
+            # Never connected to; settings only.
+            "SQLITE_PATH": "/nonexistent/db.sqlite3",
+        }
+        env.pop("DB_CONN_MAX_AGE", None)
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout
+        return dict(zip(("max_age", "options", "pragmas"), json.loads(output)))
+
+    def test_db_profiles(self) -> None:
+        production = self.profile_settings("production")
+        self.assertEqual(production["max_age"], 60)
+        self.assertEqual(production["options"], {"transaction_mode": "IMMEDIATE"})
+        self.assertEqual(production["pragmas"]["journal_mode"], "wal")
+
+        development = self.profile_settings("development")
+        self.assertEqual(development, {"max_age": 0, "options": {}, "pragmas": {}})
+
+
+class AdminChangelistTests(TestCase):
+    MODELS = (Product, ProductImage, Contract, Address, User)
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin = User.objects.create_superuser(
+            email="admin@example.com",
+            phone="0",
+            password="password",
+            date_of_birth=date(1990, 1, 1),
+        )
+        cls.category = Category.objects.create(name="Grains")
+
+    def seed(self, count: int) -> None:
+        start = User.objects.count()
+        for i in range(start, start + count):
+            farmer, buyer = [
+                User.objects.create_user(
+                    email=f"{kind}{i}@example.com",
+                    phone=f"{kind}{i}",
+                    password=None,
+                    date_of_birth=date(1990, 1, 1),
+                    user_type=kind,
+                )
+                for kind in (User.FARMER, User.BUYER)
+            ]
+            product = Product.objects.create(
+                user=farmer, name=f"P{i}", price=1, stock=10, category=self.category
+            )
+            ProductImage.objects.create(product=product, url="product_images/a.jpg")
+            Contract.objects.create(
+                buyer=buyer,
+                farmer=farmer,
+                product=product,
+                quantity=1,
+                terms_and_conditions="-",
+            )
+            Address.objects.create(
+                user=farmer,
+                name="Farm",
+                street_address="1 Main Road",
+                city="Mysuru",
+                state="Karnataka",
+                postal_code="570001",
+                country="India",
+            )
+
+    def changelist_queries(self) -> dict[str, int]:
+        self.client.force_login(self.admin)
+        counts = {}
+        for model in self.MODELS:
+            opts = model._meta
+            url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts[opts.model_name] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self) -> None:
+        self.seed(2)
+        few = self.changelist_queries()
+        self.seed(20)
+        self.assertEqual(self.changelist_queries(), few)
+
+    def test_estimated_count(self) -> None:
+        self.seed(3)
+        Product.objects.filter(name="P1").delete()
+        products = Product.objects.order_by("-id")
+        with mock.patch.object(EstimatedCountPaginator, "threshold", 1):
+            # MAX(rowid) still counts the deleted row.
+            self.assertEqual(EstimatedCountPaginator(products, 10).count, 3)
+            filtered = products.filter(in_stock=True)
+            self.assertEqual(EstimatedCountPaginator(filtered, 10).count, 2)
+        self.assertEqual(EstimatedCountPaginator(products, 10).count, 2)
+
+    def test_newest_first_across_legacy_ids(self) -> None:
+        with override_settings(ID_GENERATOR="legacy"):
+            self.seed(1)
+        self.seed(1)
+        self.client.force_login(self.admin)
+        for model, field in ((Contract, "start_date"), (User, "date_joined")):
+            opts = model._meta
+            url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+            rows = self.client.get(url).context["cl"].result_list
+            dates = [getattr(row, field) for row in rows]
+            self.assertEqual(dates, sorted(dates, reverse=True))
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_seeder(self) -> None:
+        counts = Seeder(DEFAULT_DB_ALIAS, batch_size=40).run(30, 100, 250)
+        self.assertEqual(counts, {"users": 30, "products": 100, "contracts": 250})
+        self.assertEqual(User.objects.filter(user_type=User.FARMER).count(), 3)
+        self.assertEqual(Product.objects.count(), 100)
+        # Dashboard stats are built for the bulk-created contracts.
+        totals = DashboardSummary.objects.aggregate(Sum("contracts"))
+        self.assertEqual(totals["contracts__sum"], 2 * 250)
+        self.assertTrue(User.objects.first().check_password("password"))
+
+        with self.assertRaisesMessage(CommandError, "already has users"):
+            call_command("seed_data", scale="tiny")
+
+    def test_seed_data_takes_zero_contracts(self) -> None:
+        out = StringIO()
+        call_command("seed_data", users=20, products=10, contracts=0, stdout=out)
+        self.assertIn("20 users, 10 products, 0 contracts", out.getvalue())
+        self.assertFalse(Contract.objects.exists())
+
+    def test_compare_flags_regressions_beyond_threshold(self) -> None:
+        baseline = {
+            "metrics": {
+                "micro.a": metric(100, "us/op", "lower"),
+                "micro.b": metric(100, "us/op", "lower"),
+                "macro.rps": metric(1000, "req/s", "higher"),
+                "macro.errors": metric(0, "requests", "lower"),
+            }
+        }
+        results = {
+            "metrics": {
+                "micro.a": metric(110, "us/op", "lower"),
+                "micro.b": metric(130, "us/op", "lower"),
+                "macro.rps": metric(700, "req/s", "higher"),
+                "macro.errors": metric(3, "requests", "lower"),
+                "micro.new": metric(1, "us/op", "lower"),
+            }
+        }
+        names = [name for name, *_ in compare(results, baseline, 0.15)]
+        self.assertEqual(names, ["macro.errors", "macro.rps", "micro.b"])
+        self.assertEqual(compare(baseline, baseline, 0.15), [])
+
+
+class ColdStartTests(SimpleTestCase):
+    def test_parse_importtime(self) -> None:
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     django.utils\n"
+            "import time:       300 |        420 |   django\n"
+            "import time:      5000 |       5000 | PIL.Image\n"
+            "unrelated line\n"
+        )
+        records = coldstart.parse_importtime(output)
+        self.assertEqual(
+            records[0], coldstart.ImportRecord("django.utils", 120, 120, 2)
+        )
+        self.assertEqual([r.depth for r in records], [2, 1, 0])
+        self.assertEqual(coldstart.by_package(records), {"PIL": 5000, "django": 420})
+
+    def test_serverless_profile_skips_admin_and_pillow(self) -> None:
+        env = coldstart.PROFILES["serverless"]
+        names = {record.name for record in coldstart.profile_imports(env)}
+        self.assertIn("ninja", names)
+        self.assertNotIn("django.contrib.admin.sites", names)
+        self.assertFalse(any(name.startswith("PIL") for name in names))
+
+        timings = coldstart.first_response("/about/", host_header(), env)
+        self.assertEqual(timings["status"], 200)
+        self.assertLess(timings["import_ms"], timings["first_response_ms"])
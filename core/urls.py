@@ -15,19 +15,43 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
+from django.apps import apps
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth.views import LoginView, LogoutView
-from users import views as user_views
+
+if settings.ASYNC_VIEWS:
+    from users import async_views as user_views
+
+    login_view = user_views.login_user
+else:
+    from users import views as user_views
+
+    login_view = LoginView.as_view(template_name="users/login.html")
+from core.api import api
+from products import live
 
 urlpatterns = [
     path("", user_views.home, name="home"),
-    path("admin/", admin.site.urls),
+    # Ahead of the API, whose /products/{product_id} would match it.
+    path("api/products/live", live.stream, name="product-live"),
+    path("api/", api.urls),
     path("register/", user_views.register_user, name="register"),
-    path("login/", LoginView.as_view(template_name="users/login.html"), name="login"),
+    path("login/", login_view, name="login"),
     path(
         "logout/", LogoutView.as_view(template_name="users/logout.html"), name="logout"
     ),
     path("about/", user_views.about, name="about"),
     path("dashboard/", user_views.dashboard, name="dashboard"),
 ]
+
+# Left out of serverless deployments (settings.SERVERLESS).
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    from core.views import prometheus_metrics
+
+    urlpatterns += [
+        path("admin/metrics/", prometheus_metrics, name="metrics"),
+        path("admin/", admin.site.urls),
+    ]
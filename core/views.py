@@ -0,0 +1,13 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+
+from core.instrumentation import instrumentation_options, metrics
+
+
+@staff_member_required
+def prometheus_metrics(request):
+    sample_rate, _ = instrumentation_options()
+    return HttpResponse(
+        metrics.to_prometheus(sample_rate),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,13 +1,73 @@
+import os
+import time
+from threading import Lock
 from uuid import uuid4
 from datetime import datetime, timezone
 from calendar import timegm
 from django.conf import settings
 
+_CROCKFORD_BASE32: str = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS: int = 80
+# Every 10-bit value spelled as two base32 digits, so encoding takes 13 steps.
+_BASE32_PAIRS: tuple[str, ...] = tuple(
+    a + b for a in _CROCKFORD_BASE32 for b in _CROCKFORD_BASE32
+)
 
-def generate_id() -> str:
+_sortable_lock = Lock()
+_last_ms: int = 0
+_last_random: int = 0
+
+
+def _reset_sortable_state() -> None:
+    # A forked child would otherwise keep counting from its parent's state and
+    # hand out the same ids.
+    global _last_ms, _last_random
+    _last_ms = _last_random = 0
+
+
+os.register_at_fork(after_in_child=_reset_sortable_state)
+
+
+def generate_legacy_id() -> str:
     return f"{uuid4().time}"
 
 
+def generate_sortable_id() -> str:
+    """26-character ULID: 48-bit millisecond timestamp + 80 random bits.
+
+    Ids sort lexicographically in creation order, so inserts append to the
+    right edge of the primary key index. Within one millisecond (or if the
+    clock steps back) the random part is incremented, keeping ids strictly
+    increasing per process; fresh randomness per millisecond keeps separate
+    processes from colliding.
+    """
+    global _last_ms, _last_random
+    with _sortable_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        else:
+            ms = _last_ms
+            _last_random += 1
+            if _last_random >> _RANDOM_BITS:
+                ms += 1
+                _last_random = int.from_bytes(os.urandom(10), "big")
+        _last_ms = ms
+        value = (ms << _RANDOM_BITS) | _last_random
+
+    pairs = []
+    for _ in range(13):
+        pairs.append(_BASE32_PAIRS[value & 1023])
+        value >>= 10
+    return "".join(reversed(pairs))
+
+
+def generate_id() -> str:
+    if getattr(settings, "ID_GENERATOR", "sortable") == "legacy":
+        return generate_legacy_id()
+    return generate_sortable_id()
+
+
 def make_utc(dt: datetime) -> datetime:
     if settings.USE_TZ and dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
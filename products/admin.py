@@ -1,3 +1,35 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.paginator import EstimatedCountPaginator
+from products.models import Category, Product, ProductImage
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "category", "price", "stock", "in_stock")
+    list_select_related = ("user", "category")
+    # Served by the product_in_stock_category index.
+    list_filter = ("in_stock", "category")
+    search_fields = ("name",)
+    autocomplete_fields = ("user", "category")
+    # Matches the product_created_id index, so pages are index range reads.
+    ordering = ("-created_on", "-id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ProductImage)
+class ProductImageAdmin(admin.ModelAdmin):
+    list_display = ("id", "product", "width", "height")
+    list_select_related = ("product",)
+    autocomplete_fields = ("product",)
+    # Images have no timestamp, and legacy ids do not sort by age; group them
+    # by product instead.
+    ordering = ("product", "id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
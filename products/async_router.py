@@ -0,0 +1,161 @@
+from typing import Literal, Optional
+
+from asgiref.sync import sync_to_async
+from ninja import File, Query, Router
+from ninja.errors import HttpError
+from ninja.files import UploadedFile
+
+from core.exports import export_response
+from products import exports, nearby, pricehistory
+from products.cache import get_catalog_cache
+from products.models import Product
+from products.router import (
+    DEFAULT_PAGE_SIZE,
+    IMPORT_RESPONSES,
+    MAX_PAGE_SIZE,
+    NearbyPage,
+    NearbyParams,
+    PriceHistoryOut,
+    PriceHistoryParams,
+    ProductFilters,
+    ProductPage,
+    ProductSearchPage,
+    filter_products,
+    history_out,
+    history_range,
+    run_import,
+    seek_queryset,
+    serialize_product,
+    split_page,
+)
+from products.schemas import ProductOut
+from products.search import get_search_backend
+from users.auth import async_api_auth
+
+router = Router(tags=["products"])
+
+
+def _catalog():
+    return Product.objects.select_related("category").prefetch_related("images")
+
+
+@router.get("/", response=ProductPage)
+async def list_products(
+    request,
+    filters: Query[ProductFilters],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    async def load() -> dict:
+        queryset = seek_queryset(filter_products(_catalog(), filters), cursor)
+        rows = [product async for product in queryset[: limit + 1]]
+        items, next_cursor = split_page(rows, limit)
+        return {
+            "items": [serialize_product(product) for product in items],
+            "next_cursor": next_cursor,
+        }
+
+    cache = get_catalog_cache()
+    params = {**filters.model_dump(), "cursor": cursor, "limit": limit}
+    return await cache.aget_or_set(await cache.alisting_key(params), load)
+
+
+@router.get("/search", response=ProductSearchPage)
+async def search_products(
+    request, q: str, page: int = 1, limit: int = DEFAULT_PAGE_SIZE
+):
+    page = max(1, page)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # The FTS index is only reachable through a raw cursor, which has no async
+    # API; that one call runs in the thread pool.
+    ids = await sync_to_async(get_search_backend().search)(
+        q, offset=(page - 1) * limit, limit=limit + 1
+    )
+    has_next = len(ids) > limit
+    ids = ids[:limit]
+
+    products = {p.pk: p async for p in _catalog().filter(pk__in=ids)}
+    return {
+        "items": [products[pk] for pk in ids if pk in products],
+        "page": page,
+        "next_page": page + 1 if has_next else None,
+    }
+
+
+@router.get("/nearby", response=NearbyPage)
+async def nearby_products(request, params: Query[NearbyParams]):
+    limit = max(1, min(params.limit, MAX_PAGE_SIZE))
+    args = (params.latitude, params.longitude, params.radius_km)
+    addresses = [row async for row in nearby.farmer_addresses(*args)]
+    distances = nearby.farmer_distances(addresses, *args)
+    if not distances:
+        return {"items": []}
+    candidates = [row async for row in nearby.in_stock_products(distances)]
+    ranked = nearby.rank(candidates, distances, limit)
+    products = {
+        p.pk: p async for p in _catalog().filter(pk__in=[pk for pk, _ in ranked])
+    }
+    return {
+        "items": [
+            {"product": products[pk], "distance_km": round(distance, 3)}
+            for pk, distance in ranked
+            if pk in products
+        ]
+    }
+
+
+@router.get("/export", auth=async_api_auth)
+async def export_products(request, format: Literal["csv", "jsonl"] = "csv"):
+    queryset = exports.export_queryset(request.auth)
+    return export_response(request, queryset, exports.FIELDS, format, "products")
+
+
+@router.post("/import", auth=async_api_auth, response=IMPORT_RESPONSES)
+async def import_products(
+    request,
+    file: UploadedFile = File(...),
+    format: Optional[Literal["csv", "jsonl"]] = None,
+):
+    # Parsing and the batched inserts are CPU and sync ORM work.
+    return await sync_to_async(run_import)(request.auth, file, format)
+
+
+@router.get("/price-history", response=PriceHistoryOut)
+async def category_price_history(
+    request, category: int, params: Query[PriceHistoryParams]
+):
+    """Prices set in a category, per bucket.
+
+    Each point covers only the products whose price was set (or that were
+    created) in it, not the category's price level.
+    """
+    since, until = history_range(params)
+    rows = pricehistory.category_history(category, since, until, params.bucket)
+    return history_out(params, since, until, [row async for row in rows])
+
+
+@router.get("/{product_id}/price-history", response=PriceHistoryOut)
+async def product_price_history(
+    request, product_id: str, params: Query[PriceHistoryParams]
+):
+    since, until = history_range(params)
+    opening = await pricehistory.opening_price(product_id, since).afirst()
+    if opening is None and not await Product.objects.filter(pk=product_id).aexists():
+        raise HttpError(404, "Not Found")
+    rows = pricehistory.product_history(product_id, since, until, params.bucket)
+    return history_out(params, since, until, [row async for row in rows], opening)
+
+
+@router.get("/{product_id}", response=ProductOut)
+async def get_product(request, product_id: str):
+    async def load() -> dict:
+        try:
+            product = await _catalog().aget(pk=product_id)
+        except Product.DoesNotExist:
+            raise HttpError(404, "Not Found")
+        return serialize_product(product)
+
+    cache = get_catalog_cache()
+    return await cache.aget_or_set(cache.product_key(product_id), load)
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-process mapping with per-entry expiry and LRU eviction."""
+
+    def __init__(self, max_entries: int, timeout: float) -> None:
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CatalogCache:
+    """Read-through cache for serialized catalog data.
+
+    Lookups go to the in-process LRU first, then to the optional shared
+    Django cache, then to the loader. Product entries are keyed by id and
+    dropped individually; listing entries embed a version number, so one bump
+    invalidates every cached listing at once. Other processes keep their local
+    copies until ``timeout`` runs out.
+    """
+
+    VERSION_KEY: str = "catalog:listing-version"
+
+    def __init__(
+        self, max_entries: int, timeout: float, shared_alias: Optional[str] = None
+    ) -> None:
+        self.local = LRUCache(max_entries, timeout)
+        self.timeout = timeout
+        self.shared = caches[shared_alias] if shared_alias else None
+        self._version = 1
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_set(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self.local.get(key)
+        if value is _MISSING and self.shared is not None:
+            value = self.shared.get(key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(key, value)
+
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = loader()
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, self.timeout)
+        return value
+
+    async def aget_or_set(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.local.get(key)
+        if value is _MISSING and self.shared is not None:
+            value = await self.shared.aget(key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(key, value)
+
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.aset(key, value, self.timeout)
+        return value
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def product_key(self, product_id: str) -> str:
+        return f"catalog:product:{product_id}"
+
+    def _listing_key(self, version: int, params: dict) -> str:
+        digest = blake2b(repr(sorted(params.items())).encode(), digest_size=16)
+        return f"catalog:listing:{version}:{digest.hexdigest()}"
+
+    def listing_key(self, params: dict) -> str:
+        return self._listing_key(self.listing_version(), params)
+
+    def listing_version(self) -> int:
+        if self.shared is None:
+            return self._version
+        return self.shared.get_or_set(self.VERSION_KEY, 1, None)
+
+    async def alisting_key(self, params: dict) -> str:
+        if self.shared is None:
+            return self.listing_key(params)
+        version = await self.shared.aget_or_set(self.VERSION_KEY, 1, None)
+        return self._listing_key(version, params)
+
+    def invalidate_product(self, product_id: str) -> None:
+        self.delete(self.product_key(product_id))
+        self.invalidate_listings()
+
+    def invalidate_listings(self) -> None:
+        self._version += 1
+        if self.shared is not None:
+            try:
+                self.shared.incr(self.VERSION_KEY)
+            except ValueError:
+                self.shared.set(self.VERSION_KEY, self._version, None)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.invalidate_listings()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.local),
+            "evictions": self.local.evictions,
+        }
+
+
+@lru_cache
+def get_catalog_cache() -> CatalogCache:
+    options = getattr(settings, "CATALOG_CACHE", {})
+    return CatalogCache(
+        max_entries=options.get("MAX_ENTRIES", 2048),
+        timeout=options.get("TIMEOUT", 300),
+        shared_alias=options.get("SHARED_ALIAS"),
+    )
@@ -0,0 +1,28 @@
+from typing import Optional
+
+from django.db.models import QuerySet
+
+from products.models import Product
+from users.models import User
+
+FIELDS: tuple[str, ...] = (
+    "id",
+    "created_on",
+    "user_id",
+    "name",
+    "description",
+    "price",
+    "min_quantity",
+    "max_quantity",
+    "stock",
+    "in_stock",
+    "category__name",
+)
+
+
+def export_queryset(user: Optional[User] = None) -> QuerySet:
+    """Everything for staff (or ``user=None``), otherwise the user's products."""
+    queryset = Product.objects.all()
+    if user is not None and not user.is_staff:
+        queryset = queryset.filter(user=user)
+    return queryset
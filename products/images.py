@@ -0,0 +1,162 @@
+import logging
+import posixpath
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha256
+from multiprocessing import get_context
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.db import connections, router, transaction
+
+from products.cache import get_catalog_cache
+from products.models import ProductImage
+
+logger = logging.getLogger("products.images")
+
+UPLOAD_DIR: str = "product_images"
+
+# Fields copied from an already processed image with the same content.
+PROCESSED_FIELDS: tuple[str, ...] = (
+    "url",
+    "digest",
+    "width",
+    "height",
+    "placeholder",
+    "renditions",
+)
+
+
+def image_options() -> tuple[tuple[int, ...], int, int]:
+    options = getattr(settings, "IMAGE_PROCESSING", {})
+    return (
+        tuple(options.get("WIDTHS", (320, 800, 1600))),
+        options.get("QUALITY", 80),
+        options.get("WORKERS", 2),
+    )
+
+
+def content_path(digest: str, filename: str) -> str:
+    # The two-character fan-out keeps any one directory small.
+    return f"{UPLOAD_DIR}/{digest[:2]}/{digest}/{filename}"
+
+
+@lru_cache
+def get_render_pool(workers: int) -> Executor:
+    # Spawned workers import only Pillow (products.imaging) and never inherit
+    # the parent's database connections or threads.
+    return ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+
+
+@lru_cache
+def get_dispatcher(workers: int) -> Executor:
+    # Storage and database work around each render runs here, off the
+    # request path; one thread per render worker keeps the pool busy.
+    return ThreadPoolExecutor(workers, thread_name_prefix="product-images")
+
+
+def render(data: bytes) -> dict:
+    # Imported on first use: Pillow is the slowest import of a cold start.
+    from products import imaging
+
+    widths, quality, workers = image_options()
+    if not workers:
+        return imaging.render(data, widths, quality)
+    future = get_render_pool(workers).submit(imaging.render, data, widths, quality)
+    return future.result()
+
+
+def _save(storage: Storage, name: str, content: bytes) -> str:
+    # Content-addressed names never change meaning, so an existing file is
+    # already the right one.
+    if storage.exists(name):
+        return name
+    return storage.save(name, ContentFile(content))
+
+
+def store_renditions(
+    data: bytes, digest: str, upload_name: str, storage: Storage
+) -> dict:
+    result = render(data)
+    renditions = []
+    for (width, extension), content in sorted(result["renditions"].items()):
+        name = content_path(digest, f"{width}w.{extension}")
+        renditions.append(
+            {"width": width, "format": extension, "name": _save(storage, name, content)}
+        )
+    extension = posixpath.splitext(upload_name)[1].lower()
+    return {
+        "url": _save(storage, content_path(digest, f"original{extension}"), data),
+        "digest": digest,
+        "width": result["width"],
+        "height": result["height"],
+        "placeholder": result["placeholder"],
+        "renditions": renditions,
+    }
+
+
+def process_image(image_id: str, using: Optional[str] = None) -> bool:
+    """Render and store the renditions of one uploaded image.
+
+    Uploads whose content was seen before reuse the stored files and skip
+    rendering. Returns whether the image ended up processed.
+    """
+    from products import imaging
+
+    using = using or router.db_for_write(ProductImage)
+    image = ProductImage.objects.using(using).filter(pk=image_id).first()
+    if image is None or not image.url:
+        return False
+    if image.is_processed:
+        return True
+
+    storage = image.url.storage
+    upload_name = image.url.name
+    try:
+        with image.url.open("rb") as file:
+            data = file.read()
+        digest = sha256(data).hexdigest()
+        seen = (
+            ProductImage.objects.using(using)
+            .filter(digest=digest)
+            .values(*PROCESSED_FIELDS)
+            .first()
+        )
+        fields = seen or store_renditions(data, digest, upload_name, storage)
+    except imaging.INVALID_IMAGE_ERRORS as exc:
+        logger.warning("Cannot process product image %s: %s", image_id, exc)
+        return False
+
+    images = ProductImage.objects.using(using)
+    images.filter(pk=image_id).update(**fields)
+    if fields["url"] != upload_name and not images.filter(url=upload_name).exists():
+        storage.delete(upload_name)
+    get_catalog_cache().invalidate_product(image.product_id)
+    return True
+
+
+def _process_in_background(image_id: str, using: str) -> None:
+    try:
+        process_image(image_id, using)
+    except Exception:
+        logger.exception("Processing product image %s failed", image_id)
+    finally:
+        connections[using].close()
+
+
+def schedule_processing(image: ProductImage, using: str) -> None:
+    """Process ``image`` once the transaction that saved it commits."""
+    if image.is_processed or not image.url:
+        return
+    workers = image_options()[2]
+    if not workers:
+        transaction.on_commit(lambda: process_image(image.pk, using), using=using)
+        return
+    transaction.on_commit(
+        lambda: get_dispatcher(workers).submit(
+            _process_in_background, image.pk, using
+        ),
+        using=using,
+    )
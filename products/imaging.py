@@ -0,0 +1,70 @@
+"""Pillow work for product images.
+
+Nothing here touches Django, so spawned pool workers only import Pillow.
+"""
+from base64 import b64encode
+from io import BytesIO
+
+from PIL import Image, ImageFilter, ImageOps
+
+# Pillow format name -> file extension.
+FORMATS: dict[str, str] = {"WEBP": "webp", "JPEG": "jpg"}
+
+PLACEHOLDER_WIDTH: int = 16
+
+# What decoding raises for unreadable, truncated or oversized uploads.
+INVALID_IMAGE_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    Image.DecompressionBombError,
+)
+
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    out = BytesIO()
+    if fmt == "JPEG":
+        image.save(out, fmt, quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(out, fmt, quality=quality, method=4)
+    return out.getvalue()
+
+
+def _resize(image: Image.Image, width: int) -> Image.Image:
+    height = max(1, round(image.height * width / image.width))
+    # reduce() does most of the shrinking cheaply on the decoded pixels before
+    # the resampling filter runs.
+    return image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+
+def placeholder(image: Image.Image) -> str:
+    """A blurred ~16px JPEG as a data URI, small enough to inline in JSON."""
+    tiny = _resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    data = _encode(tiny, "JPEG", 50)
+    return "data:image/jpeg;base64," + b64encode(data).decode()
+
+
+def render(data: bytes, widths: tuple[int, ...], quality: int) -> dict:
+    """Decode ``data`` once and encode every rendition.
+
+    Widths wider than the source collapse to the source width, so images are
+    never upscaled.
+    """
+    with Image.open(BytesIO(data)) as source:
+        # Let JPEG decode at a reduced scale when even the largest rendition
+        # is much smaller than the upload.
+        source.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    targets = sorted({min(width, image.width) for width in widths})
+    renditions = {}
+    for width in targets:
+        resized = image if width == image.width else _resize(image, width)
+        for fmt, extension in FORMATS.items():
+            renditions[(width, extension)] = _encode(resized, fmt, quality)
+
+    # Dimensions of the largest rendition, for clients to reserve layout space.
+    return {
+        "width": resized.width,
+        "height": resized.height,
+        "placeholder": placeholder(image),
+        "renditions": renditions,
+    }
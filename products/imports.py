@@ -0,0 +1,275 @@
+import csv
+import json
+from io import TextIOWrapper
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO, Iterable, Iterator, Optional
+
+from django.db import router, transaction
+
+from products import live, pricehistory
+from products.cache import get_catalog_cache
+from products.models import Category, Product
+from products.search import get_search_backend
+from users.models import User
+
+FORMATS: tuple[str, ...] = ("csv", "jsonl")
+
+DEFAULT_BATCH_SIZE: int = 5000
+
+# Product.price is DecimalField(max_digits=10, decimal_places=2).
+MAX_PRICE: Decimal = Decimal("100000000")
+PAISA: Decimal = Decimal("0.01")
+
+# Column defaults mirror the model field defaults.
+DEFAULTS: dict[str, object] = {
+    "description": None,
+    "min_quantity": 1,
+    "max_quantity": 10000,
+    "stock": 0,
+    "category": None,
+}
+
+
+class ImportReport:
+    def __init__(self) -> None:
+        self.created = 0
+        self.errors: list[tuple[int, list[str]]] = []
+        # Why the input could not be read to the end, if it could not.
+        self.failure: Optional[str] = None
+
+    def as_dict(self, max_errors: Optional[int] = None) -> dict:
+        return {
+            "created": self.created,
+            "failure": self.failure,
+            "error_count": len(self.errors),
+            "errors": [
+                {"line": line, "errors": messages}
+                for line, messages in self.errors[:max_errors]
+            ],
+        }
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    """Yield ``(line number, raw row)`` without reading the whole input."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else {"__invalid__": line}
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _text(raw) -> str:
+    return str(raw).strip()
+
+
+def _integer(raw) -> int:
+    if isinstance(raw, float) and not raw.is_integer():
+        raise ValueError(raw)
+    return int(raw) if isinstance(raw, (int, float)) else int(raw.strip())
+
+
+def _amount(raw) -> Decimal:
+    # Via str so JSON floats keep their written precision.
+    return Decimal(str(raw).strip())
+
+
+def _column(rows: list[dict], name: str, parse, errors: list[list[str]]) -> list:
+    values = []
+    for row, row_errors in zip(rows, errors):
+        raw = row.get(name)
+        if _blank(raw):
+            if name not in DEFAULTS:
+                row_errors.append(f"{name} is required.")
+            values.append(DEFAULTS.get(name))
+            continue
+        try:
+            values.append(parse(raw))
+        except (TypeError, ValueError, InvalidOperation):
+            row_errors.append(f"{name} is not valid: {raw!r}.")
+            values.append(None)
+    return values
+
+
+def validate_batch(rows: list[dict]) -> tuple[dict[str, list], list[list[str]]]:
+    """Parse a batch into columns and check ``Product.clean``'s invariants.
+
+    Returns the parsed columns and one error list per row.
+    """
+    errors: list[list[str]] = [
+        ["Row is not a JSON object."] if "__invalid__" in row else [] for row in rows
+    ]
+    columns = {
+        "name": _column(rows, "name", _text, errors),
+        "description": _column(rows, "description", _text, errors),
+        "price": _column(rows, "price", _amount, errors),
+        "min_quantity": _column(rows, "min_quantity", _integer, errors),
+        "max_quantity": _column(rows, "max_quantity", _integer, errors),
+        "stock": _column(rows, "stock", _integer, errors),
+        "category": _column(rows, "category", _text, errors),
+    }
+
+    for i, (row_errors, name, price, low, high, stock, category) in enumerate(
+        zip(
+            errors,
+            columns["name"],
+            columns["price"],
+            columns["min_quantity"],
+            columns["max_quantity"],
+            columns["stock"],
+            columns["category"],
+        )
+    ):
+        if row_errors:
+            continue
+        if len(name) > 256:
+            row_errors.append("name must be at most 256 characters.")
+        if category is not None and len(category) > 100:
+            row_errors.append("category must be at most 100 characters.")
+        if not (price.is_finite() and 0 <= price < MAX_PRICE):
+            row_errors.append("price must be between 0 and 99999999.99.")
+        elif price != price.quantize(PAISA):
+            row_errors.append(f"price has fractions of a paisa: {price}.")
+        else:
+            # "1.000" is a valid price too.
+            columns["price"][i] = price.quantize(PAISA)
+        if low > stock:
+            row_errors.append(
+                f"Minimum quantity ({low}) cannot exceed the current stock level ({stock})."
+            )
+        if high < low:
+            row_errors.append(
+                f"Maximum quantity ({high}) cannot be less than minimum quantity ({low})."
+            )
+        if high < stock:
+            row_errors.append(
+                f"Maximum quantity ({high}) cannot be less than current stock level ({stock})."
+            )
+        if low < 1:
+            row_errors.append("Minimum quantity must be at least 1.")
+        if high < 1:
+            row_errors.append("Maximum quantity must be at least 1.")
+        if stock < 0:
+            row_errors.append("Stock cannot be negative.")
+
+    return columns, errors
+
+
+def resolve_categories(
+    names: Iterable[str], known: dict[str, Category], using: str
+) -> None:
+    """Fill ``known`` with a Category for every name, creating missing ones."""
+    missing = {name for name in names if name and name not in known}
+    if not missing:
+        return
+    for category in Category.objects.using(using).filter(name__in=missing):
+        known.setdefault(category.name, category)
+    to_create = [Category(name=name) for name in missing if name not in known]
+    for category in Category.objects.using(using).bulk_create(to_create):
+        known[category.name] = category
+
+
+def import_products(
+    rows: Iterable[tuple[int, dict]],
+    user: User,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    using: Optional[str] = None,
+) -> ImportReport:
+    """Validate and insert products in batches, collecting per-row errors.
+
+    Each batch is parsed column by column, resolves its categories with one
+    lookup (plus one bulk insert for new names) and is written with one
+    ``bulk_create``. Invalid rows are reported and skipped. Input that cannot
+    be read (bad bytes, broken CSV quoting) stops the import and is reported
+    as ``failure``; the batches before it stay committed.
+    """
+    using = using or router.db_for_write(Product)
+    report = ImportReport()
+    categories: dict[str, Category] = {}
+    rows = iter(rows)
+
+    while True:
+        try:
+            batch = list(islice(rows, batch_size))
+        except (ValueError, csv.Error) as exc:
+            # UnicodeDecodeError included.
+            report.failure = str(exc)
+            break
+        if not batch:
+            break
+        line_numbers = [line for line, _ in batch]
+        columns, errors = validate_batch([row for _, row in batch])
+
+        valid = [i for i, row_errors in enumerate(errors) if not row_errors]
+        report.errors.extend(
+            (line_numbers[i], row_errors)
+            for i, row_errors in enumerate(errors)
+            if row_errors
+        )
+        if not valid:
+            continue
+
+        with transaction.atomic(using=using):
+            resolve_categories(
+                (columns["category"][i] for i in valid), categories, using
+            )
+            products = Product.objects.using(using).bulk_create(
+                [
+                    Product(
+                        user=user,
+                        name=columns["name"][i],
+                        description=columns["description"][i],
+                        price=columns["price"][i],
+                        min_quantity=columns["min_quantity"][i],
+                        max_quantity=columns["max_quantity"][i],
+                        stock=columns["stock"][i],
+                        in_stock=columns["stock"][i] > 0,
+                        category=categories.get(columns["category"][i]),
+                    )
+                    for i in valid
+                ]
+            )
+            # bulk_create skips post_save, which normally keeps these current.
+            get_search_backend(using).index(products)
+            pricehistory.record(map(pricehistory.change_of, products), using)
+            live.publish_on_commit(products, using)
+        get_catalog_cache().invalidate_listings()
+        report.created += len(products)
+
+    return report
+
+
+def guess_format(filename: str) -> str:
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot tell the import format of {filename!r}")
+    return extension
+
+
+def import_file(
+    file: IO[bytes],
+    fmt: str,
+    user: User,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    using: Optional[str] = None,
+) -> ImportReport:
+    # utf-8-sig drops the byte order mark spreadsheet exports like to add.
+    stream = TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        return import_products(read_rows(stream, fmt), user, batch_size, using)
+    finally:
+        stream.detach()
@@ -0,0 +1,159 @@
+"""Live stock and price updates for buyer dashboards, as server-sent events.
+
+``GET /api/products/live?products=<id>,<id>&categories=<id>`` streams an
+``update`` event with a product's price, stock and in_stock after each
+committed change to it, ``resync`` when the client fell too far behind and
+should refetch, and a comment every HEARTBEAT seconds so that proxies keep
+the idle connection open. The subscription is in place once the first line
+arrives; load the products after that and no change is missed in between.
+
+Each connection is a coroutine waiting on the hub (core.pubsub), so this is
+served from the ASGI app only.
+"""
+import json
+from decimal import Decimal
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, Optional
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router, transaction
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.module_loading import import_string
+
+from core.pubsub import Hub
+from products.models import Product
+
+FIELDS: tuple[str, ...] = ("id", "category_id", "price", "stock", "in_stock")
+# Milliseconds a disconnected EventSource waits before reconnecting.
+RETRY_MS: int = 3000
+
+
+def live_options() -> dict:
+    options = getattr(settings, "LIVE_UPDATES", {})
+    return {
+        "broker": options.get("BROKER", "core.pubsub.LocalBroker"),
+        "queue_size": options.get("QUEUE_SIZE", 256),
+        "coalesce": options.get("COALESCE", 0.1),
+        "heartbeat": options.get("HEARTBEAT", 15),
+        "max_topics": options.get("MAX_TOPICS", 100),
+    }
+
+
+@lru_cache
+def get_hub() -> Hub:
+    options = live_options()
+    return Hub(import_string(options["broker"])(), options["queue_size"])
+
+
+def product_topic(product_id: str) -> str:
+    return f"product:{product_id}"
+
+
+def category_topic(category_id) -> str:
+    return f"category:{category_id}"
+
+
+def product_data(product: Product) -> dict:
+    return {
+        "id": product.pk,
+        "category": product.category_id,
+        "price": format(Decimal(str(product.price)), ".2f"),
+        "stock": product.stock,
+        "in_stock": product.in_stock,
+    }
+
+
+def publish(data: dict) -> None:
+    hub = get_hub()
+    if not hub.is_listening():
+        return
+    topics = [product_topic(data["id"])]
+    if data["category"] is not None:
+        topics.append(category_topic(data["category"]))
+    hub.publish(topics, data["id"], data)
+
+
+def publish_on_commit(products: Iterable[Product], using: str, **extra) -> None:
+    # Taken now: the instances may change again before the commit.
+    updates = [{**product_data(product), **extra} for product in products]
+
+    def send() -> None:
+        for data in updates:
+            publish(data)
+
+    transaction.on_commit(send, using=using)
+
+
+def publish_changed(product_ids: Iterable[str], using: Optional[str] = None) -> None:
+    """Publish products changed by queryset updates, which skip the signals.
+
+    Call it once the update has committed. The new values are read only if
+    anyone is listening.
+    """
+    if not get_hub().is_listening():
+        return
+    using = using or router.db_for_read(Product)
+    products = Product.objects.using(using).filter(pk__in=product_ids).only(*FIELDS)
+    for product in products:
+        publish(product_data(product))
+
+
+def _ids(raw: str) -> list[str]:
+    return [part.strip() for part in raw.split(",") if part.strip()]
+
+
+def encode(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def events(topics: list[str], options: dict) -> AsyncIterator[str]:
+    hub = get_hub()
+    subscription = hub.subscribe(topics)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            messages, overflowed = await subscription.get(
+                options["heartbeat"], options["coalesce"]
+            )
+            if overflowed:
+                yield encode("resync", {})
+            elif messages:
+                yield "".join(encode("update", data) for data in messages)
+            else:
+                yield ": keep-alive\n\n"
+    finally:
+        # Django cancels the stream when the client disconnects.
+        hub.unsubscribe(subscription)
+
+
+async def stream(request: HttpRequest) -> HttpResponse:
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        # WSGI would hold a worker thread for as long as the client listens.
+        return HttpResponse("Live updates need the ASGI server.", status=501)
+    options = live_options()
+    topics = [product_topic(pk) for pk in _ids(request.GET.get("products", ""))]
+    topics += [category_topic(pk) for pk in _ids(request.GET.get("categories", ""))]
+    if not 0 < len(topics) <= options["max_topics"]:
+        return JsonResponse(
+            {
+                "detail": f"Subscribe to between 1 and {options['max_topics']} "
+                "products and categories."
+            },
+            status=400,
+        )
+    response = StreamingHttpResponse(
+        events(topics, options), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx would otherwise buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
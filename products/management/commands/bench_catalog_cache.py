@@ -0,0 +1,72 @@
+import random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from core.bench import benchmark_database, make_bench_user
+from products.cache import CatalogCache
+from products.models import Product, ProductImage
+from products.router import serialize_product
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare cached and uncached ProductOut serialization throughput."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--images", type=int, default=3)
+        parser.add_argument("--reads", type=int, default=20000)
+        parser.add_argument("--max-entries", type=int, default=2048)
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            self.run(using, options)
+
+    def run(self, using: str, options: dict) -> None:
+        farmer = make_bench_user(using, User.FARMER)
+        products = Product.objects.using(using).bulk_create(
+            Product(user=farmer, name=f"P{i}", price=i, stock=10)
+            for i in range(options["products"])
+        )
+        ProductImage.objects.using(using).bulk_create(
+            ProductImage(product=product, url=f"product_images/{product.id}_{n}.jpg")
+            for product in products
+            for n in range(options["images"])
+        )
+
+        # Skewed access: most reads hit a small set of popular products.
+        rng = random.Random(0)
+        ids = [p.id for p in products]
+        reads = [
+            ids[min(int(rng.paretovariate(1.2)) - 1, len(ids) - 1)]
+            for _ in range(options["reads"])
+        ]
+        queryset = (
+            Product.objects.using(using)
+            .select_related("category")
+            .prefetch_related("images")
+        )
+
+        def load(product_id: str) -> dict:
+            return serialize_product(queryset.get(pk=product_id))
+
+        started = perf_counter()
+        for product_id in reads:
+            load(product_id)
+        uncached = perf_counter() - started
+
+        cache = CatalogCache(max_entries=options["max_entries"], timeout=300)
+        started = perf_counter()
+        for product_id in reads:
+            cache.get_or_set(
+                cache.product_key(product_id), lambda: load(product_id)
+            )
+        cached = perf_counter() - started
+
+        count = len(reads)
+        self.stdout.write(f"uncached: {count / uncached:,.0f} reads/s")
+        self.stdout.write(f"cached:   {count / cached:,.0f} reads/s")
+        self.stdout.write(f"speedup:  {uncached / cached:.1f}x, {cache.stats()}")
@@ -0,0 +1,53 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from products.imports import DEFAULT_BATCH_SIZE, FORMATS, guess_format, import_file
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Bulk import products for a farmer from a CSV or JSONL file."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Farmer user id.")
+        parser.add_argument("--format", choices=sorted(FORMATS))
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--show-errors", type=int, default=20, help="Invalid rows to print."
+        )
+
+    def handle(self, *args, **options) -> None:
+        using = options["database"]
+        try:
+            user = User.objects.using(using).get(pk=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with id {options['user']}")
+        if user.user_type != User.FARMER:
+            raise CommandError("Products can only be imported for farmers")
+
+        try:
+            fmt = options["format"] or guess_format(options["path"])
+            started = perf_counter()
+            with open(options["path"], "rb") as file:
+                report = import_file(
+                    file, fmt, user, options["batch_size"], using=using
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        elapsed = perf_counter() - started
+
+        for line, messages in report.errors[: options["show_errors"]]:
+            self.stderr.write(f"line {line}: {' '.join(messages)}")
+        rows = report.created + len(report.errors)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report.created} products, {len(report.errors)} invalid "
+                f"rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)"
+            )
+        )
+        if report.failure is not None:
+            raise CommandError(f"Stopped early: {report.failure}")
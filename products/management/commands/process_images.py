@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from products.images import image_options, process_image
+from products.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = "Generate renditions for product images that have not been processed."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options) -> None:
+        using = options["database"]
+        ids = list(
+            ProductImage.objects.using(using)
+            .filter(digest="")
+            .values_list("pk", flat=True)
+        )
+
+        def process(image_id: str) -> bool:
+            try:
+                return process_image(image_id, using)
+            finally:
+                connections[using].close()
+
+        started = perf_counter()
+        # Each thread waits on the render pool, which spreads across CPUs.
+        with ThreadPoolExecutor(max(1, image_options()[2])) as executor:
+            done = sum(executor.map(process, ids))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {done} of {len(ids)} images "
+                f"in {perf_counter() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:05
+
+import model_utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='id',
+            field=models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='id',
+            field=models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,157 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:03
+
+import time
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_current_prices(apps, schema_editor):
+    # Earlier prices were never kept; each history starts with today's.
+    using = schema_editor.connection.alias
+    Product = apps.get_model("products", "Product")
+    PriceChange = apps.get_model("products", "PriceChange")
+    ProductPriceRollup = apps.get_model("products", "ProductPriceRollup")
+    CategoryPriceRollup = apps.get_model("products", "CategoryPriceRollup")
+
+    at = int(time.time())
+    day = at // 86400
+    changes, rollups, categories = [], [], {}
+    for pk, category, price in Product.objects.using(using).values_list(
+        "pk", "category_id", "price"
+    ):
+        paise = int(round(price * 100))
+        changes.append(PriceChange(product_id=pk, price=paise, at=at))
+        rollups.append(
+            ProductPriceRollup(
+                product_id=pk, day=day, changes=1, total=paise, low=paise, high=paise
+            )
+        )
+        if category is not None:
+            rollup = categories.setdefault(
+                category,
+                CategoryPriceRollup(
+                    category_id=category, day=day, total=0, low=paise, high=paise
+                ),
+            )
+            rollup.changes += 1
+            rollup.total += paise
+            rollup.low = min(rollup.low, paise)
+            rollup.high = max(rollup.high, paise)
+
+    PriceChange.objects.using(using).bulk_create(changes, batch_size=5000)
+    ProductPriceRollup.objects.using(using).bulk_create(rollups, batch_size=5000)
+    CategoryPriceRollup.objects.using(using).bulk_create(categories.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_image_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryPriceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.IntegerField()),
+                ("changes", models.IntegerField(default=0)),
+                ("total", models.BigIntegerField(default=0)),
+                ("low", models.BigIntegerField()),
+                ("high", models.BigIntegerField()),
+                (
+                    "category",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="products.category",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("category", "day"), name="category_price_rollup_key"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="PriceChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price", models.BigIntegerField()),
+                ("at", models.BigIntegerField()),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_changes",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["product", "at"], name="price_change_product_at"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductPriceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.IntegerField()),
+                ("changes", models.IntegerField(default=0)),
+                ("total", models.BigIntegerField(default=0)),
+                ("low", models.BigIntegerField()),
+                ("high", models.BigIntegerField()),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "day"), name="product_price_rollup_key"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(record_current_prices, migrations.RunPython.noop),
+    ]
@@ -14,7 +14,7 @@ class Category(models.Model):
 
 
 class Product(models.Model):
-    id: str = models.CharField(max_length=20, default=generate_id, primary_key=True)
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
 
     created_on: datetime = models.DateTimeField(default=aware_utcnow)
 
@@ -36,6 +36,31 @@ class Product(models.Model):
         Category, on_delete=models.SET_NULL, null=True, blank=True
     )
 
+    class Meta:
+        indexes = [
+            # Catalog keyset pagination (products.router.seek_queryset).
+            models.Index(fields=["-created_on", "-id"], name="product_created_id"),
+            # In-stock listing per category, newest first.
+            models.Index(
+                fields=["category", "-created_on"],
+                condition=models.Q(in_stock=True),
+                name="product_in_stock_category",
+            ),
+            # A farmer's own products.
+            models.Index(fields=["user", "-created_on"], name="product_user_created"),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        product = super().from_db(db, field_names, values)
+        # The stored price, so that a save can tell whether it changed
+        # (products.signals.record_price_change); DEFERRED if not loaded.
+        product._stored_price = product.__dict__.get("price", models.DEFERRED)
+        return product
+
     def clean(self) -> None:
 
         if self.min_quantity > self.stock:
@@ -65,8 +90,79 @@ class Product(models.Model):
 
 
 class ProductImage(models.Model):
-    id: str = models.CharField(max_length=20, default=generate_id, primary_key=True)
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
     product: Product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="images"
     )
     url: str = models.ImageField(upload_to="product_images/")
+
+    # Filled in by products.images once the upload has been processed.
+    digest: str = models.CharField(max_length=64, blank=True, db_index=True)
+    width: int = models.PositiveIntegerField(null=True, blank=True)
+    height: int = models.PositiveIntegerField(null=True, blank=True)
+    placeholder: str = models.TextField(blank=True)
+    renditions: list = models.JSONField(default=list, blank=True)
+
+    @property
+    def is_processed(self) -> bool:
+        return bool(self.digest)
+
+
+class PriceChange(models.Model):
+    """A price a product took on; appended by ``products.pricehistory``."""
+
+    product: Product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="price_changes", db_index=False
+    )
+    # Paise and epoch seconds: plain integers, stored in a few bytes each.
+    price: int = models.BigIntegerField()
+    at: int = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "at"], name="price_change_product_at"),
+        ]
+
+
+class PriceRollup(models.Model):
+    """Price changes in one UTC day: how many, their sum, lowest and highest."""
+
+    # Days since 1970-01-01 (UTC).
+    day: int = models.IntegerField()
+    changes: int = models.IntegerField(default=0)
+    total: int = models.BigIntegerField(default=0)
+    low: int = models.BigIntegerField()
+    high: int = models.BigIntegerField()
+
+    class Meta:
+        abstract = True
+
+
+class ProductPriceRollup(PriceRollup):
+    product: Product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day"], name="product_price_rollup_key"
+            ),
+        ]
+
+
+class CategoryPriceRollup(PriceRollup):
+    # By the product's category when the price changed. Only the prices set
+    # that day, not every product's current one (see products.pricehistory).
+    # Kept when products are deleted, so a category's history does not
+    # rewrite itself.
+    category: Category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "day"], name="category_price_rollup_key"
+            ),
+        ]
@@ -0,0 +1,81 @@
+from functools import reduce
+from operator import or_
+from typing import Iterable, Optional
+
+from django.db.models import Q, QuerySet
+
+from products.models import Product
+from users import geo
+from users.models import Address, User
+
+MAX_RADIUS_KM: float = 500.0
+
+
+def farmer_addresses(latitude: float, longitude: float, radius_km: float) -> QuerySet:
+    """Farmer addresses in the geohash cells that cover the search circle.
+
+    Each cell is a ``geohash >= p AND geohash < p~`` range over the
+    ``address_geohash`` index. ``LIKE 'p%'`` would read the same rows but
+    SQLite only turns it into a range for case-insensitive columns.
+    """
+    cells = reduce(
+        or_,
+        (
+            Q(geohash__gte=prefix, geohash__lt=prefix + geo.PREFIX_END)
+            for prefix in geo.covering_prefixes(latitude, longitude, radius_km)
+        ),
+    )
+    return Address.objects.filter(cells, user__user_type=User.FARMER).values_list(
+        "user_id", "latitude", "longitude"
+    )
+
+
+def farmer_distances(
+    rows: Iterable[tuple], latitude: float, longitude: float, radius_km: float
+) -> dict[str, float]:
+    """Distance to each farmer's nearest address, for those within the radius."""
+    distances: dict[str, float] = {}
+    for user_id, lat, lon in rows:
+        distance = geo.distance_km(latitude, longitude, lat, lon)
+        if distance <= radius_km and distance < distances.get(user_id, radius_km + 1):
+            distances[user_id] = distance
+    return distances
+
+
+def in_stock_products(farmers: Iterable[str]) -> QuerySet:
+    # Served by the product_user_created index, one range per farmer.
+    return Product.objects.filter(user_id__in=farmers, in_stock=True).values_list(
+        "id", "user_id", "created_on"
+    )
+
+
+def rank(
+    rows: Iterable[tuple], distances: dict[str, float], limit: int
+) -> list[tuple[str, float]]:
+    """The ``limit`` nearest products as (id, distance), newest first on ties."""
+    rows = sorted(rows, key=lambda row: row[2], reverse=True)
+    rows.sort(key=lambda row: distances[row[1]])
+    return [(pk, distances[user_id]) for pk, user_id, _ in rows[:limit]]
+
+
+def nearby_products(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: int,
+    queryset: Optional[QuerySet] = None,
+) -> list[tuple[Product, float]]:
+    """In-stock products of farmers within ``radius_km``, nearest first."""
+    distances = farmer_distances(
+        farmer_addresses(latitude, longitude, radius_km),
+        latitude,
+        longitude,
+        radius_km,
+    )
+    if not distances:
+        return []
+    ranked = rank(in_stock_products(distances), distances, limit)
+    products = (queryset if queryset is not None else Product.objects).in_bulk(
+        [pk for pk, _ in ranked]
+    )
+    return [(products[pk], distance) for pk, distance in ranked if pk in products]
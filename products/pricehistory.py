@@ -0,0 +1,228 @@
+"""Price history: every price a product takes on, and daily rollups of it.
+
+``Product.price`` is overwritten in place, so each change is appended to
+``PriceChange`` (integer paise, epoch seconds) and added to the daily rollups
+of the product and of its category in the same transaction. A chart over any
+range groups at most one rollup row per day in a single query and never reads
+the raw changes.
+
+A category's series is of the prices set in it, not of its price level: a
+day's rollup covers only the products priced (or created) that day, and
+products that kept their price add nothing. One product of a thousand cut to
+Rs.5 makes that day's low, high and average all Rs.5.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Max, Min, QuerySet, Sum, Value
+from django.db.models.functions import Greatest, Least
+
+from model_utils import aware_utcnow, datetime_to_epoch
+from products.models import (
+    CategoryPriceRollup,
+    PriceChange,
+    Product,
+    ProductPriceRollup,
+)
+
+DAY: str = "day"
+WEEK: str = "week"
+SECONDS_PER_DAY: int = 86400
+EPOCH: date = date(1970, 1, 1)
+# 1970-01-01 was a Thursday; shifting by three days starts weeks on Monday.
+WEEK_OFFSET: int = 3
+
+# (product id, category id, price in paise, epoch seconds)
+Change = tuple[str, Optional[int], int, int]
+# (product or category id, day number)
+RollupKey = tuple[object, int]
+
+
+def to_paise(price) -> int:
+    return int(round(Decimal(str(price)) * 100))
+
+
+def from_paise(paise: int) -> Decimal:
+    return Decimal(paise).scaleb(-2)
+
+
+def day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def change_of(product: Product, at: Optional[int] = None) -> Change:
+    at = datetime_to_epoch(aware_utcnow()) if at is None else at
+    return product.pk, product.category_id, to_paise(product.price), at
+
+
+def tally(changes: Iterable[Change], field: int) -> dict[RollupKey, list]:
+    """[changes, total, low, high] per (product or category, day)."""
+    rollups: dict[RollupKey, list] = {}
+    for change in changes:
+        owner, price, day = change[field], change[2], change[3] // SECONDS_PER_DAY
+        if owner is None:
+            continue
+        rollup = rollups.get((owner, day))
+        if rollup is None:
+            rollups[owner, day] = [1, price, price, price]
+        else:
+            rollup[0] += 1
+            rollup[1] += price
+            rollup[2] = min(rollup[2], price)
+            rollup[3] = max(rollup[3], price)
+    return rollups
+
+
+def _upsert(model, key: dict, delta: list, using: str) -> None:
+    manager = model.objects.using(using)
+    changes, total, low, high = delta
+    increments = {
+        "changes": F("changes") + changes,
+        "total": F("total") + total,
+        "low": Least(F("low"), Value(low)),
+        "high": Greatest(F("high"), Value(high)),
+    }
+    if manager.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic(using=using):
+            manager.create(**key, changes=changes, total=total, low=low, high=high)
+    except IntegrityError:
+        # Another transaction created the row first.
+        manager.filter(**key).update(**increments)
+
+
+def _apply(model, field: str, rollups: dict[RollupKey, list], using: str) -> None:
+    if not rollups:
+        return
+    manager = model.objects.using(using)
+    existing = set(
+        manager.filter(
+            **{f"{field}__in": {owner for owner, _ in rollups}},
+            day__in={day for _, day in rollups},
+        ).values_list(field, "day")
+    )
+    # Rows no one has yet are inserted together: one query for a whole import.
+    fresh = {key: delta for key, delta in rollups.items() if key not in existing}
+    try:
+        with transaction.atomic(using=using):
+            manager.bulk_create(
+                model(
+                    **{field: owner},
+                    day=day,
+                    changes=changes,
+                    total=total,
+                    low=low,
+                    high=high,
+                )
+                for (owner, day), (changes, total, low, high) in fresh.items()
+            )
+    except IntegrityError:
+        # Another transaction created some of them first.
+        fresh = {}
+    for (owner, day), delta in rollups.items():
+        if (owner, day) not in fresh:
+            _upsert(model, {field: owner, "day": day}, delta, using)
+
+
+def record(changes: Iterable[Change], using: Optional[str] = None) -> None:
+    """Append ``changes`` and add them to the product and category rollups.
+
+    Called by the ``Product`` signals; writes that skip them (``bulk_create``,
+    ``update``) call it themselves.
+    """
+    using = using or router.db_for_write(PriceChange)
+    changes = list(changes)
+    if not changes:
+        return
+    with transaction.atomic(using=using):
+        PriceChange.objects.using(using).bulk_create(
+            PriceChange(product_id=product, price=price, at=at)
+            for product, _, price, at in changes
+        )
+        _apply(ProductPriceRollup, "product_id", tally(changes, 0), using)
+        _apply(CategoryPriceRollup, "category_id", tally(changes, 1), using)
+
+
+def align(since: date, bucket: str) -> date:
+    """The start of the bucket ``since`` falls in."""
+    if bucket == WEEK:
+        return since - timedelta(days=(day_number(since) + WEEK_OFFSET) % 7)
+    return since
+
+
+def day_range(since: date, until: date, bucket: str) -> tuple[int, int]:
+    return day_number(align(since, bucket)), day_number(until)
+
+
+def bucketed(
+    rollups: QuerySet, since: date, until: date, bucket: str = DAY
+) -> QuerySet:
+    """Lowest, highest and summed prices per bucket, in one grouped query."""
+    key = F("day") if bucket == DAY else (F("day") + WEEK_OFFSET) / 7
+    return (
+        rollups.filter(day__range=day_range(since, until, bucket))
+        .annotate(bucket=key)
+        .values("bucket")
+        .annotate(
+            bucket_changes=Sum("changes"),
+            bucket_total=Sum("total"),
+            bucket_low=Min("low"),
+            bucket_high=Max("high"),
+        )
+        .order_by("bucket")
+    )
+
+
+def product_history(
+    product_id: str, since: date, until: date, bucket: str = DAY
+) -> QuerySet:
+    return bucketed(
+        ProductPriceRollup.objects.filter(product_id=product_id), since, until, bucket
+    )
+
+
+def category_history(
+    category_id: int, since: date, until: date, bucket: str = DAY
+) -> QuerySet:
+    """The prices set in a category per bucket; unchanged products add nothing."""
+    return bucketed(
+        CategoryPriceRollup.objects.filter(category_id=category_id),
+        since,
+        until,
+        bucket,
+    )
+
+
+def opening_price(product_id: str, since: date) -> QuerySet:
+    """The price in effect when ``since`` began, as a one-value queryset."""
+    return (
+        PriceChange.objects.filter(
+            product_id=product_id, at__lt=day_number(since) * SECONDS_PER_DAY
+        )
+        .order_by("-at")
+        .values_list("price", flat=True)[:1]
+    )
+
+
+def bucket_start(bucket: int, size: str) -> date:
+    days = bucket if size == DAY else bucket * 7 - WEEK_OFFSET
+    return EPOCH + timedelta(days=days)
+
+
+def points(rows: Iterable[dict], bucket: str) -> list[dict]:
+    return [
+        {
+            "start": bucket_start(row["bucket"], bucket),
+            "low": from_paise(row["bucket_low"]),
+            "high": from_paise(row["bucket_high"]),
+            "average": from_paise(
+                round(Decimal(row["bucket_total"]) / row["bucket_changes"])
+            ),
+            "changes": row["bucket_changes"],
+        }
+        for row in rows
+    ]
+
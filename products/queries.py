@@ -0,0 +1,49 @@
+from datetime import date
+
+from core.query_audit import register
+from products import nearby, pricehistory
+from products.models import Product
+
+
+@register("products.catalog_page")
+def catalog_page():
+    return Product.objects.order_by("-created_on", "-id")[:21]
+
+
+@register("products.in_stock_by_category")
+def in_stock_by_category():
+    return Product.objects.filter(category_id=1, in_stock=True).order_by(
+        "-created_on"
+    )[:21]
+
+
+@register("products.farmer_products")
+def farmer_products():
+    return Product.objects.filter(user_id="0").order_by("-created_on")
+
+
+@register("products.nearby_in_stock")
+def nearby_in_stock():
+    return nearby.in_stock_products(["0", "1"])
+
+
+@register("products.nearby_farmers")
+def nearby_farmers():
+    return nearby.farmer_addresses(12.9716, 77.5946, 25.0)
+
+
+@register("products.weekly_price_history")
+def weekly_price_history():
+    return pricehistory.product_history(
+        "0", date(2024, 1, 1), date(2024, 12, 31), pricehistory.WEEK
+    )
+
+
+@register("products.category_price_history")
+def category_price_history():
+    return pricehistory.category_history(1, date(2024, 1, 1), date(2024, 12, 31))
+
+
+@register("products.opening_price")
+def opening_price():
+    return pricehistory.opening_price("0", date(2024, 1, 1))
@@ -0,0 +1,319 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Literal, Optional
+
+from django.db.models import Q, QuerySet
+from django.shortcuts import get_object_or_404
+from ninja import Field, File, Query, Router, Schema
+from ninja.errors import HttpError
+from ninja.files import UploadedFile
+
+from core.exports import export_response
+from model_utils import aware_utcnow
+from products import exports, imports, nearby, pricehistory
+from products.cache import get_catalog_cache
+from products.models import Product
+from products.schemas import ProductOut
+from products.search import get_search_backend
+from users.auth import api_auth
+from users.models import User
+
+router = Router(tags=["products"])
+
+DEFAULT_PAGE_SIZE: int = 20
+MAX_PAGE_SIZE: int = 100
+MAX_REPORTED_ERRORS: int = 1000
+DEFAULT_HISTORY_DAYS: int = 365
+MAX_HISTORY_DAYS: int = 5 * 366
+
+
+class ProductFilters(Schema):
+    category: Optional[int] = None
+    in_stock: Optional[bool] = None
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    user: Optional[str] = None
+
+
+class ProductPage(Schema):
+    items: list[ProductOut]
+    next_cursor: Optional[str] = None
+
+
+class ProductSearchPage(Schema):
+    items: list[ProductOut]
+    page: int
+    next_page: Optional[int] = None
+
+
+class NearbyParams(Schema):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    radius_km: float = Field(25.0, gt=0, le=nearby.MAX_RADIUS_KM)
+    limit: int = DEFAULT_PAGE_SIZE
+
+
+class NearbyProductOut(Schema):
+    product: ProductOut
+    distance_km: float
+
+
+class NearbyPage(Schema):
+    items: list[NearbyProductOut]
+
+
+class PriceHistoryParams(Schema):
+    since: Optional[date] = None
+    until: Optional[date] = None
+    bucket: Literal["day", "week"] = pricehistory.DAY
+
+
+class PricePointOut(Schema):
+    start: date
+    low: Decimal
+    high: Decimal
+    average: Decimal
+    changes: int
+
+
+class PriceHistoryOut(Schema):
+    bucket: str
+    since: date
+    until: date
+    # The price when the range began; None for categories.
+    opening: Optional[Decimal] = None
+    points: list[PricePointOut]
+
+
+class ImportRowError(Schema):
+    line: int
+    errors: list[str]
+
+
+class ImportReportOut(Schema):
+    created: int
+    # Set, with status 400, when the file could not be read to the end; the
+    # ``created`` products before that point were kept.
+    failure: Optional[str] = None
+    error_count: int
+    errors: list[ImportRowError]
+
+
+IMPORT_RESPONSES: dict = {200: ImportReportOut, 400: ImportReportOut}
+
+
+def encode_cursor(created_on: datetime, pk: str) -> str:
+    raw = f"{created_on.isoformat()}|{pk}".encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_on, pk = raw.split("|", 1)
+        return datetime.fromisoformat(created_on), pk
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise HttpError(400, "Invalid cursor")
+
+
+def serialize_product(product: Product) -> dict:
+    return ProductOut.from_orm(product).model_dump(by_alias=True)
+
+
+def run_import(
+    user: User, file: UploadedFile, format: Optional[str]
+) -> tuple[int, dict]:
+    if user.user_type != User.FARMER:
+        raise HttpError(403, "Only farmers can import products")
+    try:
+        fmt = format or imports.guess_format(file.name)
+    except ValueError as exc:
+        raise HttpError(400, str(exc))
+    report = imports.import_file(file.file, fmt, user)
+    status = 200 if report.failure is None else 400
+    return status, report.as_dict(max_errors=MAX_REPORTED_ERRORS)
+
+
+def history_range(params: PriceHistoryParams) -> tuple[date, date]:
+    until = params.until or aware_utcnow().date()
+    since = params.since or until - timedelta(days=DEFAULT_HISTORY_DAYS - 1)
+    if since > until:
+        raise HttpError(400, "since cannot be after until")
+    if (until - since).days >= MAX_HISTORY_DAYS:
+        raise HttpError(400, f"At most {MAX_HISTORY_DAYS} days at a time")
+    # Whole buckets only, and the opening price is the one they start with.
+    return pricehistory.align(since, params.bucket), until
+
+
+def history_out(
+    params: PriceHistoryParams,
+    since: date,
+    until: date,
+    rows: list[dict],
+    opening: Optional[int] = None,
+) -> dict:
+    return {
+        "bucket": params.bucket,
+        "since": since,
+        "until": until,
+        "opening": None if opening is None else pricehistory.from_paise(opening),
+        "points": pricehistory.points(rows, params.bucket),
+    }
+
+
+def filter_products(queryset: QuerySet, filters: ProductFilters) -> QuerySet:
+    if filters.category is not None:
+        queryset = queryset.filter(category_id=filters.category)
+    if filters.in_stock is not None:
+        queryset = queryset.filter(in_stock=filters.in_stock)
+    if filters.min_price is not None:
+        queryset = queryset.filter(price__gte=filters.min_price)
+    if filters.max_price is not None:
+        queryset = queryset.filter(price__lte=filters.max_price)
+    if filters.user is not None:
+        queryset = queryset.filter(user_id=filters.user)
+    return queryset
+
+
+def seek_queryset(queryset: QuerySet, cursor: Optional[str]) -> QuerySet:
+    # Newest first. The (created_on, id) pair is unique, so seeking past the
+    # last row of the previous page never skips or repeats a product.
+    queryset = queryset.order_by("-created_on", "-id")
+    if cursor:
+        created_on, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_on__lt=created_on) | Q(created_on=created_on, id__lt=pk)
+        )
+    return queryset
+
+
+def split_page(rows: list[Product], limit: int) -> tuple[list[Product], Optional[str]]:
+    # Callers fetch one extra row to learn whether another page exists.
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_on, last.id)
+
+
+def paginate_keyset(
+    queryset: QuerySet, cursor: Optional[str], limit: int
+) -> tuple[list[Product], Optional[str]]:
+    return split_page(list(seek_queryset(queryset, cursor)[: limit + 1]), limit)
+
+
+@router.get("/", response=ProductPage)
+def list_products(
+    request,
+    filters: Query[ProductFilters],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    def load() -> dict:
+        queryset = filter_products(
+            Product.objects.select_related("category").prefetch_related("images"),
+            filters,
+        )
+        items, next_cursor = paginate_keyset(queryset, cursor, limit)
+        return {
+            "items": [serialize_product(product) for product in items],
+            "next_cursor": next_cursor,
+        }
+
+    cache = get_catalog_cache()
+    params = {**filters.model_dump(), "cursor": cursor, "limit": limit}
+    return cache.get_or_set(cache.listing_key(params), load)
+
+
+@router.get("/search", response=ProductSearchPage)
+def search_products(request, q: str, page: int = 1, limit: int = DEFAULT_PAGE_SIZE):
+    page = max(1, page)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    ids = get_search_backend().search(q, offset=(page - 1) * limit, limit=limit + 1)
+    has_next = len(ids) > limit
+    ids = ids[:limit]
+
+    products = (
+        Product.objects.select_related("category")
+        .prefetch_related("images")
+        .in_bulk(ids)
+    )
+    return {
+        "items": [products[pk] for pk in ids if pk in products],
+        "page": page,
+        "next_page": page + 1 if has_next else None,
+    }
+
+
+@router.get("/nearby", response=NearbyPage)
+def nearby_products(request, params: Query[NearbyParams]):
+    limit = max(1, min(params.limit, MAX_PAGE_SIZE))
+    found = nearby.nearby_products(
+        params.latitude,
+        params.longitude,
+        params.radius_km,
+        limit,
+        Product.objects.select_related("category").prefetch_related("images"),
+    )
+    return {
+        "items": [
+            {"product": product, "distance_km": round(distance, 3)}
+            for product, distance in found
+        ]
+    }
+
+
+@router.get("/export", auth=api_auth)
+def export_products(request, format: Literal["csv", "jsonl"] = "csv"):
+    queryset = exports.export_queryset(request.auth)
+    return export_response(request, queryset, exports.FIELDS, format, "products")
+
+
+@router.post("/import", auth=api_auth, response=IMPORT_RESPONSES)
+def import_products(
+    request,
+    file: UploadedFile = File(...),
+    format: Optional[Literal["csv", "jsonl"]] = None,
+):
+    return run_import(request.auth, file, format)
+
+
+@router.get("/price-history", response=PriceHistoryOut)
+def category_price_history(request, category: int, params: Query[PriceHistoryParams]):
+    """Prices set in a category, per bucket.
+
+    Each point covers only the products whose price was set (or that were
+    created) in it, not the category's price level.
+    """
+    since, until = history_range(params)
+    rows = pricehistory.category_history(category, since, until, params.bucket)
+    return history_out(params, since, until, list(rows))
+
+
+@router.get("/{product_id}/price-history", response=PriceHistoryOut)
+def product_price_history(request, product_id: str, params: Query[PriceHistoryParams]):
+    since, until = history_range(params)
+    opening = pricehistory.opening_price(product_id, since).first()
+    # Only a product priced after ``since`` (or none at all) has no opening.
+    if opening is None and not Product.objects.filter(pk=product_id).exists():
+        raise HttpError(404, "Not Found")
+    rows = pricehistory.product_history(product_id, since, until, params.bucket)
+    return history_out(params, since, until, list(rows), opening)
+
+
+@router.get("/{product_id}", response=ProductOut)
+def get_product(request, product_id: str):
+    def load() -> dict:
+        product = get_object_or_404(
+            Product.objects.select_related("category").prefetch_related("images"),
+            pk=product_id,
+        )
+        return serialize_product(product)
+
+    cache = get_catalog_cache()
+    return cache.get_or_set(cache.product_key(product_id), load)
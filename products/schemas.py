@@ -1,16 +1,39 @@
-from ninja import ModelSchema
+from ninja import ModelSchema, Schema
 
 from products.models import Product, ProductImage
 
 
+class RenditionOut(Schema):
+    width: int
+    format: str
+    url: str
+
+
 class ProductImageOut(ModelSchema):
+    renditions: list[RenditionOut]
+
     class Meta:
         model = ProductImage
-        fields = ("url",)
+        fields = ("url", "width", "height", "placeholder")
+
+    @staticmethod
+    def resolve_renditions(obj: ProductImage) -> list[dict]:
+        # Cached catalog entries are already serialized.
+        if isinstance(obj, dict):
+            return obj["renditions"]
+        storage = obj.url.storage
+        return [
+            {
+                "width": rendition["width"],
+                "format": rendition["format"],
+                "url": storage.url(rendition["name"]),
+            }
+            for rendition in obj.renditions
+        ]
 
 
 class ProductOut(ModelSchema):
-    product_images: list[ProductImageOut]
+    images: list[ProductImageOut]
 
     class Meta:
         model = Product
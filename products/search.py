@@ -0,0 +1,176 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from products.models import Product
+
+FTS_TABLE: str = "products_product_fts"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query: str) -> list[str]:
+    return _TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend:
+    """Keeps a text index of ``Product.name``/``Product.description``."""
+
+    def __init__(self, using: str) -> None:
+        self.using = using
+
+    def index(self, products: Iterable[Product]) -> None:
+        raise NotImplementedError
+
+    def remove(self, product_ids: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def rebuild(self, batch_size: int = 2000) -> int:
+        raise NotImplementedError
+
+    def search(self, query: str, offset: int, limit: int) -> list[str]:
+        """Return product ids for ``query`` ordered best match first."""
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """FTS5 inverted index, ranked with BM25 with the name weighted above the description."""
+
+    NAME_WEIGHT: float = 10.0
+    DESCRIPTION_WEIGHT: float = 1.0
+
+    def _match_expression(self, query: str) -> str:
+        # Every token is quoted so user input can never be parsed as FTS5
+        # syntax; the trailing * turns it into a prefix match.
+        tokens = " ".join(f'"{token}"*' for token in tokenize(query))
+        return f"{{name description}} : ({tokens})" if tokens else ""
+
+    def _delete(self, cursor, product_ids: list[str]) -> None:
+        # product_id is itself a full-text column so that deletes are index
+        # lookups rather than scans of the whole virtual table.
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [(f'product_id : "{pk}"',) for pk in product_ids],
+        )
+
+    def index(self, products: Iterable[Product]) -> None:
+        rows = [(p.pk, p.name, p.description or "") for p in products]
+        if not rows:
+            return
+        with connections[self.using].cursor() as cursor:
+            self._delete(cursor, [row[0] for row in rows])
+            self._insert(cursor, rows)
+
+    def remove(self, product_ids: Iterable[str]) -> None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        with connections[self.using].cursor() as cursor:
+            self._delete(cursor, product_ids)
+
+    def rebuild(self, batch_size: int = 2000) -> int:
+        total = 0
+        rows = (
+            Product.objects.using(self.using)
+            .order_by()
+            .values_list("id", "name", "description")
+            .iterator(chunk_size=batch_size)
+        )
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            batch = []
+            for pk, name, description in rows:
+                batch.append((pk, name, description or ""))
+                if len(batch) >= batch_size:
+                    total += self._insert(cursor, batch)
+                    batch = []
+            total += self._insert(cursor, batch)
+            # Merge the b-tree segments left behind by many small inserts.
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+            )
+        return total
+
+    def _insert(self, cursor, batch: list[tuple[str, str, str]]) -> int:
+        if batch:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (product_id, name, description) "
+                "VALUES (%s, %s, %s)",
+                batch,
+            )
+        return len(batch)
+
+    def search(self, query: str, offset: int, limit: int) -> list[str]:
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT product_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, 0, %s, %s) LIMIT %s OFFSET %s",
+                [
+                    expression,
+                    self.NAME_WEIGHT,
+                    self.DESCRIPTION_WEIGHT,
+                    limit,
+                    offset,
+                ],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class ORMSearchBackend(SearchBackend):
+    """Portable fallback that queries the product table directly.
+
+    Nothing is stored, so indexing is a no-op. Results are ranked by how many
+    tokens hit the name, then by recency.
+    """
+
+    def index(self, products: Iterable[Product]) -> None:
+        pass
+
+    def remove(self, product_ids: Iterable[str]) -> None:
+        pass
+
+    def rebuild(self, batch_size: int = 2000) -> int:
+        return 0
+
+    def search(self, query: str, offset: int, limit: int) -> list[str]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        condition = Q()
+        name_hits = Value(0)
+        for token in tokens:
+            condition &= Q(name__icontains=token) | Q(description__icontains=token)
+            name_hits += Case(
+                When(name__icontains=token, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+
+        return list(
+            Product.objects.using(self.using)
+            .filter(condition)
+            .annotate(rank=name_hits)
+            .order_by("-rank", "-created_on", "-id")
+            .values_list("id", flat=True)[offset : offset + limit]
+        )
+
+
+@lru_cache
+def get_search_backend(using: Optional[str] = None) -> SearchBackend:
+    using = using or router.db_for_write(Product)
+    path = getattr(settings, "PRODUCT_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)(using)
+    if connections[using].vendor == "sqlite":
+        return SQLiteFTSBackend(using)
+    return ORMSearchBackend(using)
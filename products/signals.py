@@ -0,0 +1,117 @@
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from products import live, pricehistory
+from products.cache import get_catalog_cache
+from products.images import schedule_processing
+from products.models import Category, Product, ProductImage
+from products.search import get_search_backend
+from users import panels
+
+# What live subscribers are sent (products.live.product_data).
+LIVE_FIELDS: frozenset[str] = frozenset({"price", "stock", "in_stock", "category"})
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance: Product, using: str, **kwargs) -> None:
+    get_search_backend(using).index([instance])
+    get_catalog_cache().invalidate_product(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance: Product, using: str, **kwargs) -> None:
+    get_search_backend(using).remove([instance.pk])
+    get_catalog_cache().invalidate_product(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_dashboard_panels(
+    sender, instance: Product, using: str, created: bool = False, **kwargs
+) -> None:
+    # The farmer's analytics panel lists product names; a new product has no
+    # contracts to show yet.
+    if not created:
+        transaction.on_commit(lambda: panels.invalidate([instance.user_id]), using)
+
+
+@receiver(pre_save, sender=Product)
+def load_deferred_price(
+    sender,
+    instance: Product,
+    using: str,
+    update_fields: Optional[frozenset],
+    **kwargs,
+) -> None:
+    # Loaded without the price but saving one: read the stored price before
+    # it is overwritten, or every such save would look like a change.
+    if getattr(instance, "_stored_price", None) is not DEFERRED:
+        return
+    if update_fields is not None and "price" not in update_fields:
+        return
+    instance._stored_price = (
+        sender.objects.using(using)
+        .filter(pk=instance.pk)
+        .values_list("price", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Product)
+def record_price_change(
+    sender,
+    instance: Product,
+    using: str,
+    created: bool,
+    update_fields: Optional[frozenset],
+    **kwargs,
+) -> None:
+    if update_fields is not None and "price" not in update_fields:
+        return
+    stored = getattr(instance, "_stored_price", None)
+    # An instance not loaded from the database may be changing any price.
+    if (
+        created
+        or stored is None
+        or pricehistory.to_paise(stored) != pricehistory.to_paise(instance.price)
+    ):
+        pricehistory.record([pricehistory.change_of(instance)], using)
+    instance._stored_price = instance.price
+
+
+@receiver(post_save, sender=Product)
+def publish_live_update(
+    sender,
+    instance: Product,
+    using: str,
+    update_fields: Optional[frozenset],
+    **kwargs,
+) -> None:
+    if update_fields is None or not update_fields.isdisjoint(LIVE_FIELDS):
+        live.publish_on_commit([instance], using)
+
+
+@receiver(post_delete, sender=Product)
+def publish_live_removal(sender, instance: Product, using: str, **kwargs) -> None:
+    live.publish_on_commit([instance], using, deleted=True)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def invalidate_product_images(sender, instance: ProductImage, **kwargs) -> None:
+    get_catalog_cache().invalidate_product(instance.product_id)
+
+
+@receiver(post_save, sender=ProductImage)
+def process_product_image(sender, instance: ProductImage, using: str, **kwargs) -> None:
+    schedule_processing(instance, using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance: Category, **kwargs) -> None:
+    get_catalog_cache().invalidate_listings()
@@ -1,3 +1,775 @@
-from django.test import TestCase
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+import json
+import tracemalloc
+from io import BytesIO, StringIO
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from time import perf_counter
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from contracts.reservations import reserve_stock
+from core.pubsub import Hub, LocalBroker
+from model_utils import aware_utcnow
+from products import live, pricehistory
+from products.cache import LRUCache, get_catalog_cache
+from products.images import process_image
+from products.imports import import_file, import_products, read_rows
+from products.models import (
+    Category,
+    CategoryPriceRollup,
+    PriceChange,
+    Product,
+    ProductImage,
+    ProductPriceRollup,
+)
+from users.models import Address, User
+
+
+def make_farmer(suffix: str = "1") -> User:
+    return User.objects.create_user(
+        email=f"farmer{suffix}@example.com",
+        phone=f"90000000{suffix}",
+        password="password",
+        date_of_birth=date(1990, 1, 1),
+        user_type=User.FARMER,
+    )
+
+
+class ProductListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_farmer()
+        cls.category = Category.objects.create(name="Grains")
+        now = aware_utcnow()
+        cls.products = [
+            Product.objects.create(
+                user=cls.farmer,
+                name=f"Product {i}",
+                price=Decimal(10 + i),
+                stock=10,
+                category=cls.category if i % 2 else None,
+                in_stock=i % 3 != 0,
+                # Pairs share a timestamp so the id tie-breaker is exercised.
+                created_on=now - timedelta(minutes=i // 2),
+            )
+            for i in range(7)
+        ]
+        for product in cls.products:
+            ProductImage.objects.create(product=product, url="product_images/a.jpg")
+
+    def setUp(self) -> None:
+        get_catalog_cache().clear()
+
+    def test_cursor_walks_every_product_once(self) -> None:
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/products/", params)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen.extend(item["id"] for item in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), len(self.products))
+        self.assertEqual(set(seen), {p.id for p in self.products})
+
+    def test_filters(self) -> None:
+        response = self.client.get(
+            "/api/products/",
+            {"category": self.category.id, "in_stock": True, "min_price": 12},
+        )
+        names = {item["name"] for item in response.json()["items"]}
+        self.assertEqual(names, {"Product 5"})
+
+    def test_query_count_is_constant(self) -> None:
+        # Products, images prefetch; the session/auth stack adds nothing here.
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/products/", {"limit": 100})
+        self.assertEqual(len(response.json()["items"]), len(self.products))
+        self.assertEqual(len(response.json()["items"][0]["images"]), 1)
+
+    def test_invalid_cursor(self) -> None:
+        response = self.client.get("/api/products/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class NearbyProductsTests(TestCase):
+    # Bengaluru, Devanahalli (~30 km), Mysuru (~125 km), New Delhi.
+    PLACES = {
+        "blr": ("Bengaluru", "560001", 12.9716, 77.5946),
+        "dvh": ("Devanahalli", "562110", 13.2257, 77.5750),
+        "mys": ("Mysuru", "570001", 12.2958, 76.6394),
+        "del": ("New Delhi", "110001", 28.6328, 77.2197),
+    }
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.products = {}
+        for i, (key, (city, code, lat, lon)) in enumerate(cls.PLACES.items()):
+            farmer = make_farmer(str(i))
+            Address.objects.create(
+                user=farmer,
+                name="Farm",
+                street_address="1 Main Road",
+                city=city,
+                state="Karnataka",
+                postal_code=code,
+                country="India",
+                latitude=lat,
+                longitude=lon,
+            )
+            cls.products[key] = Product.objects.create(
+                user=farmer, name=f"Rice {key}", price=10, stock=5
+            )
+        Product.objects.create(
+            user=cls.products["blr"].user, name="Sold out", price=1, in_stock=False
+        )
+
+    def nearby(self, radius_km: float) -> list[dict]:
+        response = self.client.get(
+            "/api/products/nearby",
+            {"latitude": 12.97, "longitude": 77.59, "radius_km": radius_km},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["items"]
+
+    def test_in_stock_products_nearest_first(self) -> None:
+        items = self.nearby(50)
+        self.assertEqual(
+            [item["product"]["name"] for item in items], ["Rice blr", "Rice dvh"]
+        )
+        self.assertLess(items[0]["distance_km"], 1)
+        self.assertAlmostEqual(items[1]["distance_km"], 28.5, delta=1)
+
+        names = [item["product"]["name"] for item in self.nearby(200)]
+        self.assertEqual(names, ["Rice blr", "Rice dvh", "Rice mys"])
+
+    def test_query_count(self) -> None:
+        # Addresses, product candidates, products, images prefetch.
+        with self.assertNumQueries(4):
+            self.nearby(200)
+
+    def test_radius_is_bounded(self) -> None:
+        response = self.client.get(
+            "/api/products/nearby",
+            {"latitude": 12.97, "longitude": 77.59, "radius_km": 5000},
+        )
+        self.assertEqual(response.status_code, 422)
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_farmer()
+        cls.apple = Product.objects.create(
+            user=cls.farmer, name="Red apples", description="Crisp", price=5
+        )
+        cls.juice = Product.objects.create(
+            user=cls.farmer, name="Juice", description="Pressed from apples", price=3
+        )
+        cls.rice = Product.objects.create(
+            user=cls.farmer, name="Basmati rice", description="Aged", price=9
+        )
+
+    def search(self, q: str) -> list[str]:
+        response = self.client.get("/api/products/search", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.json()["items"]]
+
+    def test_name_matches_rank_first(self) -> None:
+        self.assertEqual(self.search("apple"), [self.apple.id, self.juice.id])
+
+    def test_index_follows_saves_and_deletes(self) -> None:
+        self.rice.name = "Brown rice"
+        self.rice.save()
+        self.assertEqual(self.search("brown"), [self.rice.id])
+        self.assertEqual(self.search("basmati"), [])
+
+        self.apple.delete()
+        self.assertEqual(self.search("apple"), [self.juice.id])
+
+    def test_query_syntax_is_escaped(self) -> None:
+        self.assertEqual(self.search('rice* ("'), [self.rice.id])
+        self.assertEqual(self.search("!!!"), [])
+
+    def test_rebuild_command(self) -> None:
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 3 products", out.getvalue())
+        self.assertEqual(self.search("rice"), [self.rice.id])
+
+
+class CatalogCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_farmer()
+        cls.category = Category.objects.create(name="Pulses")
+        cls.product = Product.objects.create(
+            user=cls.farmer, name="Lentils", price=7, category=cls.category
+        )
+
+    def setUp(self) -> None:
+        self.cache = get_catalog_cache()
+        self.cache.clear()
+
+    def test_detail_is_served_from_cache(self) -> None:
+        url = f"/api/products/{self.product.id}"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["name"], "Lentils")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_saves_invalidate_detail_and_listings(self) -> None:
+        url = f"/api/products/{self.product.id}"
+        self.client.get(url)
+        self.client.get("/api/products/")
+
+        self.product.name = "Red lentils"
+        self.product.save()
+        self.assertEqual(self.client.get(url).json()["name"], "Red lentils")
+        names = [p["name"] for p in self.client.get("/api/products/").json()["items"]]
+        self.assertEqual(names, ["Red lentils"])
+
+        ProductImage.objects.create(product=self.product, url="product_images/b.jpg")
+        self.assertEqual(len(self.client.get(url).json()["images"]), 1)
+
+        version = self.cache.listing_version()
+        self.category.save()
+        self.assertGreater(self.cache.listing_version(), version)
+
+    def test_missing_product(self) -> None:
+        self.assertEqual(self.client.get("/api/products/nope").status_code, 404)
+
+    def test_lru_eviction(self) -> None:
+        lru = LRUCache(max_entries=2, timeout=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNot(lru.get("c"), None)
+        self.assertEqual(lru.evictions, 1)
+        self.assertEqual(len(lru), 2)
+
+
+class ProductImportTests(TestCase):
+    CSV = (
+        "name,description,price,min_quantity,max_quantity,stock,category\n"
+        "Wheat,Sharbati,25.50,1,500,100,Grains\n"
+        "Moong,,90,5,50,2,Pulses\n"
+        "Barley,,abc,1,10,5,Grains\n"
+        ",,10,1,10,5,\n"
+        "Jowar,,12,1,10,10,Millets\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_farmer()
+        Category.objects.create(name="Grains")
+
+    def test_invalid_rows_are_reported_not_fatal(self) -> None:
+        rows = read_rows(StringIO(self.CSV), "csv")
+        report = import_products(rows, self.farmer, batch_size=2)
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual([line for line, _ in report.errors], [3, 4, 5])
+        self.assertIn("cannot exceed the current stock", report.errors[0][1][0])
+        self.assertIn("price is not valid", report.errors[1][1][0])
+        self.assertEqual(report.errors[2][1], ["name is required."])
+
+        wheat = Product.objects.get(name="Wheat")
+        self.assertEqual(wheat.price, Decimal("25.50"))
+        self.assertTrue(wheat.in_stock)
+        self.assertEqual(
+            set(Category.objects.values_list("name", flat=True)), {"Grains", "Millets"}
+        )
+
+    def test_price_precision_and_category_length(self) -> None:
+        rows = [
+            (1, {"name": "Ragi", "price": "1.000", "stock": 5}),
+            (2, {"name": "Bajra", "price": "1.005", "stock": 5}),
+            (3, {"name": "Kodo", "price": "1", "stock": 5, "category": "x" * 101}),
+        ]
+        report = import_products(rows, self.farmer)
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(Product.objects.get().price, Decimal("1.00"))
+        self.assertEqual(
+            report.errors,
+            [
+                (2, ["price has fractions of a paisa: 1.005."]),
+                (3, ["category must be at most 100 characters."]),
+            ],
+        )
+        self.assertFalse(Category.objects.filter(name__startswith="xx").exists())
+
+    def test_queries_per_batch_are_constant(self) -> None:
+        rows = [
+            (i, {"name": f"Item {i}", "price": "1", "stock": 5, "category": "Grains"})
+            for i in range(50)
+        ]
+        # Savepoint, category lookup, insert, two batched search index
+        # statements, release; the price history adds its insert and, for
+        # the product and the category rollups each, a lookup and an insert,
+        # all within savepoints.
+        with self.assertNumQueries(17):
+            report = import_products(rows, self.farmer)
+        self.assertEqual(report.created, 50)
+
+    def test_jsonl_upload(self) -> None:
+        lines = [
+            json.dumps({"name": "Ragi", "price": 30.25, "stock": 4}),
+            "not json",
+            json.dumps({"name": "Bajra", "price": 10, "stock": 1.5}),
+        ]
+        upload = SimpleUploadedFile("catalog.jsonl", "\n".join(lines).encode())
+        self.client.force_login(self.farmer)
+        response = self.client.post("/api/products/import", {"file": upload})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["created"], 1)
+        self.assertEqual([e["line"] for e in body["errors"]], [2, 3])
+        self.assertEqual(Product.objects.get().price, Decimal("30.25"))
+        search = self.client.get("/api/products/search", {"q": "ragi"}).json()
+        self.assertEqual(len(search["items"]), 1)
+
+    def test_unreadable_input_reports_what_was_kept(self) -> None:
+        line = b'{"name": "Ragi", "price": "30.25", "stock": 5}\n'
+        data = line * 1000 + b"\xff\xfe\n"
+        report = import_file(BytesIO(data), "jsonl", self.farmer, 100)
+        self.assertIn("utf-8", report.failure)
+        self.assertGreater(report.created, 0)
+        self.assertEqual(Product.objects.count(), report.created)
+
+        self.client.force_login(self.farmer)
+        upload = SimpleUploadedFile("catalog.jsonl", line + b"\xff\n")
+        response = self.client.post("/api/products/import", {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["created"], 0)
+        self.assertIn("utf-8", response.json()["failure"])
+
+    def test_only_farmers_can_import(self) -> None:
+        buyer = User.objects.create_user(
+            email="buyer@example.com",
+            phone="8000000001",
+            password="password",
+            date_of_birth=date(1990, 1, 1),
+            user_type=User.BUYER,
+        )
+        self.client.force_login(buyer)
+        upload = SimpleUploadedFile("catalog.csv", self.CSV.encode())
+        response = self.client.post("/api/products/import", {"file": upload})
+        self.assertEqual(response.status_code, 403)
+
+    def test_command(self) -> None:
+        with NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(self.CSV)
+            file.flush()
+            out, err = StringIO(), StringIO()
+            call_command(
+                "import_products", file.name, user=self.farmer.id, stdout=out,
+                stderr=err,
+            )
+        self.assertIn("Imported 2 products, 3 invalid rows", out.getvalue())
+        self.assertIn("line 4: price is not valid", err.getvalue())
+
+
+def make_jpeg(width: int, height: int, color: str = "green") -> bytes:
+    out = BytesIO()
+    Image.new("RGB", (width, height), color).save(out, "JPEG")
+    return out.getvalue()
+
+
+def epoch(day: date, hour: int = 0) -> int:
+    return pricehistory.day_number(day) * pricehistory.SECONDS_PER_DAY + hour * 3600
+
+
+class PriceHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = make_farmer()
+        cls.category = Category.objects.create(name="Grains")
+        cls.product = Product.objects.create(
+            user=cls.farmer,
+            name="Wheat",
+            price=Decimal("20.00"),
+            stock=10,
+            category=cls.category,
+        )
+        cls.other = Product.objects.create(
+            user=cls.farmer,
+            name="Rice",
+            price=Decimal("40.00"),
+            stock=10,
+            category=cls.category,
+        )
+        # Monday 2024-01-01 through Wednesday 2024-01-10.
+        pricehistory.record(
+            [
+                (cls.product.pk, cls.category.pk, 2000, epoch(date(2024, 1, 1), 9)),
+                (cls.product.pk, cls.category.pk, 2400, epoch(date(2024, 1, 1), 15)),
+                (cls.product.pk, cls.category.pk, 2100, epoch(date(2024, 1, 3))),
+                (cls.other.pk, cls.category.pk, 4000, epoch(date(2024, 1, 3))),
+                (cls.product.pk, cls.category.pk, 1900, epoch(date(2024, 1, 10))),
+            ]
+        )
+
+    def history(self, path: str, **params) -> dict:
+        response = self.client.get(f"/api/products/{path}", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_saves_record_only_price_changes(self) -> None:
+        # Creating the product recorded its first price.
+        created = PriceChange.objects.filter(
+            product=self.product, at__gt=epoch(date(2025, 1, 1))
+        )
+        self.assertEqual(created.count(), 1)
+        product = Product.objects.get(pk=self.product.pk)
+        product.stock = 5
+        product.save()
+        product.price = Decimal("21.50")
+        product.save(update_fields=["stock"])
+        self.assertEqual(self.product.price_changes.count(), 5)
+
+        product.save()
+        product.save()
+        latest = self.product.price_changes.latest("at", "id")
+        self.assertEqual(latest.price, 2150)
+        self.assertEqual(self.product.price_changes.count(), 6)
+
+    def test_saves_of_products_loaded_without_a_price(self) -> None:
+        recorded = self.product.price_changes.count()
+        product = Product.objects.defer("price").get(pk=self.product.pk)
+        product.price  # Loaded on access.
+        product.save()
+        product = Product.objects.only("id", "stock").get(pk=self.product.pk)
+        product.price = self.product.price
+        product.save()
+        self.assertEqual(self.product.price_changes.count(), recorded)
+
+        product.price = Decimal("99")
+        product.save()
+        self.assertEqual(self.product.price_changes.count(), recorded + 1)
+
+    def test_daily_buckets(self) -> None:
+        body = self.history(
+            f"{self.product.pk}/price-history", since="2024-01-01", until="2024-01-10"
+        )
+        self.assertIsNone(body["opening"])
+        self.assertEqual(
+            [(p["start"], p["low"], p["high"], p["changes"]) for p in body["points"]],
+            [
+                ("2024-01-01", "20.00", "24.00", 2),
+                ("2024-01-03", "21.00", "21.00", 1),
+                ("2024-01-10", "19.00", "19.00", 1),
+            ],
+        )
+        self.assertEqual(body["points"][0]["average"], "22.00")
+
+    def test_weekly_buckets_start_on_monday(self) -> None:
+        body = self.history(
+            f"{self.product.pk}/price-history",
+            since="2024-01-03",
+            until="2024-01-14",
+            bucket="week",
+        )
+        # The range is widened to the Monday of its first week.
+        self.assertEqual(body["since"], "2024-01-01")
+        self.assertEqual(
+            [(p["start"], p["low"], p["high"], p["changes"]) for p in body["points"]],
+            [("2024-01-01", "20.00", "24.00", 3), ("2024-01-08", "19.00", "19.00", 1)],
+        )
+        self.assertEqual(body["opening"], None)
+
+        body = self.history(
+            f"{self.product.pk}/price-history", since="2024-01-08", until="2024-01-14"
+        )
+        self.assertEqual(body["opening"], "21.00")
+
+    def test_category_history_is_one_query_over_rollups(self) -> None:
+        with self.assertNumQueries(1):
+            body = self.history(
+                "price-history",
+                category=self.category.pk,
+                since="2024-01-01",
+                until="2024-12-31",
+                bucket="week",
+            )
+        self.assertEqual(
+            [(p["start"], p["low"], p["high"], p["changes"]) for p in body["points"]],
+            [("2024-01-01", "20.00", "40.00", 4), ("2024-01-08", "19.00", "19.00", 1)],
+        )
+        self.assertEqual(
+            CategoryPriceRollup.objects.get(
+                category=self.category, day=pricehistory.day_number(date(2024, 1, 3))
+            ).total,
+            6100,
+        )
+
+    def test_category_points_cover_only_the_prices_set(self) -> None:
+        for name in ("Ragi", "Jowar", "Bajra"):
+            Product.objects.create(
+                user=self.farmer,
+                name=name,
+                price=Decimal("30.00"),
+                stock=10,
+                category=self.category,
+            )
+        day = date(2024, 2, 1)
+        pricehistory.record([(self.other.pk, self.category.pk, 500, epoch(day, 12))])
+        body = self.history(
+            "price-history", category=self.category.pk, since=day, until=day
+        )
+        self.assertEqual(
+            [(p["low"], p["high"], p["average"], p["changes"]) for p in body["points"]],
+            [("5.00", "5.00", "5.00", 1)],
+        )
+
+    def test_rollups_merge_later_changes(self) -> None:
+        day = date(2024, 1, 1)
+        pricehistory.record([(self.product.pk, None, 1500, epoch(day, 20))])
+        rollup = ProductPriceRollup.objects.get(
+            product=self.product, day=pricehistory.day_number(day)
+        )
+        self.assertEqual(
+            (rollup.changes, rollup.total, rollup.low, rollup.high),
+            (3, 5900, 1500, 2400),
+        )
+
+    def test_unknown_product_and_bad_ranges(self) -> None:
+        response = self.client.get("/api/products/missing/price-history")
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            f"/api/products/{self.product.pk}/price-history",
+            {"since": "2024-02-01", "until": "2024-01-01"},
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            f"/api/products/{self.product.pk}/price-history",
+            {"since": "2000-01-01", "until": "2024-01-01"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_imports_record_prices(self) -> None:
+        rows = [(1, {"name": "Oats", "price": "12.34", "stock": 5})]
+        import_products(rows, self.farmer)
+        oats = Product.objects.get(name="Oats")
+        self.assertEqual(
+            list(oats.price_changes.values_list("price", flat=True)), [1234]
+        )
+
+
+@override_settings(
+    IMAGE_PROCESSING={"WIDTHS": (100, 400), "QUALITY": 70, "WORKERS": 0}
+)
+class ProductImagePipelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.product = Product.objects.create(user=make_farmer(), name="Okra", price=4)
+
+    def setUp(self) -> None:
+        media = TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        get_catalog_cache().clear()
+
+    def upload(self, data: bytes, name: str = "photo.JPG") -> ProductImage:
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=self.product, url=SimpleUploadedFile(name, data)
+            )
+        image.refresh_from_db()
+        return image
+
+    def test_renditions_are_generated_after_commit(self) -> None:
+        image = self.upload(make_jpeg(600, 300))
+
+        self.assertEqual((image.width, image.height), (400, 200))
+        self.assertTrue(image.placeholder.startswith("data:image/jpeg;base64,"))
+        self.assertEqual(
+            [(r["width"], r["format"]) for r in image.renditions],
+            [(100, "jpg"), (100, "webp"), (400, "jpg"), (400, "webp")],
+        )
+        digest = image.digest
+        self.assertEqual(
+            image.url.name, f"product_images/{digest[:2]}/{digest}/original.jpg"
+        )
+        with Image.open(image.url.storage.open(image.renditions[1]["name"])) as webp:
+            self.assertEqual((webp.format, webp.size), ("WEBP", (100, 50)))
+
+        body = self.client.get(f"/api/products/{self.product.id}").json()
+        rendition = body["images"][0]["renditions"][0]
+        self.assertEqual(rendition["width"], 100)
+        self.assertTrue(rendition["url"].startswith("/media/product_images/"))
+
+    def test_small_images_are_not_upscaled(self) -> None:
+        image = self.upload(make_jpeg(50, 80))
+        self.assertEqual({r["width"] for r in image.renditions}, {50})
+
+    def test_duplicate_uploads_are_stored_once(self) -> None:
+        data = make_jpeg(300, 300, "red")
+        first = self.upload(data)
+        second = self.upload(data, name="copy.jpg")
+
+        self.assertEqual(second.url.name, first.url.name)
+        self.assertEqual(second.renditions, first.renditions)
+        storage = first.url.storage
+        self.assertEqual(storage.listdir("product_images")[1], [])
+
+    def test_invalid_upload_is_left_unprocessed(self) -> None:
+        with self.assertLogs("products.images", "WARNING"):
+            image = self.upload(b"not an image", name="bad.jpg")
+        self.assertFalse(image.is_processed)
+        self.assertEqual(image.renditions, [])
+
+    def test_process_pool(self) -> None:
+        image = ProductImage.objects.create(
+            product=self.product,
+            url=SimpleUploadedFile("photo.jpg", make_jpeg(200, 100)),
+        )
+        with override_settings(
+            IMAGE_PROCESSING={"WIDTHS": (100,), "QUALITY": 70, "WORKERS": 1}
+        ):
+            self.assertTrue(process_image(image.pk))
+        image.refresh_from_db()
+        self.assertEqual(len(image.renditions), 2)
+
+
+LIVE_UPDATES = {"QUEUE_SIZE": 2, "COALESCE": 0, "HEARTBEAT": 60, "MAX_TOPICS": 3}
+
+
+@override_settings(LIVE_UPDATES=LIVE_UPDATES)
+class LiveUpdatesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.category = Category.objects.create(name="Pulses")
+        cls.product = Product.objects.create(
+            user=make_farmer(), name="Moong", price=90, stock=5, category=cls.category
+        )
+
+    def setUp(self) -> None:
+        live.get_hub.cache_clear()
+        self.addCleanup(live.get_hub.cache_clear)
+
+    def change(self, **fields) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.get(pk=self.product.pk)
+            for name, value in fields.items():
+                setattr(product, name, value)
+            product.save()
+
+    async def test_stream_sends_committed_changes(self) -> None:
+        response = await self.async_client.get(
+            "/api/products/live", {"categories": str(self.category.pk)}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+
+        await sync_to_async(self.change)(price=Decimal("95.50"), stock=4)
+        event, data = (await anext(stream)).decode().strip().split("\n")
+        self.assertEqual(event, "event: update")
+        self.assertEqual(
+            json.loads(data.removeprefix("data: ")),
+            {
+                "id": self.product.pk,
+                "category": self.category.pk,
+                "price": "95.50",
+                "stock": 4,
+                "in_stock": True,
+            },
+        )
+        await stream.aclose()
+
+    async def test_stock_reservations_are_published(self) -> None:
+        subscription = live.get_hub().subscribe([live.product_topic(self.product.pk)])
+
+        def reserve() -> None:
+            with self.captureOnCommitCallbacks(execute=True):
+                reserve_stock(self.product.pk, 5)
+
+        await sync_to_async(reserve)()
+        messages, overflowed = await subscription.get(timeout=5)
+        self.assertFalse(overflowed)
+        self.assertEqual(
+            [(m["stock"], m["in_stock"]) for m in messages], [(0, False)]
+        )
+
+    async def test_subscriptions_are_validated(self) -> None:
+        response = await self.async_client.get("/api/products/live")
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(
+            "/api/products/live", {"products": "a,b,c,d"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_needs_asgi(self) -> None:
+        response = self.client.get("/api/products/live", {"products": "a"})
+        self.assertEqual(response.status_code, 501)
+
+
+class PubSubHubTests(SimpleTestCase):
+    async def test_updates_coalesce_and_overflow_asks_for_resync(self) -> None:
+        hub = Hub(LocalBroker(), queue_size=2)
+        subscription = hub.subscribe(["category:1"])
+        for key, stock in (("a", 1), ("b", 1), ("a", 2)):
+            hub.publish(["category:1"], key, {"id": key, "stock": stock})
+        messages, overflowed = await subscription.get(timeout=1)
+        self.assertEqual(messages, [{"id": "a", "stock": 2}, {"id": "b", "stock": 1}])
+        self.assertFalse(overflowed)
+
+        for key in "abc":
+            hub.publish(["category:1"], key, {"id": key})
+        self.assertEqual(await subscription.get(timeout=1), ([], True))
+        self.assertEqual(await subscription.get(timeout=0.01), ([], False))
+
+    async def test_fan_out_to_ten_thousand_idle_subscribers(self) -> None:
+        subscribers = 10000
+        hub = Hub(LocalBroker(), queue_size=256)
+        options = {"heartbeat": 60, "coalesce": 0}
+        topics = [live.category_topic(1)]
+
+        with mock.patch("products.live.get_hub", new=lambda: hub):
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            streams = [live.events(topics, options) for _ in range(subscribers)]
+            for stream in streams:
+                await anext(stream)
+            # Every stream parked on its subscription, as between updates.
+            waiting = [asyncio.ensure_future(anext(stream)) for stream in streams]
+            await asyncio.sleep(0)
+            per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / subscribers
+            tracemalloc.stop()
+            self.assertEqual(len(hub), subscribers)
+
+            # Published from another thread, as the post_save handlers do.
+            started = perf_counter()
+            await asyncio.to_thread(
+                hub.publish, topics, "p", {"id": "p", "category": 1, "stock": 3}
+            )
+            chunks = await asyncio.gather(*waiting)
+            fan_out = perf_counter() - started
+
+            for stream in streams:
+                await stream.aclose()
+
+        self.assertTrue(all(chunk.startswith("event: update") for chunk in chunks))
+        self.assertEqual(len(hub), 0)
+        self.assertLess(per_subscriber, 8192, f"{per_subscriber:.0f} bytes each")
+        self.assertLess(fan_out, 3.0, f"{fan_out * 1000:.0f} ms to reach all")
@@ -1,5 +1,30 @@
 from django.contrib import admin
 
-from users.models import User
+from core.paginator import EstimatedCountPaginator
+from users.models import Address, User
 
-admin.site.register(User)
+
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ("email", "full_name", "user_type", "is_active")
+    list_filter = ("user_type",)
+    search_fields = ("email", "phone", "full_name")
+    # Newest first, read off the user_joined_id index. Not by id alone: ids
+    # made before the switch to ULIDs sort after every newer one.
+    ordering = ("-date_joined", "-id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Address)
+class AddressAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "city", "postal_code", "region")
+    list_select_related = ("user",)
+    # Exact region lookups use the address_region index.
+    search_fields = ("=region", "=postal_code")
+    autocomplete_fields = ("user",)
+    # Addresses have no timestamp, and legacy ids do not sort by age; group
+    # them by user instead.
+    ordering = ("user", "id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
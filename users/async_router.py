@@ -0,0 +1,40 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import authenticate
+from ninja import Router
+from ninja.errors import HttpError
+
+from users import tokens
+from users.models import User
+from users.passwords import run_hashing
+from users.router import TOKEN_FIELDS, consume, refresh_claims, revoke_bearer, rotate
+from users.schemas import TokenObtainIn, TokenPairOut, TokenRefreshIn
+
+router = Router(tags=["auth"])
+
+
+@router.post("/token", response=TokenPairOut)
+async def obtain_token(request, payload: TokenObtainIn):
+    user = await run_hashing(
+        authenticate, request, username=payload.email, password=payload.password
+    )
+    if user is None:
+        raise HttpError(401, "Invalid email or password")
+    return tokens.issue_pair(user)
+
+
+@router.post("/refresh", response=TokenPairOut)
+async def refresh_token(request, payload: TokenRefreshIn):
+    claims = refresh_claims(payload)
+    user = (
+        await User.objects.filter(pk=claims["sub"], is_active=True)
+        .only(*TOKEN_FIELDS)
+        .afirst()
+    )
+    return await sync_to_async(rotate)(claims, user)
+
+
+@router.post("/revoke", response={204: None})
+async def revoke_token(request, payload: TokenRefreshIn):
+    await sync_to_async(consume)(refresh_claims(payload))
+    revoke_bearer(request)
+    return 204, None
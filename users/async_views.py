@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import alogin
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.forms import AuthenticationForm
+from django.shortcuts import redirect, render, resolve_url
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import url_has_allowed_host_and_scheme
+from asgiref.sync import sync_to_async
+
+from contracts.stats import dashboard_stats
+from core.pagecache import cache_anonymous_page
+from users.forms import UserRegistrationForm
+from users.models import User
+from users.panels import apanel_context
+from users.passwords import amake_password, run_hashing
+
+
+async def register_user(request):
+    form = UserRegistrationForm()
+    if request.method == "POST":
+        form = UserRegistrationForm(request.POST)
+        # Form validation runs the unique email/phone checks through the sync
+        # ORM; everything after that stays on the event loop.
+        if await sync_to_async(form.is_valid)():
+            encoded = await amake_password(form.cleaned_data["password"])
+            await form.save(commit=False, encoded_password=encoded).asave()
+            messages.success(
+                request,
+                f"Congratulation, registration successful",
+            )
+            return redirect("login")
+
+    return render(request, "users/registration.html", {"form": form})
+
+
+async def login_user(request):
+    form = AuthenticationForm(request)
+    if request.method == "POST":
+        form = AuthenticationForm(request, data=request.POST)
+        # authenticate() verifies (and may upgrade) the password hash; it runs
+        # on the hashing pool so concurrent logins hash in parallel.
+        if await run_hashing(form.is_valid):
+            await alogin(request, form.get_user())
+            next_url = request.POST.get("next", request.GET.get("next"))
+            if not url_has_allowed_host_and_scheme(
+                next_url, allowed_hosts={request.get_host()}
+            ):
+                next_url = resolve_url(settings.LOGIN_REDIRECT_URL)
+            return redirect(next_url)
+
+    return render(request, "users/login.html", {"form": form})
+
+
+async def dashboard_context(user: User) -> dict:
+    stats = SimpleLazyObject(lambda: dashboard_stats(user))
+    return {"user": user, "stats": stats, **await apanel_context(user)}
+
+
+@login_required
+async def dashboard(request):
+    user = await request.auser()
+    # The templates read request.user, whose lazy lookup is sync-only.
+    request.user = user
+    # Rendered off the event loop: a panel missing from the cache runs the
+    # lazy stats queries there.
+    if user.user_type == User.FARMER:
+        context = await dashboard_context(user)
+        return await sync_to_async(render)(
+            request, "users/farmer_dashboard.html", context
+        )
+    elif user.user_type == User.BUYER:
+        context = await dashboard_context(user)
+        return await sync_to_async(render)(
+            request, "users/buyer_dashboard.html", context
+        )
+    else:
+        return render(request, template_name="users/login.html")
+
+
+@cache_anonymous_page
+async def about(request):
+    return render(request, template_name="users/about.html")
+
+
+@cache_anonymous_page
+async def home(request):
+    return render(request, template_name="users/home.html")
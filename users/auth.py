@@ -0,0 +1,50 @@
+from typing import Any, Optional
+
+from django.http import HttpRequest
+from ninja.security import HttpBearer, SessionAuth, django_auth
+
+from users import tokens
+from users.models import User
+
+
+class AsyncSessionAuth(SessionAuth):
+    """Session auth for async operations.
+
+    ``SessionAuth`` touches the lazy ``request.user``, which hits the database
+    synchronously; this resolves the user with ``request.auser()`` instead.
+    """
+
+    is_async = True
+
+    async def __call__(self, request: HttpRequest) -> Optional[Any]:
+        self._get_key(request)
+        user = await request.auser()
+        if user.is_authenticated:
+            return user
+        return None
+
+
+async_session_auth = AsyncSessionAuth()
+
+
+class JWTAuth(HttpBearer):
+    """``Authorization: Bearer <access token>``, checked without the database.
+
+    Returns a ``User`` carrying only ``id`` and ``user_type`` (see
+    ``tokens.user_from_claims``). Verification is pure CPU work, so the same
+    instance serves sync and async operations.
+    """
+
+    def authenticate(self, request: HttpRequest, token: str) -> Optional[User]:
+        try:
+            claims = tokens.decode(token, tokens.ACCESS)
+        except tokens.InvalidToken:
+            return None
+        return tokens.user_from_claims(claims)
+
+
+jwt_auth = JWTAuth()
+
+# Tokens first: a request that carries one never loads its session.
+api_auth = [jwt_auth, django_auth]
+async_api_auth = [jwt_auth, async_session_auth]
@@ -20,13 +20,14 @@ class UserRegistrationForm(forms.ModelForm):
             "date_of_birth",
         )
 
-    def save(self, commit=True):
+    def save(self, commit=True, encoded_password=None):
         # Create an instance of the model with the form data
         instance = super().save(commit=False)
 
-        # Perform additional logic here, e.g., hashing a password
-        # if you are using a password field
-        if self.cleaned_data.get("password"):
+        # Async views hash the password off the event loop and pass it in
+        if encoded_password:
+            instance.password = encoded_password
+        elif self.cleaned_data.get("password"):
             instance.password = make_password(self.cleaned_data["password"])
 
         # Save the instance to the database if commit is True
@@ -0,0 +1,116 @@
+"""Region keys, geohashes and distances for matching nearby addresses.
+
+A geohash interleaves longitude and latitude bits, so every address inside a
+cell shares the cell's hash as a prefix and a prefix lookup is one contiguous
+range of an ordinary B-tree index (no spatial extension needed).
+"""
+import csv
+from math import asin, cos, radians, sin, sqrt
+from pathlib import Path
+
+from django.utils.text import slugify
+
+BASE32: str = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# A sample of the India Post directory in the same layout; pass the full
+# table to ``geocode_addresses --table``.
+POSTAL_CODES: Path = Path(__file__).resolve().parent / "data" / "postal_codes.csv"
+
+# Stored precision: cells of roughly 5 m x 5 m.
+PRECISION: int = 9
+
+EARTH_RADIUS_KM: float = 6371.0088
+KM_PER_DEGREE: float = 111.32
+
+# Sorts after every BASE32 character: a prefix p covers [p, p + PREFIX_END).
+PREFIX_END: str = "~"
+
+COUNTRY_ALIASES: dict[str, str] = {
+    "in": "in",
+    "ind": "in",
+    "india": "in",
+    "bharat": "in",
+}
+
+
+def normalize_country(country: str) -> str:
+    slug = slugify(country)
+    return COUNTRY_ALIASES.get(slug, slug)
+
+
+def normalize_postal_code(postal_code: str) -> str:
+    return "".join(postal_code.split()).upper()
+
+
+def region_key(country: str, state: str, city: str) -> str:
+    """``"in/karnataka/bengaluru"`` however the address spelled its parts."""
+    return "/".join([normalize_country(country), slugify(state), slugify(city)])
+
+
+def load_postal_codes(path: Path = POSTAL_CODES) -> dict:
+    """``(country, postal code) -> (latitude, longitude)`` from a CSV table."""
+    with open(path, newline="", encoding="utf-8") as file:
+        return {
+            (
+                normalize_country(row["country"]),
+                normalize_postal_code(row["postal_code"]),
+            ): (float(row["latitude"]), float(row["longitude"]))
+            for row in csv.DictReader(file)
+        }
+
+
+def encode(latitude: float, longitude: float, precision: int = PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(height, width) in degrees of a cell with a ``precision``-char hash."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** (bits - bits // 2)
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance."""
+    dlat, dlon = radians(lat2 - lat1), radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2
+    a += cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def covering_prefixes(latitude: float, longitude: float, radius_km: float) -> list[str]:
+    """Geohash prefixes whose cells together cover the circle around a point.
+
+    Picks the finest precision whose cells are at least ``radius_km`` across,
+    so the point's cell and its eight neighbours contain the whole circle.
+    """
+    scale = max(cos(radians(latitude)), 0.01)
+    precision = 1
+    for candidate in range(PRECISION, 0, -1):
+        height, width = cell_size(candidate)
+        if min(height, width * scale) * KM_PER_DEGREE >= radius_km:
+            precision = candidate
+            break
+    height, width = cell_size(precision)
+    prefixes = set()
+    for dlat in (-height, 0.0, height):
+        for dlon in (-width, 0.0, width):
+            lat = max(-90.0, min(90.0, latitude + dlat))
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode(lat, lon, precision))
+    return sorted(prefixes)
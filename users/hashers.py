@@ -0,0 +1,14 @@
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id at OWASP's minimum profile: 19 MiB, two passes, one lane.
+
+    Django's defaults (100 MiB, eight lanes) cost several times more CPU and
+    memory per login. Hashes made with other parameters are upgraded on the
+    next successful login.
+    """
+
+    time_cost = 2
+    memory_cost = 19 * 1024
+    parallelism = 1
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.bench import benchmark_database
+from core.loadtest import ASGIServer, run_load, seed, session_cookie
+from users import tokens
+
+PATH: str = "/api/contracts/?limit=20"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure authenticated API requests per second with session auth "
+        "(a django_session read and a users_user fetch per request) against "
+        "bearer access tokens, for the sync and async views."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--modes", default="sync,async")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--contracts", type=int, default=200)
+        parser.add_argument("--path", default=PATH)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            buyer = seed(using, 1, options["contracts"])
+            credentials = {
+                "session": {"cookie": session_cookie(buyer)},
+                "token": {
+                    "authorization": "Bearer "
+                    + tokens.issue(buyer, tokens.ACCESS)[0]
+                },
+            }
+            db_path = str(connections[using].settings_dict["NAME"])
+            connections[using].close()
+
+            results = {}
+            for mode in options["modes"].split(","):
+                env = {
+                    "ASYNC_VIEWS": "1" if mode == "async" else "0",
+                    "SQLITE_PATH": db_path,
+                }
+                with ASGIServer(env, workers=options["workers"]) as server:
+                    load = (
+                        "127.0.0.1",
+                        server.port,
+                        [options["path"]],
+                        options["concurrency"],
+                    )
+                    for auth, headers in credentials.items():
+                        # Warm up imports, connections and caches first.
+                        asyncio.run(
+                            run_load(*load, min(2.0, options["duration"]), **headers)
+                        )
+                        result = asyncio.run(
+                            run_load(*load, options["duration"], **headers)
+                        )
+                        results[f"{mode}.{auth}"] = result.summary()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, summary in results.items():
+            self.stdout.write(
+                f"{name:>13}: {summary['rps']:>8} req/s  "
+                f"p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms  "
+                f"statuses {summary['statuses']}"
+            )
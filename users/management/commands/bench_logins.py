@@ -0,0 +1,81 @@
+import os
+from datetime import date
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import override_settings
+
+from core.bench import benchmark_database, run_concurrently
+from users.models import User
+from users.passwords import hashing_workers
+
+LEGACY_HASHER: str = "django.contrib.auth.hashers.PBKDF2PasswordHasher"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins per second (and per core) with the configured password "
+        "hasher against PBKDF2, and bulk_create_users hashing throughput."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--seconds", type=float, default=5.0)
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]):
+            hashers = dict.fromkeys([settings.PASSWORD_HASHERS[0], LEGACY_HASHER])
+            for hasher in hashers:
+                with override_settings(PASSWORD_HASHERS=[hasher]):
+                    self.run(hasher.rsplit(".", 1)[-1], options)
+
+    def run(self, label: str, options: dict) -> None:
+        count = options["users"]
+        users = [
+            User(
+                email=f"{label.lower()}{i}@example.com",
+                phone=f"{label}{i}",
+                full_name=f"User {i}",
+                date_of_birth=date(1990, 1, 1),
+                user_type=User.FARMER,
+            )
+            for i in range(count)
+        ]
+        workers = hashing_workers()
+        started = perf_counter()
+        User.objects.bulk_create_users(users, [f"pw-{i}" for i in range(count)])
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f"{label}: bulk_create_users hashed {count / elapsed:.0f} passwords/s "
+            f"with {workers} processes"
+        )
+
+        lock = Lock()
+        logins = []
+        deadline = perf_counter() + options["seconds"]
+
+        def worker(index: int) -> None:
+            done, i = 0, index
+            while perf_counter() < deadline:
+                user = authenticate(
+                    username=users[i % count].email, password=f"pw-{i % count}"
+                )
+                assert user is not None
+                done += 1
+                i += options["threads"]
+            with lock:
+                logins.append(done)
+
+        elapsed = run_concurrently(options["threads"], worker)
+        rate = sum(logins) / elapsed
+        cores = min(options["threads"], os.cpu_count() or 1)
+        self.stdout.write(
+            f"{label}: {rate:.1f} logins/s on {options['threads']} threads "
+            f"({rate / cores:.1f} per core)"
+        )
@@ -0,0 +1,97 @@
+from copy import deepcopy
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.test import Client
+from django.test.utils import override_settings
+
+from core.bench import benchmark_database
+from core.benchdata import Seeder
+from users.models import User
+
+LOCMEM: str = "django.core.cache.backends.locmem.LocMemCache"
+DUMMY: str = "django.core.cache.backends.dummy.DummyCache"
+LOADERS: list[str] = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+PAGES: tuple[tuple[str, str, bool], ...] = (
+    ("home", "/", False),
+    ("about", "/about/", False),
+    ("dashboard", "/dashboard/", True),
+)
+
+
+def render_settings(profile: str) -> dict:
+    """TEMPLATES and CACHES as RENDER_PROFILE=``profile`` would set them.
+
+    "uncached" re-reads and re-parses every template on every render.
+    """
+    engine = deepcopy(settings.TEMPLATES[0])
+    options = engine["OPTIONS"]
+    engine["APP_DIRS"] = False
+    if profile == "production":
+        cached = ("django.template.loaders.cached.Loader", LOADERS)
+        options.update(debug=False, loaders=[cached])
+    elif profile == "uncached":
+        options.update(debug=True, loaders=LOADERS)
+    else:
+        # Django's default: cached loader, template debug info with DEBUG.
+        options.pop("loaders", None)
+        options["debug"] = True
+        engine["APP_DIRS"] = True
+
+    caches = deepcopy(settings.CACHES)
+    alias = getattr(settings, "RENDER_CACHE", {}).get("ALIAS", "default")
+    caches[alias] = {
+        "BACKEND": LOCMEM if profile == "production" else DUMMY,
+        "LOCATION": "bench-render",
+    }
+    return {"TEMPLATES": [engine], "CACHES": caches}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the time to serve the home, about and dashboard pages with "
+        "templates re-parsed per render, the development render profile and "
+        "the production one (cached templates, page and panel caches)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--contracts", type=int, default=500)
+        parser.add_argument("--profiles", default="uncached,development,production")
+
+    def handle(self, *args, **options) -> None:
+        with benchmark_database(options["database"]) as using:
+            Seeder(using).run(users=10, products=50, contracts=options["contracts"])
+            farmer = User.objects.using(using).filter(user_type=User.FARMER).first()
+
+            for profile in options["profiles"].split(","):
+                # The test client's host is not among the production ones.
+                with override_settings(
+                    ALLOWED_HOSTS=["testserver"], **render_settings(profile)
+                ):
+                    timings = self.run(farmer, options["requests"])
+                self.stdout.write(
+                    f"{profile:>11}: "
+                    + "  ".join(f"{page} {ms:.2f} ms" for page, ms in timings)
+                )
+
+    def run(self, farmer: User, requests: int) -> list[tuple[str, float]]:
+        anonymous = Client()
+        logged_in = Client()
+        logged_in.force_login(farmer)
+        timings = []
+        for page, path, login in PAGES:
+            client = logged_in if login else anonymous
+            # The first request compiles templates and fills the caches.
+            assert client.get(path).status_code == 200
+            started = perf_counter()
+            for _ in range(requests):
+                client.get(path)
+            timings.append((page, (perf_counter() - started) / requests * 1000))
+        return timings
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from users import geo
+from users.models import Address
+
+BATCH_SIZE: int = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in address coordinates (and their geohash) from a postal-code "
+        "table, offline. Addresses that already have coordinates are kept "
+        "unless --overwrite is given."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--table",
+            default=geo.POSTAL_CODES,
+            help="CSV with country, postal_code, latitude and longitude columns.",
+        )
+        parser.add_argument("--overwrite", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        using = options["database"]
+        table = geo.load_postal_codes(options["table"])
+        addresses = Address.objects.using(using).only(
+            "country", "state", "city", "postal_code", "latitude", "longitude"
+        )
+        if not options["overwrite"]:
+            addresses = addresses.filter(latitude=None)
+
+        located = missing = 0
+        batch = []
+        with transaction.atomic(using=using):
+            for address in addresses.iterator(chunk_size=BATCH_SIZE):
+                key = (
+                    geo.normalize_country(address.country),
+                    geo.normalize_postal_code(address.postal_code),
+                )
+                if key not in table:
+                    missing += 1
+                    continue
+                address.latitude, address.longitude = table[key]
+                address.locate()
+                batch.append(address)
+                if len(batch) == BATCH_SIZE:
+                    located += self.flush(batch, using)
+            located += self.flush(batch, using)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Located {located} addresses; {missing} postal codes not in the table"
+            )
+        )
+
+    def flush(self, batch: list[Address], using: str) -> int:
+        fields = ["latitude", "longitude", "region", "geohash"]
+        count = Address.objects.using(using).bulk_update(batch, fields)
+        batch.clear()
+        return count
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.tokens import prune_revoked
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete used refresh tokens that have expired and can no longer be "
+        "presented. Safe to run on a schedule."
+    )
+
+    def handle(self, *args, **options) -> None:
+        deleted = prune_revoked()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} revoked tokens"))
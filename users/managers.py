@@ -4,6 +4,8 @@ from django.db import models
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import BaseUserManager
 
+from users.passwords import hash_passwords
+
 if TYPE_CHECKING:
     from .models import User
 
@@ -43,6 +45,25 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def bulk_create_users(
+        self,
+        users: list["User"],
+        passwords: list[Optional[str]],
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> list["User"]:
+        """Insert many unsaved users, hashing ``passwords`` across processes.
+
+        Meant for admin-driven onboarding; like ``bulk_create`` it sends no
+        signals. A ``None`` password leaves that user with an unusable one.
+        """
+        if len(users) != len(passwords):
+            raise ValueError("Expected one password per user")
+        for user, encoded in zip(users, hash_passwords(passwords, workers)):
+            user.email = self.normalize_email(user.email)
+            user.password = encoded
+        return self.bulk_create(users, batch_size=batch_size)
+
     def create_superuser(
         self,
         email: str,
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:05
+
+import model_utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='address',
+            name='id',
+            field=models.CharField(default=model_utils.generate_id, max_length=26, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.CharField(default=model_utils.generate_id, editable=False, max_length=26, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+from users.geo import region_key
+
+
+def fill_regions(apps, schema_editor):
+    Address = apps.get_model("users", "Address")
+    addresses = Address.objects.using(schema_editor.connection.alias)
+    batch = []
+    for address in addresses.only("country", "state", "city").iterator():
+        address.region = region_key(address.country, address.state, address.city)
+        batch.append(address)
+    addresses.bulk_update(batch, ["region"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_address_id_alter_user_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='region',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['region'], name='address_region'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['geohash'], name='address_geohash'),
+        ),
+        migrations.RunPython(fill_regions, migrations.RunPython.noop),
+    ]
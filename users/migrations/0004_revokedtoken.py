@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_address_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('jti', models.CharField(max_length=26, primary_key=True, serialize=False)),
+                ('expires', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+    ]
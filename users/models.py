@@ -2,15 +2,14 @@ from datetime import datetime, date
 from django.db import models
 
 from model_utils import aware_utcnow, generate_id
-from django.contrib.auth.hashers import check_password
-from . import managers
+from . import geo, managers
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 
 
 # Create your models here.
 class User(AbstractBaseUser, PermissionsMixin):
     id: str = models.CharField(
-        max_length=20, default=generate_id, primary_key=True, editable=False
+        max_length=26, default=generate_id, primary_key=True, editable=False
     )
 
     email: str = models.CharField(max_length=256, unique=True)
@@ -49,12 +48,19 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = managers.UserManager()
 
+    class Meta:
+        indexes = [
+            # The admin changelist, newest first.
+            models.Index(fields=["-date_joined", "-id"], name="user_joined_id"),
+        ]
+
     def verify_password(self, password: str) -> bool:
-        return check_password(password, self.password)
+        # check_password() upgrades hashes made with an older hasher or cost.
+        return self.check_password(password)
 
 
 class Address(models.Model):
-    id: str = models.CharField(max_length=20, default=generate_id, primary_key=True)
+    id: str = models.CharField(max_length=26, default=generate_id, primary_key=True)
 
     user: User = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="addresses"
@@ -66,5 +72,44 @@ class Address(models.Model):
     postal_code: str = models.CharField(max_length=20)
     country: str = models.CharField(max_length=100)
 
+    # Derived on save; see users.geo.
+    region: str = models.CharField(max_length=255, blank=True, editable=False)
+    latitude: float = models.FloatField(blank=True, null=True)
+    longitude: float = models.FloatField(blank=True, null=True)
+    geohash: str = models.CharField(max_length=12, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["region"], name="address_region"),
+            # Nearby lookups are prefix ranges over this column.
+            models.Index(fields=["geohash"], name="address_geohash"),
+        ]
+
+    def locate(self) -> None:
+        self.region = geo.region_key(self.country, self.state, self.city)
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ""
+        else:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs) -> None:
+        self.locate()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "region", "geohash"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.street_address}, {self.city}, {self.state} {self.postal_code}, {self.country}"
+
+
+class RevokedToken(models.Model):
+    """A used or revoked refresh token, until it would have expired anyway.
+
+    The primary key makes using one atomic: of two requests that present the
+    same token, only the first INSERT succeeds (see ``users.tokens.consume``).
+    """
+
+    jti: str = models.CharField(max_length=26, primary_key=True)
+    # Epoch seconds, as in the token's ``exp`` claim.
+    expires: int = models.BigIntegerField(db_index=True)
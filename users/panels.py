@@ -0,0 +1,67 @@
+"""Per-user caching of the dashboard panels.
+
+The panels are ``{% cache %}`` fragments keyed by the user and a version
+token. Any change to a user's contracts (``contracts.stats.apply``) or
+products replaces their token, so stale panels are never read again and
+simply expire. The view passes the stats lazily: they are computed only if a
+panel has to be rendered, whenever during the render it finds that out.
+
+The token lives in the same cache as the panels. With the default local
+memory backend each process has its own, so a change made through one
+process leaves the panels of the others stale until PANEL_TIMEOUT; set
+RENDER_CACHE["ALIAS"] to a shared cache when running several processes.
+"""
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.core.cache.utils import make_template_fragment_key
+
+from model_utils import generate_id
+from users.models import User
+
+# Fragment names used by each dashboard template.
+PANELS: dict[str, tuple[str, ...]] = {
+    User.FARMER: ("dashboard-profit", "dashboard-analytics"),
+    User.BUYER: ("dashboard-orders",),
+}
+
+
+def panel_cache() -> tuple[str, BaseCache, int]:
+    options = getattr(settings, "RENDER_CACHE", {})
+    alias = options.get("ALIAS", "default")
+    return alias, caches[alias], options.get("PANEL_TIMEOUT", 300)
+
+
+def version_key(user_id: str) -> str:
+    return f"dashboard:version:{user_id}"
+
+
+def panel_keys(user: User, version: str) -> list[str]:
+    return [
+        make_template_fragment_key(name, [user.pk, version])
+        for name in PANELS.get(user.user_type, ())
+    ]
+
+
+def invalidate(user_ids: Iterable[str]) -> None:
+    _, cache, _ = panel_cache()
+    cache.delete_many([version_key(user_id) for user_id in set(user_ids)])
+
+
+def _context(alias: str, timeout: int, version: str) -> dict:
+    return {"panels": {"cache": alias, "timeout": timeout, "version": version}}
+
+
+def panel_context(user: User) -> dict:
+    """Template context for the panels."""
+    alias, cache, timeout = panel_cache()
+    # Never expires on its own; losing it only costs one re-render.
+    version = cache.get_or_set(version_key(user.pk), generate_id, None)
+    return _context(alias, timeout, version)
+
+
+async def apanel_context(user: User) -> dict:
+    alias, cache, timeout = panel_cache()
+    version = await cache.aget_or_set(version_key(user.pk), generate_id, None)
+    return _context(alias, timeout, version)
@@ -0,0 +1,85 @@
+"""Password hashing off the event loop and across processes.
+
+Kept free of model imports: ``hash_passwords`` workers import this module in
+fresh (spawned) processes that never run ``django.setup()``.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Callable, Optional, TypeVar
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+T = TypeVar("T")
+
+CHUNK_SIZE: int = 64
+
+
+def hashing_workers() -> int:
+    return getattr(settings, "PASSWORD_HASHING_WORKERS", None) or os.cpu_count() or 1
+
+
+@lru_cache
+def get_hashing_executor() -> ThreadPoolExecutor:
+    # The hashers spend their time in OpenSSL/argon2 code that releases the
+    # GIL, so threads hash in parallel.
+    return ThreadPoolExecutor(hashing_workers(), thread_name_prefix="password-hashing")
+
+
+async def run_hashing(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a call that hashes passwords without blocking the event loop.
+
+    Unlike ``sync_to_async``, calls do not queue up behind each other on the
+    single thread-sensitive executor. Any database work in ``func`` happens
+    on the pool's threads, each with its own connection.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hashing_executor(), partial(_pooled, func, *args, **kwargs)
+    )
+
+
+def _pooled(func: Callable[..., T], *args, **kwargs) -> T:
+    # What Django does around a request: the pool's connections are closed
+    # after use (or on reaching CONN_MAX_AGE), never left open indefinitely.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def amake_password(password: Optional[str]) -> str:
+    return await run_hashing(make_password, password)
+
+
+def _encode_chunk(hasher_path: str, passwords: list[Optional[str]]) -> list[str]:
+    hasher = import_string(hasher_path)()
+    return [make_password(password, hasher=hasher) for password in passwords]
+
+
+def hash_passwords(
+    passwords: list[Optional[str]], workers: Optional[int] = None
+) -> list[str]:
+    """``make_password`` for many passwords, spread over worker processes.
+
+    ``None`` gives an unusable password, as with ``make_password``.
+    """
+    hasher = type(get_hasher())
+    hasher_path = f"{hasher.__module__}.{hasher.__qualname__}"
+    workers = workers or hashing_workers()
+    if workers == 1 or len(passwords) <= CHUNK_SIZE:
+        return _encode_chunk(hasher_path, passwords)
+
+    chunks = [
+        passwords[i : i + CHUNK_SIZE] for i in range(0, len(passwords), CHUNK_SIZE)
+    ]
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+        encoded = pool.map(_encode_chunk, repeat(hasher_path), chunks)
+        return [password for chunk in encoded for password in chunk]
@@ -0,0 +1,77 @@
+from typing import Optional
+
+from django.contrib.auth import authenticate
+from ninja import Router
+from ninja.errors import HttpError
+
+from users import tokens
+from users.auth import jwt_auth
+from users.models import User
+from users.schemas import TokenObtainIn, TokenPairOut, TokenRefreshIn
+
+router = Router(tags=["auth"])
+
+# Only what goes into a token.
+TOKEN_FIELDS: tuple[str, ...] = ("id", "user_type", "is_staff")
+
+
+def refresh_claims(payload: TokenRefreshIn) -> dict:
+    try:
+        return tokens.decode(payload.refresh, tokens.REFRESH)
+    except tokens.InvalidToken as exc:
+        raise HttpError(401, str(exc))
+
+
+def consume(claims: dict) -> None:
+    try:
+        tokens.consume(claims)
+    except tokens.InvalidToken as exc:
+        raise HttpError(401, str(exc))
+
+
+def rotate(claims: dict, user: Optional[User]) -> dict:
+    if user is None:
+        raise HttpError(401, "User is inactive or no longer exists")
+    # Each refresh token works once; its successor comes with the new pair.
+    consume(claims)
+    return tokens.issue_pair(user)
+
+
+def revoke_bearer(request) -> None:
+    """Revoke the request's access token too, if it carries a valid one."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != jwt_auth.openapi_scheme:
+        return
+    try:
+        tokens.revoke(tokens.decode(token, tokens.ACCESS))
+    except tokens.InvalidToken:
+        pass
+
+
+@router.post("/token", response=TokenPairOut)
+def obtain_token(request, payload: TokenObtainIn):
+    user = authenticate(request, username=payload.email, password=payload.password)
+    if user is None:
+        raise HttpError(401, "Invalid email or password")
+    return tokens.issue_pair(user)
+
+
+@router.post("/refresh", response=TokenPairOut)
+def refresh_token(request, payload: TokenRefreshIn):
+    claims = refresh_claims(payload)
+    # The one query of the token flow: catches deactivated accounts and
+    # user_type changes before they are signed into another access token.
+    user = (
+        User.objects.filter(pk=claims["sub"], is_active=True)
+        .only(*TOKEN_FIELDS)
+        .first()
+    )
+    return rotate(claims, user)
+
+
+@router.post("/revoke", response={204: None})
+def revoke_token(request, payload: TokenRefreshIn):
+    """Log out: revoke the refresh token and any bearer access token."""
+    consume(refresh_claims(payload))
+    revoke_bearer(request)
+    return 204, None
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from ninja import Schema
+
+
+class TokenObtainIn(Schema):
+    email: str
+    password: str
+
+
+class TokenRefreshIn(Schema):
+    refresh: str
+
+
+class TokenPairOut(Schema):
+    access: str
+    refresh: str
+    token_type: str
+    expires_at: datetime
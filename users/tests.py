@@ -1,3 +1,449 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from io import StringIO
+from math import cos, radians, sin
+from unittest import mock
 
-# Create your tests here.
+import jwt
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.views import LogoutView
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+
+import model_utils
+from contracts.models import Contract
+from core.pagecache import cache_anonymous_page
+from model_utils import aware_utcnow, generate_id, generate_sortable_id
+from products.models import Product
+from users import async_views, geo, panels, tokens, views
+from users.models import Address, User
+from users.passwords import run_hashing
+
+MD5 = "django.contrib.auth.hashers.MD5PasswordHasher"
+SCRYPT = "django.contrib.auth.hashers.ScryptPasswordHasher"
+RENDER_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "render": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "render-tests",
+    },
+}
+
+urlpatterns = [
+    path("login/", async_views.login_user, name="login"),
+    path("register/", async_views.register_user, name="register"),
+    path("dashboard/", async_views.dashboard, name="dashboard"),
+    path("logout/", LogoutView.as_view(), name="logout"),
+]
+
+
+class GenerateIdTests(SimpleTestCase):
+    def test_sortable_ids_are_fixed_width_and_increasing(self) -> None:
+        ids = [generate_sortable_id() for _ in range(5000)]
+        self.assertEqual({len(pk) for pk in ids}, {26})
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_monotonic_when_clock_steps_back(self) -> None:
+        first = generate_sortable_id()
+        with mock.patch.object(model_utils.time, "time_ns", return_value=0):
+            second = generate_sortable_id()
+        self.assertLess(first, second)
+
+    def test_timestamp_prefix(self) -> None:
+        with mock.patch.object(
+            model_utils.time, "time_ns", return_value=(1 << 48) * 1_000_000 - 1
+        ), mock.patch.object(model_utils, "_last_ms", 0):
+            self.assertTrue(generate_sortable_id().startswith("7ZZZZZZZZZ"))
+
+    def test_fork_resets_state(self) -> None:
+        generate_sortable_id()
+        model_utils._reset_sortable_state()
+        self.assertEqual(model_utils._last_ms, 0)
+
+    @override_settings(ID_GENERATOR="legacy")
+    def test_legacy_generator(self) -> None:
+        self.assertTrue(generate_id().isdigit())
+
+
+def unsaved_user(suffix: str) -> User:
+    return User(
+        email=f"user{suffix}@EXAMPLE.com",
+        phone=f"70000{suffix}",
+        date_of_birth=date(1990, 1, 1),
+        user_type=User.FARMER,
+    )
+
+
+class GeoTests(SimpleTestCase):
+    def test_geohash(self) -> None:
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geo.encode(-25.382708, -49.265506, 6), "6gkzwg")
+
+    def test_region_key(self) -> None:
+        self.assertEqual(
+            geo.region_key(" INDIA", "Tamil  Nadu", "Chennai"), "in/tamil-nadu/chennai"
+        )
+        self.assertEqual(
+            geo.region_key("IN", "tamil nadu", "CHENNAI "), "in/tamil-nadu/chennai"
+        )
+
+    def test_covering_prefixes_contain_the_circle(self) -> None:
+        cases = [(12.97, 77.59, 25), (0.0, 179.99, 5), (60.0, 10.0, 300)]
+        for lat, lon, radius in cases:
+            prefixes = geo.covering_prefixes(lat, lon, radius)
+            for bearing in range(0, 360, 15):
+                # Points on the circle, offset in degrees.
+                dlat = radius / geo.KM_PER_DEGREE * cos(radians(bearing))
+                dlon = radius / geo.KM_PER_DEGREE * sin(radians(bearing))
+                dlon /= cos(radians(lat))
+                point = geo.encode(lat + dlat, (lon + dlon + 180) % 360 - 180)
+                self.assertTrue(
+                    any(point.startswith(prefix) for prefix in prefixes),
+                    (lat, lon, radius, bearing),
+                )
+
+
+class AddressLocationTests(TestCase):
+    def test_geocode_command(self) -> None:
+        user = User.objects.create_user(
+            email="farmer@example.com",
+            phone="1",
+            password="password",
+            date_of_birth=date(1990, 1, 1),
+        )
+        known, unknown = [
+            Address.objects.create(
+                user=user,
+                name="Farm",
+                street_address="1 Main Road",
+                city="Bengaluru",
+                state="Karnataka",
+                postal_code=code,
+                country="India",
+            )
+            for code in ("560 001", "999999")
+        ]
+        self.assertEqual(known.region, "in/karnataka/bengaluru")
+        self.assertEqual(known.geohash, "")
+
+        out = StringIO()
+        call_command("geocode_addresses", stdout=out)
+        self.assertIn("Located 1 addresses; 1 postal codes", out.getvalue())
+        known.refresh_from_db()
+        self.assertEqual(known.geohash, geo.encode(12.9716, 77.5946))
+        self.assertTrue(known.geohash.startswith("tdr1"))
+        unknown.refresh_from_db()
+        self.assertIsNone(unknown.latitude)
+
+
+class PasswordHashingTests(TestCase):
+    @override_settings(PASSWORD_HASHERS=[MD5])
+    def test_bulk_create_users_hashes_across_processes(self) -> None:
+        users = [unsaved_user(str(i)) for i in range(130)]
+        passwords = [f"pw-{i}" for i in range(129)] + [None]
+        User.objects.bulk_create_users(users, passwords, workers=2)
+
+        stored = {u.email: u for u in User.objects.all()}
+        self.assertEqual(len(stored), 130)
+        self.assertTrue(stored["user7@example.com"].verify_password("pw-7"))
+        self.assertTrue(stored["user128@example.com"].password.startswith("md5$"))
+        self.assertFalse(stored["user129@example.com"].has_usable_password())
+
+        with self.assertRaises(ValueError):
+            User.objects.bulk_create_users(users, passwords[:1])
+
+    def test_login_upgrades_old_hashes(self) -> None:
+        with override_settings(PASSWORD_HASHERS=[MD5]):
+            user = User.objects.create_user(
+                email="old@example.com",
+                phone="1",
+                password="secret",
+                date_of_birth=date(1990, 1, 1),
+            )
+        with override_settings(PASSWORD_HASHERS=[SCRYPT, MD5]):
+            self.assertTrue(user.verify_password("secret"))
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith("scrypt$"))
+            self.assertTrue(check_password("secret", user.password))
+
+
+@override_settings(ROOT_URLCONF=__name__, PASSWORD_HASHERS=[MD5])
+class AsyncLoginTests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email="farmer@example.com",
+            phone="1",
+            password="secret",
+            date_of_birth=date(1990, 1, 1),
+            user_type=User.FARMER,
+        )
+
+    async def test_login_hashes_on_the_pool(self) -> None:
+        response = await self.async_client.post(
+            "/login/?next=/dashboard/",
+            {"username": "farmer@example.com", "password": "secret"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, "/dashboard/")
+        self.assertEqual((await self.async_client.get("/dashboard/")).status_code, 200)
+
+    async def test_the_pool_closes_its_connections(self) -> None:
+        # The in-memory test database ignores close(), so watch for the calls.
+        with mock.patch("users.passwords.close_old_connections") as close:
+            self.assertTrue(await run_hashing(User.objects.exists))
+        self.assertEqual(close.call_count, 2)
+
+    async def test_wrong_password(self) -> None:
+        response = await self.async_client.post(
+            "/login/", {"username": "farmer@example.com", "password": "nope"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Please enter a correct")
+
+
+# Async logins authenticate on the hashing pool's own connections.
+@override_settings(PASSWORD_HASHERS=[MD5])
+class TokenAuthTests(TransactionTestCase):
+    def setUp(self) -> None:
+        tokens.get_revocation_list().clear()
+        self.buyer = User.objects.create_user(
+            email="buyer@example.com",
+            phone="1",
+            password="secret",
+            date_of_birth=date(1990, 1, 1),
+            user_type=User.BUYER,
+        )
+
+    def obtain(self) -> dict:
+        response = self.client.post(
+            "/api/auth/token",
+            {"email": "buyer@example.com", "password": "secret"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def refresh(self, token: str):
+        return self.client.post(
+            "/api/auth/refresh", {"refresh": token}, content_type="application/json"
+        )
+
+    def test_claims_round_trip(self) -> None:
+        token, _ = tokens.issue(self.buyer, tokens.ACCESS)
+        user = tokens.user_from_claims(tokens.decode(token, tokens.ACCESS))
+        self.assertEqual((user.pk, user.user_type), (self.buyer.pk, User.BUYER))
+        with self.assertRaisesMessage(tokens.InvalidToken, "refresh"):
+            tokens.decode(token, tokens.REFRESH)
+
+    def test_key_rotation(self) -> None:
+        with override_settings(JWT_AUTH={"KEYS": {"old": "a" * 32}}):
+            token, _ = tokens.issue(self.buyer, tokens.ACCESS)
+        with override_settings(JWT_AUTH={"KEYS": {"new": "b" * 32, "old": "a" * 32}}):
+            tokens.decode(token, tokens.ACCESS)
+            rotated, _ = tokens.issue(self.buyer, tokens.ACCESS)
+            self.assertEqual(jwt.get_unverified_header(rotated)["kid"], "new")
+        with override_settings(JWT_AUTH={"KEYS": {"new": "b" * 32}}):
+            with self.assertRaisesMessage(tokens.InvalidToken, "Unknown signing key"):
+                tokens.decode(token, tokens.ACCESS)
+
+    def test_expired_and_revoked(self) -> None:
+        with mock.patch.object(
+            tokens, "aware_utcnow", return_value=aware_utcnow() - timedelta(hours=1)
+        ):
+            expired, _ = tokens.issue(self.buyer, tokens.ACCESS)
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.decode(expired, tokens.ACCESS)
+
+        token, claims = tokens.issue(self.buyer, tokens.ACCESS)
+        tokens.revoke(claims)
+        with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+            tokens.decode(token, tokens.ACCESS)
+
+    def test_revocation_list_is_bounded_and_fails_closed(self) -> None:
+        revoked = tokens.RevocationList(max_entries=2)
+        now = aware_utcnow().timestamp()
+        revoked.revoke("a", now - 1)
+        revoked.revoke("b", now + 30)
+        revoked.revoke("c", now + 20)
+        self.assertEqual(len(revoked), 2)
+        self.assertFalse(revoked.is_revoked("a", now))
+
+        # Full of live ids: none is dropped, and older tokens are refused.
+        revoked.revoke("d", now + 10)
+        self.assertEqual(len(revoked), 2)
+        self.assertTrue(revoked.is_revoked("b", now))
+        self.assertTrue(revoked.is_revoked("d", now))
+        self.assertTrue(revoked.is_revoked("unrelated", now))
+        self.assertFalse(revoked.is_revoked("fresh", now + 5))
+
+    def test_refresh_tokens_are_used_once_and_pruned(self) -> None:
+        _, claims = tokens.issue(self.buyer, tokens.REFRESH)
+        tokens.consume(claims)
+        with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+            tokens.consume(claims)
+
+        self.assertEqual(tokens.prune_revoked(claims["exp"] - 1), 0)
+        self.assertEqual(tokens.prune_revoked(claims["exp"]), 1)
+
+    def test_bearer_requests_skip_session_and_user_queries(self) -> None:
+        access = self.obtain()["access"]
+        # The contract listing only.
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/contracts/", headers={"Authorization": f"Bearer {access}"}
+            )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            "/api/contracts/", headers={"Authorization": "Bearer nonsense"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_rotates_and_revoke_logs_out(self) -> None:
+        pair = self.obtain()
+        response = self.refresh(pair["refresh"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(pair["refresh"]).status_code, 401)
+
+        pair = response.json()
+        response = self.client.post(
+            "/api/auth/revoke",
+            {"refresh": pair["refresh"]},
+            content_type="application/json",
+            headers={"Authorization": f"Bearer {pair['access']}"},
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.refresh(pair["refresh"]).status_code, 401)
+        response = self.client.get(
+            "/api/contracts/", headers={"Authorization": f"Bearer {pair['access']}"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_rejects_inactive_users(self) -> None:
+        refresh = self.obtain()["refresh"]
+        User.objects.filter(pk=self.buyer.pk).update(is_active=False)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+
+    def test_wrong_password(self) -> None:
+        response = self.client.post(
+            "/api/auth/token",
+            {"email": "buyer@example.com", "password": "nope"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(CACHES=RENDER_CACHES)
+class RenderCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.farmer = User.objects.create_user(
+            email="farmer@example.com",
+            phone="1",
+            password=None,
+            full_name="Farmer",
+            date_of_birth=date(1990, 1, 1),
+            user_type=User.FARMER,
+        )
+        cls.buyer = User.objects.create_user(
+            email="buyer@example.com",
+            phone="2",
+            password=None,
+            date_of_birth=date(1990, 1, 1),
+            user_type=User.BUYER,
+        )
+        cls.wheat = Product.objects.create(
+            user=cls.farmer, name="Wheat", price=10, stock=100
+        )
+
+    def test_anonymous_pages_are_served_from_the_cache(self) -> None:
+        first = self.client.get("/about/")
+        second = self.client.get("/about/")
+        self.assertEqual(second.content, first.content)
+        self.assertTrue(first.templates)
+        self.assertFalse(second.templates)
+        self.assertIn("Cookie", second["Vary"])
+
+        # Any session cookie means a logged-in page may differ; render it.
+        self.client.force_login(self.buyer)
+        self.assertTrue(self.client.get("/about/").templates)
+
+    def test_pages_with_a_csrf_token_are_not_stored(self) -> None:
+        calls = []
+
+        @cache_anonymous_page
+        def form(request):
+            calls.append(1)
+            get_token(request)
+            return HttpResponse("<form>")
+
+        factory = RequestFactory()
+        form(factory.get("/form/"))
+        form(factory.get("/form/"))
+        self.assertEqual(len(calls), 2)
+
+    def test_dashboard_panels_are_cached_until_contracts_change(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(
+                buyer=self.buyer,
+                farmer=self.farmer,
+                product=self.wheat,
+                quantity=2,
+                terms_and_conditions="-",
+            )
+        self.client.force_login(self.farmer)
+        with CaptureQueriesContext(connection) as miss:
+            self.assertContains(self.client.get("/dashboard/"), "Total sales: Rs.20")
+        with CaptureQueriesContext(connection) as hit:
+            self.assertContains(self.client.get("/dashboard/"), "Total sales: Rs.20")
+        # dashboard_stats' three queries are skipped.
+        self.assertEqual(len(miss) - len(hit), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(
+                buyer=self.buyer,
+                farmer=self.farmer,
+                product=self.wheat,
+                quantity=3,
+                terms_and_conditions="-",
+            )
+        self.assertContains(self.client.get("/dashboard/"), "Total sales: Rs.50")
+
+    def test_stats_are_computed_only_for_a_missing_panel(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            Contract.objects.create(
+                buyer=self.buyer,
+                farmer=self.farmer,
+                product=self.wheat,
+                quantity=2,
+                terms_and_conditions="-",
+            )
+        self.client.force_login(self.farmer)
+        self.client.get("/dashboard/")
+        _, cache, _ = panels.panel_cache()
+        version = cache.get(panels.version_key(self.farmer.pk))
+        analytics = panels.panel_keys(self.farmer, version)[1]
+
+        view = async_views if settings.ASYNC_VIEWS else views
+        with mock.patch.object(
+            view, "dashboard_stats", wraps=view.dashboard_stats
+        ) as stats:
+            self.client.get("/dashboard/")
+            self.assertFalse(stats.called)
+            # One panel expired: the stats are computed as it renders.
+            cache.delete(analytics)
+            self.assertContains(self.client.get("/dashboard/"), "<td>Wheat</td>")
+            stats.assert_called_once()
@@ -0,0 +1,209 @@
+"""Signed access and refresh tokens (JWT) for the API.
+
+Verifying an access token needs only the signing keys and the process-local
+revocation list, never the database: the user's id and type travel in the
+token. A refresh token is used up in the database instead (``RevokedToken``),
+so that it works once across all processes. Keys are rotated by putting the
+new one first in ``JWT_AUTH["KEYS"]`` and keeping the old one until the tokens
+it signed have expired.
+"""
+from datetime import timedelta
+from functools import lru_cache
+from hashlib import sha256
+from heapq import heappop, heappush
+from threading import Lock
+from time import time
+from typing import Optional
+
+import jwt
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+
+from model_utils import (
+    aware_utcnow,
+    datetime_from_epoch,
+    datetime_to_epoch,
+    generate_id,
+)
+from users.models import RevokedToken, User
+
+ACCESS: str = "access"
+REFRESH: str = "refresh"
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def token_options() -> dict:
+    options = getattr(settings, "JWT_AUTH", {})
+    keys = options.get("KEYS") or {
+        # Derived rather than SECRET_KEY itself, which signs other things too.
+        "default": sha256(f"jwt:{settings.SECRET_KEY}".encode()).hexdigest()
+    }
+    return {
+        "keys": dict(keys),
+        "algorithm": options.get("ALGORITHM", "HS256"),
+        "access_ttl": options.get("ACCESS_TTL", 300),
+        "refresh_ttl": options.get("REFRESH_TTL", 14 * 24 * 3600),
+        "revocation_size": options.get("REVOCATION_CACHE_SIZE", 10000),
+        "shared_alias": options.get("SHARED_ALIAS"),
+    }
+
+
+class RevocationList:
+    """Revoked access token ids, each kept only until the token expires.
+
+    Holds at most ``max_entries`` ids and never drops one early. Once full, a
+    further revocation fails closed: every token issued up to then counts as
+    revoked until the latest of them expires, so clients refresh. Ids are also
+    put in the optional shared Django cache, so that a logout in one process
+    holds in the others.
+    """
+
+    def __init__(self, max_entries: int, shared_alias: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self.shared = caches[shared_alias] if shared_alias else None
+        self._expiry: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        # Tokens issued up to _closed_at are refused until _closed_until.
+        self._closed_at = self._closed_until = 0.0
+        self._lock = Lock()
+
+    def revoke(self, jti: str, expires: float) -> None:
+        now = time()
+        with self._lock:
+            self._prune(now)
+            if jti in self._expiry or len(self._expiry) < self.max_entries:
+                self._expiry[jti] = expires
+                heappush(self._heap, (expires, jti))
+            else:
+                self._closed_at = now
+                self._closed_until = max(self._closed_until, expires)
+        if self.shared is not None:
+            self.shared.set(f"jwt:revoked:{jti}", 1, max(1, int(expires - now)))
+
+    def is_revoked(self, jti: str, issued: float = 0) -> bool:
+        if jti in self._expiry:
+            return True
+        if issued <= self._closed_at and time() < self._closed_until:
+            return True
+        if self.shared is not None:
+            return bool(self.shared.get(f"jwt:revoked:{jti}"))
+        return False
+
+    def _prune(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            _, jti = heappop(self._heap)
+            if self._expiry.get(jti, now + 1) <= now:
+                del self._expiry[jti]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+            self._heap.clear()
+            self._closed_at = self._closed_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+@lru_cache
+def get_revocation_list() -> RevocationList:
+    options = token_options()
+    return RevocationList(options["revocation_size"], options["shared_alias"])
+
+
+def issue(user: User, kind: str) -> tuple[str, dict]:
+    """A signed ``kind`` token for ``user``, and its claims."""
+    options = token_options()
+    kid, key = next(iter(options["keys"].items()))
+    now = aware_utcnow()
+    claims = {
+        "sub": user.pk,
+        "typ": user.user_type,
+        # Staff see everyone's rows in the exports.
+        "staff": user.is_staff,
+        "kind": kind,
+        "jti": generate_id(),
+        "iat": datetime_to_epoch(now),
+        "exp": datetime_to_epoch(now + timedelta(seconds=options[f"{kind}_ttl"])),
+    }
+    token = jwt.encode(claims, key, options["algorithm"], headers={"kid": kid})
+    return token, claims
+
+
+def issue_pair(user: User) -> dict:
+    access, claims = issue(user, ACCESS)
+    refresh, _ = issue(user, REFRESH)
+    return {
+        "access": access,
+        "refresh": refresh,
+        "token_type": "bearer",
+        "expires_at": datetime_from_epoch(claims["exp"]),
+    }
+
+
+def decode(token: str, kind: str) -> dict:
+    """Verified claims of a ``kind`` token; raises InvalidToken otherwise."""
+    options = token_options()
+    try:
+        key = options["keys"].get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise InvalidToken("Unknown signing key")
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[options["algorithm"]],
+            options={"require": ["exp", "sub", "jti"]},
+        )
+    except jwt.PyJWTError as exc:
+        raise InvalidToken(str(exc))
+    if claims.get("kind") != kind:
+        raise InvalidToken(f"Expected a {kind} token")
+    if kind == ACCESS and get_revocation_list().is_revoked(
+        claims["jti"], claims.get("iat", 0)
+    ):
+        raise InvalidToken("Token has been revoked")
+    return claims
+
+
+def consume(claims: dict) -> None:
+    """Use up a refresh token; raises InvalidToken if it already was.
+
+    Checked only here, by one INSERT on the token id: of two concurrent
+    refreshes with the same token, exactly one gets through.
+    """
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=claims["jti"], expires=claims["exp"])
+    except IntegrityError:
+        raise InvalidToken("Token has been revoked")
+
+
+def revoke(claims: dict) -> None:
+    if claims.get("kind") == REFRESH:
+        consume(claims)
+    else:
+        get_revocation_list().revoke(claims["jti"], claims["exp"])
+
+
+def prune_revoked(now: Optional[int] = None) -> int:
+    """Delete used refresh tokens that have expired; returns how many."""
+    now = datetime_to_epoch(aware_utcnow()) if now is None else now
+    deleted, _ = RevokedToken.objects.filter(expires__lte=now).delete()
+    return deleted
+
+
+def user_from_claims(claims: dict) -> User:
+    """An unfetched ``User`` with only ``id``, ``user_type`` and ``is_staff`` set.
+
+    Enough for permission checks and for use as a foreign key value; any
+    other field reads as its default.
+    """
+    user = User(
+        id=claims["sub"], user_type=claims["typ"], is_staff=claims.get("staff", False)
+    )
+    user._state.adding = False
+    return user
@@ -3,6 +3,11 @@ from django.contrib.auth.decorators import login_required
 from users.forms import UserRegistrationForm
 from users.models import User
 from django.contrib import messages
+from django.utils.functional import SimpleLazyObject
+
+from contracts.stats import dashboard_stats
+from core.pagecache import cache_anonymous_page
+from users.panels import panel_context
 
 
 def register_user(request):
@@ -22,19 +27,30 @@ def register_user(request):
     return render(request, "users/registration.html", {"form": form})
 
 
+def dashboard_context(user: User) -> dict:
+    # The stats only feed the panels; their queries run only if one of them
+    # is rendered rather than read from the cache.
+    stats = SimpleLazyObject(lambda: dashboard_stats(user))
+    return {"user": user, "stats": stats, **panel_context(user)}
+
+
 @login_required
 def dashboard(request):
     if request.user.user_type == User.FARMER:
-        return render(request, "users/farmer_dashboard.html", {"user": request.user})
+        context = dashboard_context(request.user)
+        return render(request, "users/farmer_dashboard.html", context)
     elif request.user.user_type == User.BUYER:
-        return render(request, "users/buyer_dashboard.html", {"user": request.user})
+        context = dashboard_context(request.user)
+        return render(request, "users/buyer_dashboard.html", context)
     else:
         return render(request, template_name="users/login.html")
 
 
+@cache_anonymous_page
 def about(request):
     return render(request, template_name="users/about.html")
 
 
+@cache_anonymous_page
 def home(request):
     return render(request, template_name="users/home.html")